@@ -1,14 +1,18 @@
 import sys
 import os
 import pandas as pd
-import matplotlib.pyplot as plt
-import yfinance as yf
 import numpy as np
 
 # Add project root
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from core.indicators import TechnicalIndicators
+from core.indicator_cache import cached_indicators
+from core.resample import get_resampled_data
+from core.harness import kernel, bar_arrays, kernel_input
+
+# States and trade events of _complex_kernel
+NEUTRAL, BOTTOM_SEEN, INVESTED = 0, 1, 2
+BOTTOM_FOUND, BOTTOM_AGAIN, BUY, SELL = 0, 1, 2, 3
 
 def get_4h_data_custom(ticker, start_date, end_date):
     """
@@ -17,107 +21,106 @@ def get_4h_data_custom(ticker, start_date, end_date):
     Note: User is in late 2025. March 2024 is ~1.5 years ago. It IS within 730 days.
     """
     print(f"Fetching 1h data for {ticker} ({start_date} to {end_date})...")
-    df = yf.download(ticker, start=start_date, end=end_date, interval="1h", progress=False)
+    df_4h = get_resampled_data(ticker, "4h", start_date=start_date, end_date=end_date, base_interval="1h")
     
-    if df.empty:
+    if df_4h.empty:
         print("No data found.")
-        return df
-        
-    # Flatten columns
-    if isinstance(df.columns, pd.MultiIndex):
-        try:
-            df.columns = df.columns.droplevel(1)
-        except:
-            pass
-            
-    logic = {
-        'Open': 'first',
-        'High': 'max',
-        'Low': 'min',
-        'Close': 'last',
-        'Volume': 'sum'
-    }
-    
-    df_4h = df.resample('4h').agg(logic).dropna()
     return df_4h
 
-def run_complex_strategy(df):
+@kernel
+def _complex_kernel(close, bottom, yellow_top, blue_bottom, cash, ev_bar, ev_kind, equity):
     """
-    Complex Logic:
-    1. Wait for '抄底' (DXDX) signal.
-    2. Once '抄底' appears, enter 'MONITORING' mode.
-    3. Buy when Price > Yellow Ladder Top (A1).
-    4. Sell when Price < Blue Ladder Bottom (B).
+    NEUTRAL -> BOTTOM_SEEN -> INVESTED state machine of run_complex_strategy.
+    Fills equity and the (bar, kind) event arrays; returns the number of events.
     """
-    # Calculate Indicators
-    df = TechnicalIndicators.add_ladder_indicator(df, n1=26, n2=89)
-    df = TechnicalIndicators.add_bottom_fishing_indicator(df)
-    
-    cash = 100000
-    shares = 0
-    trades = []
-    equity = []
-    
-    # States: 'NEUTRAL', 'BOTTOM_SEEN', 'INVESTED'
-    state = 'NEUTRAL'
-    bottom_seen_price = 0
-    
-    # We might want to expire the 'BOTTOM_SEEN' signal if price makes a new low?
-    # Or just keep it valid until we buy.
-    # Let's say valid until a Buy happens or price drops significantly below the bottom signal low (Stop Loss logic on signal).
-    # For now, keep simple: Valid until Buy.
-    
-    for date, row in df.iterrows():
-        price = row['Close']
-        
+    shares = 0.0
+    state = NEUTRAL
+    n_events = 0
+
+    for i in range(len(close)):
+        price = close[i]
+
         # Check Indicators
-        is_bottom = row['bottom_fishing_signal'] == 1
-        above_yellow = price > row['ladder_yellow_top']
-        below_blue = price < row['ladder_blue_bottom']
-        
-        if state == 'NEUTRAL':
+        is_bottom = bottom[i] == 1
+        above_yellow = price > yellow_top[i]
+        below_blue = price < blue_bottom[i]
+
+        if state == NEUTRAL:
             if is_bottom:
-                state = 'BOTTOM_SEEN'
-                bottom_seen_price = price
-                trades.append({'date': date, 'action': 'SIGNAL', 'price': price, 'type': 'Bottom Found'})
-        
-        elif state == 'BOTTOM_SEEN':
+                state = BOTTOM_SEEN
+                ev_bar[n_events] = i
+                ev_kind[n_events] = BOTTOM_FOUND
+                n_events += 1
+
+        elif state == BOTTOM_SEEN:
             # We have seen a bottom, waiting for Yellow Breakout
-            
-            # If another bottom signal comes, update reference? (Optional)
             if is_bottom:
-                 trades.append({'date': date, 'action': 'SIGNAL', 'price': price, 'type': 'Bottom Again'})
-            
+                ev_bar[n_events] = i
+                ev_kind[n_events] = BOTTOM_AGAIN
+                n_events += 1
+
             if above_yellow:
                 # BUY!
                 shares = cash / price
-                cash = 0
-                state = 'INVESTED'
-                trades.append({'date': date, 'action': 'BUY', 'price': price, 'type': 'Yellow Breakout'})
-        
-        elif state == 'INVESTED':
-            # Sell logic
+                cash = 0.0
+                state = INVESTED
+                ev_bar[n_events] = i
+                ev_kind[n_events] = BUY
+                n_events += 1
+
+        elif state == INVESTED:
             if below_blue:
-                # SELL!
+                # SELL! Back to NEUTRAL: a new bottom signal is needed to enter again
                 cash = shares * price
-                shares = 0
-                state = 'NEUTRAL' # Reset to Neutral, need new Bottom signal to enter again? 
-                # User query implies: "抄底...再有超过黄色梯子". 
-                # Usually after selling, we might just trade the Ladder (Trend)?
-                # Or strictly need a new Bottom signal?
-                # Let's assume strict: Need new Bottom to restart the cycle. 
-                # Or maybe just Neutral -> Yellow Breakout is enough in Bull market?
-                # User said: "本来就是要先有抄底...再有超过黄色梯子". implied dependency.
-                trades.append({'date': date, 'action': 'SELL', 'price': price, 'type': 'Blue Breakdown'})
-                
+                shares = 0.0
+                state = NEUTRAL
+                ev_bar[n_events] = i
+                ev_kind[n_events] = SELL
+                n_events += 1
+
         # Record Equity
-        curr_val = cash + (shares * price)
-        equity.append(curr_val)
-        
+        equity[i] = cash + (shares * price)
+    return n_events
+
+
+def run_complex_strategy(df, ticker=None, interval="4h"):
+    """
+    Complex Logic:
+    1. Wait for '抄底' (DXDX) signal.
+    2. Once '抄底' appears, enter 'MONITORING' mode.
+    3. Buy when Price > Yellow Ladder Top (A1).
+    4. Sell when Price < Blue Ladder Bottom (B).
+
+    The '抄底' signal stays valid until a buy happens (no expiry on new lows).
+
+    Args:
+        df (pd.DataFrame): OHLC bars.
+        ticker (str): Key of the on-disk indicator cache (None: compute without the cache).
+        interval (str): Bar interval of df, part of the cache key.
+    """
+    # Calculate Indicators (cached on disk per ticker, re-runs on the same bars skip this)
+    df = cached_indicators(ticker, interval, df, n1=26, n2=89)
+
+    inputs = bar_arrays(df, 'Close', 'bottom_fishing_signal', 'ladder_yellow_top', 'ladder_blue_bottom')
+    ev_bar = kernel_input(np.zeros(2 * len(df), dtype=int), int)
+    ev_kind = kernel_input(np.zeros(2 * len(df), dtype=int), int)
+    equity = np.empty(len(df))
+    n_events = _complex_kernel(*inputs, 100000.0, ev_bar, ev_kind, equity)
+
+    labels = {BOTTOM_FOUND: ('SIGNAL', 'Bottom Found'), BOTTOM_AGAIN: ('SIGNAL', 'Bottom Again'),
+              BUY: ('BUY', 'Yellow Breakout'), SELL: ('SELL', 'Blue Breakdown')}
+    close = inputs[0]
+    trades = []
+    for k in range(n_events):
+        action, kind = labels[ev_kind[k]]
+        trades.append({'date': df.index[ev_bar[k]], 'action': action, 'price': float(close[ev_bar[k]]), 'type': kind})
+
     df['Equity'] = equity
     return df, trades
 
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
     TICKER = "TQQQ"
     # Focus on March - May 2024
     # Note: 2024 is last year.
@@ -131,7 +134,7 @@ if __name__ == "__main__":
         
     print(f"Bars: {len(df_4h)}")
     
-    df_res, trades = run_complex_strategy(df_4h)
+    df_res, trades = run_complex_strategy(df_4h, TICKER, interval="4h")
     
     # Stats
     print("\nTrades Log:")
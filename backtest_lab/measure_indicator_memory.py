@@ -0,0 +1,52 @@
+import sys
+import os
+import tracemalloc
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.indicators import TechnicalIndicators, LADDER_COLUMNS
+from core.engine import clear_memo
+from verify_bottom_fishing import random_walk
+
+
+def copying(df):
+    df = TechnicalIndicators.add_ladder_indicator(df)
+    return TechnicalIndicators.add_bottom_fishing_indicator(df)
+
+
+def in_place(df):
+    df = df.copy()
+    TechnicalIndicators.add_ladder_indicator(df, out=df)
+    return TechnicalIndicators.add_bottom_fishing_indicator(df, out=df)
+
+
+def arrays_only(df):
+    return TechnicalIndicators.indicator_arrays(df, LADDER_COLUMNS + ['bottom_fishing_signal'])
+
+
+def buffer(df):
+    out = np.empty((len(df), len(LADDER_COLUMNS)))
+    return TechnicalIndicators.add_ladder_indicator(df, out=out)
+
+
+def peak(fn, df):
+    """Peak traced allocation of fn(df) in bytes (memo cleared first, so indicator arrays count)."""
+    clear_memo()
+    tracemalloc.start()
+    result = fn(df)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak_bytes
+
+
+if __name__ == "__main__":
+    df = random_walk(500_000, 1)
+    raw = df.memory_usage(deep=True).sum()
+    print(f"Raw OHLCV frame: {raw / 1e6:.1f} MB")
+    for name, fn in [("copy per call (default)", copying), ("one copy + out=df", in_place),
+                     ("indicator_arrays", arrays_only), ("preallocated buffer (ladder)", buffer)]:
+        p = peak(fn, df)
+        print(f"{name:<30} peak {p / 1e6:7.1f} MB ({p / raw:.2f}x raw)")
@@ -0,0 +1,47 @@
+import sys
+import os
+import time
+import argparse
+
+import pandas as pd
+
+# Add project root to path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.data_provider import get_stock_data
+from core.monte_carlo import BlockBootstrap, JumpDiffusion, MonteCarlo
+from core.strategies import BuyAndHold, SimpleDCA, MA200Strategy, DavidStrategy
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Strategy CAGR / drawdown distributions over resampled price paths")
+    parser.add_argument("--ticker", default="TQQQ")
+    parser.add_argument("--start", default="2011-01-01")
+    parser.add_argument("--model", choices=["bootstrap", "jump"], default="bootstrap")
+    parser.add_argument("--paths", type=int, default=10000)
+    parser.add_argument("--block", type=int, default=21, help="Bootstrap block length (bars)")
+    parser.add_argument("--warmup", type=int, default=252, help="Bars before trading starts (indicator warm-up)")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"Fetching data for {args.ticker}...")
+    df = get_stock_data(args.ticker, start_date=args.start)
+    if df.empty:
+        print("No data fetched. Check your internet connection or ticker symbol.")
+        sys.exit(1)
+    if df.index[0] < pd.Timestamp(args.start):
+        print(f"Data starts at {df.index[0].date()}, before --start {args.start}")
+        sys.exit(1)
+
+    generator = BlockBootstrap(df, block=args.block) if args.model == "bootstrap" else JumpDiffusion.fit(df)
+    trade_from = generator.index[min(args.warmup, len(generator.index) - 1)]
+    strategies = [cls(trading_start_date=trade_from) for cls in (BuyAndHold, SimpleDCA, MA200Strategy, DavidStrategy)]
+
+    print(f"Simulating {args.paths} paths x {len(generator.index)} bars ({args.model})...")
+    t = time.perf_counter()
+    mc = MonteCarlo(strategies, n_paths=args.paths, chunk_size=args.chunk_size, seed=args.seed)
+    mc.run(generator)
+    print(f"Done in {time.perf_counter() - t:.1f}s\n")
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(mc.summary().to_string(float_format='{:.2%}'.format))
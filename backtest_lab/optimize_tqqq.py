@@ -0,0 +1,152 @@
+import sys
+import os
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.data_provider import get_stock_data
+from core.shared_data import SharedDataset, attach, detach
+from tqqq_backtest import TQQQStrategy, compute_metrics
+
+# Parameters searched by the optimizer (invest_period_days goes to run(), the rest to TQQQStrategy)
+DEFAULT_GRID = {
+    'base_invest_ratio': [0.005, 0.01, 0.02, 0.03],
+    'profit_target_multiple': [1.5, 2.0, 3.0, 4.0],
+    'rebalance_threshold': [0.5, 0.6, 0.7, 0.8],
+    'rebalance_target': [0.2, 0.3, 0.4, 0.5],
+    'invest_period_days': [5, 10, 20, 40],
+}
+# Random search: (low, high); int bounds draw integers, float bounds draw uniformly
+DEFAULT_RANGES = {
+    'base_invest_ratio': (0.002, 0.05),
+    'profit_target_multiple': (1.2, 5.0),
+    'rebalance_threshold': (0.3, 0.9),
+    'rebalance_target': (0.1, 0.6),
+    'invest_period_days': (1, 60),
+}
+
+# Price data of the current worker process, set once by _init_worker
+_data = None
+
+
+def grid_points(grid: dict = None) -> list:
+    """Every combination of the grid values as a list of parameter dicts."""
+    grid = grid or DEFAULT_GRID
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def random_points(n: int, ranges: dict = None, seed: int = 0) -> list:
+    """n parameter dicts drawn uniformly from ranges."""
+    ranges = ranges or DEFAULT_RANGES
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, (low, high) in ranges.items():
+        if isinstance(low, int) and isinstance(high, int):
+            columns[name] = rng.integers(low, high + 1, n).tolist()
+        else:
+            columns[name] = rng.uniform(low, high, n).tolist()
+    return [{name: columns[name][i] for name in ranges} for i in range(n)]
+
+
+def _init_worker(handle, initial_cash):
+    """
+    Pool initializer: attaches the shared price arrays once per worker. The kernel
+    reads the read-only views directly, so no worker holds a private copy of the prices.
+    """
+    global _data
+    data = attach(handle)
+    _data = (data.index, data['Close'], data['High'], initial_cash)
+
+
+def _evaluate(params: dict) -> dict:
+    dates, close, high, initial_cash = _data
+    strategy_params = {k: v for k, v in params.items() if k != 'invest_period_days'}
+    strategy = TQQQStrategy(initial_cash=initial_cash, **strategy_params)
+    outputs, _, _ = strategy.simulate(close, high, params.get('invest_period_days', 20))
+    equity, drawdown = outputs[0], outputs[3]
+    return {**params, **compute_metrics(dates, equity, drawdown, initial_cash)}
+
+
+def optimize(df: pd.DataFrame, points: list, initial_cash=100000, workers=None, chunksize=None,
+             sort_by='cagr') -> pd.DataFrame:
+    """
+    Run TQQQStrategy for every parameter dict in points and rank the results.
+
+    Args:
+        df (pd.DataFrame): Daily bars with 'Close' and 'High'.
+        points (list): Parameter dicts (see grid_points / random_points).
+        initial_cash (float): Starting cash of every run.
+        workers (int): Worker processes (None: os.cpu_count(), 1: run in this process).
+        chunksize (int): Parameter dicts per task (None: about 4 tasks per worker).
+        sort_by (str): Ranking column; max_drawdown ranks ascending, the rest descending.
+
+    Returns:
+        pd.DataFrame: One row per point with its parameters, final_equity, total_return,
+        cagr and max_drawdown, best first.
+    """
+    global _data
+    workers = workers or os.cpu_count() or 1
+
+    # Prices are published once in shared memory; tasks only carry parameter dicts
+    with SharedDataset.publish(df, columns=['Close', 'High']) as data:
+        if workers == 1:
+            _init_worker(data.handle, initial_cash)
+            try:
+                rows = [_evaluate(p) for p in points]
+            finally:
+                # Drop this process's views of the shared arrays before the block unlinks them
+                _data = None
+                detach(data.handle)
+        else:
+            chunksize = chunksize or max(1, len(points) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(data.handle, initial_cash)) as pool:
+                rows = list(pool.map(_evaluate, points, chunksize=chunksize))
+
+    table = pd.DataFrame(rows)
+    table = table.sort_values(sort_by, ascending=(sort_by == 'max_drawdown'), kind='stable')
+    return table.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TQQQ DCA strategy parameter search")
+    parser.add_argument("--ticker", default="TQQQ")
+    parser.add_argument("--start", default="2011-01-01")
+    parser.add_argument("--mode", choices=["grid", "random"], default="grid")
+    parser.add_argument("--samples", type=int, default=2000, help="Random search points")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--sort-by", default="cagr", choices=["cagr", "final_equity", "max_drawdown"])
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"Fetching data for {args.ticker}...")
+    df = get_stock_data(args.ticker, start_date=args.start)
+    if df.empty:
+        print("No data fetched. Check your internet connection or ticker symbol.")
+        sys.exit(1)
+    if df.index[0] < pd.Timestamp(args.start):
+        print(f"Data starts at {df.index[0].date()}, before --start {args.start}")
+        sys.exit(1)
+
+    points = grid_points() if args.mode == "grid" else random_points(args.samples, seed=args.seed)
+    print(f"Evaluating {len(points)} parameter sets on {len(df)} bars...")
+    t = time.perf_counter()
+    table = optimize(df, points, workers=args.workers, sort_by=args.sort_by)
+    print(f"Done in {time.perf_counter() - t:.1f}s\n")
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(table.head(args.top).to_string(formatters={
+            'final_equity': '${:,.0f}'.format,
+            'total_return': '{:.1%}'.format,
+            'cagr': '{:.2%}'.format,
+            'max_drawdown': '{:.2%}'.format,
+        }))
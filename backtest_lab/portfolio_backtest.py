@@ -0,0 +1,64 @@
+import sys
+import os
+import json
+import argparse
+
+import pandas as pd
+
+# Add project root to path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.data_provider import get_stocks_data
+from core.portfolio import PortfolioBacktest, load_panels
+from core.strategies import MA200Strategy, DavidStrategy
+
+STRATEGIES = {'ma200': MA200Strategy, 'david': DavidStrategy}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest a strategy over the whole watchlist from one account")
+    parser.add_argument("--strategy", choices=list(STRATEGIES), default="david")
+    parser.add_argument("--start", default="2015-01-01", help="Data start (indicator warm-up)")
+    parser.add_argument("--trade-from", default="2016-01-01", help="trading_start_date")
+    parser.add_argument("--cash", type=float, default=100000)
+    parser.add_argument("--weighting", choices=["equal", "inverse_vol"], default="equal")
+    parser.add_argument("--max-positions", type=int, default=None)
+    parser.add_argument("--max-weight", type=float, default=1.0)
+    parser.add_argument("--commission", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'watchlist.json')
+    with open(config_path) as f:
+        tickers = json.load(f)['watchlist']
+
+    print(f"Fetching {len(tickers)} tickers...")
+    data = {t: df for t, df in get_stocks_data(tickers, start_date=args.start).items() if not df.empty}
+    early = [t for t, df in data.items() if df.index[0] < pd.Timestamp(args.start)]
+    if early:
+        print(f"Data for {early} starts before --start {args.start}")
+        sys.exit(1)
+    panels = load_panels(data)
+
+    strategy = STRATEGIES[args.strategy](initial_cash=args.cash, trading_start_date=args.trade_from)
+    bt = PortfolioBacktest(strategy, weighting=args.weighting, max_positions=args.max_positions,
+                           max_weight=args.max_weight, commission=args.commission)
+    result = bt.run(panels)
+    result = result[result.index >= strategy.trading_start_date]
+
+    equity = result['Equity']
+    years = (equity.index[-1] - equity.index[0]).days / 365
+    cagr = (equity.iloc[-1] / equity.iloc[0]) ** (1 / years) - 1 if years > 0 else 0.0
+    max_dd = (1 - equity / equity.cummax()).max()
+
+    print("\n" + "=" * 50)
+    print(f"  PORTFOLIO: {strategy.name} on {len(data)} tickers")
+    print("=" * 50)
+    print(f"Period:       {equity.index[0].date()} -> {equity.index[-1].date()}")
+    print(f"Final Equity: ${equity.iloc[-1]:,.2f} (contributions included)")
+    print(f"CAGR:         {cagr * 100:.2f}%")
+    print(f"Max Drawdown: {max_dd * 100:.2f}%")
+    print(f"Avg Positions: {result['Positions'].mean():.1f}")
+    print("-" * 50)
+    print("Current holdings:")
+    last = bt.positions.iloc[-1]
+    for ticker, shares in last[last > 0].items():
+        print(f"  {ticker:<8} {shares:,.2f} shares")
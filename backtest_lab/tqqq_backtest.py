@@ -1,6 +1,5 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import sys
 import os
 import math
@@ -9,6 +8,141 @@ import math
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from core.data_provider import get_stock_data
+from core.harness import kernel, bar_arrays, kernel_input
+from core.lot_book import new_book, open_lots, push_lot, pop_tp_hits, consume_fifo
+
+# Event kinds written by _tqqq_kernel
+SELL_TP, BUY_DCA, SELL_REBAL = 0, 1, 2
+
+
+@kernel
+def _tqqq_kernel(close, high, invest_period_days, base_invest_ratio, profit_target_multiple,
+                 rebalance_threshold, rebalance_target, drawdown_coefficient, state, book, hits,
+                 ev_bar, ev_kind, ev_price, ev_shares, ev_value, ev_info,
+                 out_equity, out_cash, out_stock, out_dd, out_alloc):
+    """
+    Bar loop of TQQQStrategy.run over arrays.
+
+    state holds [cash, peak_cash, shares, max_equity, current_drawdown, portfolio_value]
+    and book the open lots (core/lot_book.py); both are updated in place. Trades are
+    written to the ev_* arrays, whose ev_info is the entry price (SELL_TP), drawdown
+    (BUY_DCA) or allocation (SELL_REBAL). Buys are scaled by
+    1 + drawdown * drawdown_coefficient (TQQQStrategy.calculate_drawdown_multiplier).
+
+    Returns:
+        int: Number of events written.
+    """
+    lot_price, lot_shares, lot_tp = book[0], book[1], book[2]
+    cash, peak_cash, shares, max_equity, current_drawdown, portfolio_value = \
+        state[0], state[1], state[2], state[3], state[4], state[5]
+    n_events = 0
+    days_counter = 0
+
+    for i in range(len(close)):
+        price = close[i]
+        high_i = high[i]
+
+        # 1. Update Portfolio Value (Mark to Market)
+        stock_value = shares * price
+        portfolio_value = cash + stock_value
+
+        # Update Peak Stats & Drawdown
+        if cash > peak_cash:
+            peak_cash = cash
+
+        is_new_high = False
+        if portfolio_value > max_equity:
+            max_equity = portfolio_value
+            current_drawdown = 0.0
+            is_new_high = True
+        else:
+            if max_equity > 0:
+                current_drawdown = (max_equity - portfolio_value) / max_equity
+            else:
+                current_drawdown = 0.0
+
+        # 2. Check Take Profit (TP) for individual lots, sold at the TP price
+        n_hits = pop_tp_hits(book, high_i, hits)
+        for j in range(n_hits):
+            lot = hits[j]
+            proceeds = lot_shares[lot] * lot_tp[lot]
+            cash += proceeds
+            shares -= lot_shares[lot]
+            ev_bar[n_events] = i
+            ev_kind[n_events] = SELL_TP
+            ev_price[n_events] = lot_tp[lot]
+            ev_shares[n_events] = lot_shares[lot]
+            ev_value[n_events] = proceeds
+            ev_info[n_events] = lot_price[lot]
+            n_events += 1
+
+        # Recalculate stock value after TP sales
+        stock_value = shares * price
+        portfolio_value = cash + stock_value
+
+        # 3. Regular Investment (Buy)
+        days_counter += 1
+        if days_counter >= invest_period_days:
+            days_counter = 0
+            dd_mult = 1 + (current_drawdown * drawdown_coefficient)  # calculate_drawdown_multiplier
+            buy_amount = peak_cash * base_invest_ratio * dd_mult
+            if cash >= buy_amount:
+                shares_to_buy = buy_amount / price
+                cash -= buy_amount
+                shares += shares_to_buy
+                push_lot(book, price, shares_to_buy, price * profit_target_multiple)
+                ev_bar[n_events] = i
+                ev_kind[n_events] = BUY_DCA
+                ev_price[n_events] = price
+                ev_shares[n_events] = shares_to_buy
+                ev_value[n_events] = buy_amount
+                ev_info[n_events] = current_drawdown
+                n_events += 1
+
+        # 4. Rebalancing Logic (Sell on Highs)
+        current_allocation = stock_value / portfolio_value if portfolio_value > 0 else 0.0
+
+        if is_new_high and current_allocation > rebalance_threshold:
+            sell_amount = stock_value - portfolio_value * rebalance_target
+            if sell_amount > 0:
+                shares_to_sell = sell_amount / price
+                cash += sell_amount
+                shares -= shares_to_sell
+
+                # FIFO Removal from lots (oldest first, last one partially)
+                consume_fifo(book, shares_to_sell)
+
+                ev_bar[n_events] = i
+                ev_kind[n_events] = SELL_REBAL
+                ev_price[n_events] = price
+                ev_shares[n_events] = shares_to_sell
+                ev_value[n_events] = sell_amount
+                ev_info[n_events] = current_allocation
+                n_events += 1
+
+        # Record daily stats
+        out_equity[i] = portfolio_value
+        out_cash[i] = cash
+        out_stock[i] = stock_value
+        out_dd[i] = current_drawdown
+        out_alloc[i] = current_allocation
+
+    state[0], state[1], state[2], state[3], state[4], state[5] = \
+        cash, peak_cash, shares, max_equity, current_drawdown, portfolio_value
+    return n_events
+
+
+def compute_metrics(dates, equity, drawdown, initial_cash) -> dict:
+    """Final equity, total return, CAGR and max drawdown of an equity curve."""
+    final_equity = float(equity[-1])
+    days = (dates[-1] - dates[0]).days
+    return {
+        'final_equity': final_equity,
+        'total_return': (final_equity - initial_cash) / initial_cash,
+        'cagr': (final_equity / initial_cash) ** (365 / days) - 1 if days > 0 else 0.0,
+        'max_drawdown': float(np.nanmax(drawdown)),
+    }
+
 
 class TQQQStrategy:
     def __init__(self, 
@@ -16,7 +150,8 @@ class TQQQStrategy:
                  base_invest_ratio=0.01, # Invest 1% of peak cash per period
                  profit_target_multiple=3.0, 
                  rebalance_threshold=0.60, 
-                 rebalance_target=0.40):
+                 rebalance_target=0.40,
+                 drawdown_coefficient=2.0): # Buy multiplier grows by this much per 100% drawdown
         
         self.cash = initial_cash
         self.initial_cash = initial_cash
@@ -31,6 +166,7 @@ class TQQQStrategy:
         self.profit_target_multiple = profit_target_multiple
         self.rebalance_threshold = rebalance_threshold
         self.rebalance_target = rebalance_target
+        self.drawdown_coefficient = drawdown_coefficient
         
         # Holdings tracking: List of {'price': float, 'shares': float, 'tp_price': float}
         self.lots = []
@@ -41,176 +177,94 @@ class TQQQStrategy:
 
     def calculate_drawdown_multiplier(self, drawdown_pct):
         # "随回撤提升的倍率"
-        # Rule: 1 + (Drawdown_PCT * 2)
-        # Example: 
+        # Rule: 1 + (Drawdown_PCT * drawdown_coefficient)
+        # Example (default coefficient 2): 
         # 0% DD -> 1.0x
         # 20% DD -> 1.4x
         # 50% DD -> 2.0x
         # This is a conservative interpretation. Aggressive could be exponential.
-        return 1 + (drawdown_pct * 2)
+        # _tqqq_kernel applies the same rule inline; change drawdown_coefficient, not this method.
+        return 1 + (drawdown_pct * self.drawdown_coefficient)
 
     def run(self, price_data: pd.DataFrame, invest_period_days=20):
         """
         Run the simulation.
         price_data: DataFrame with 'Close' and 'High' columns (daily).
         invest_period_days: How often to invest (e.g. 20 days ~ monthly).
+
+        The bar loop is _tqqq_kernel; High is used to check TP hits (limit orders),
+        which execute at the TP price.
         """
         print(f"Starting simulation on {len(price_data)} trading days...")
-        
-        days_counter = 0
-        
-        for date, row in price_data.iterrows():
-            price = row['Close']
-            # High is safer for TP, but data might have splits/issues. 
-            # Using Close for TP is safer for backtest to avoid "ghost" spikes.
-            # But strategy says "挂出的卖单", implying limit orders. Limit orders get filled at High.
-            # Let's use High for checking TP hit, but execute at TP Price.
-            high = row['High'] 
-            
-            # 1. Update Portfolio Value (Mark to Market)
-            stock_value = self.shares * price
-            self.portfolio_value = self.cash + stock_value
-            
-            # Update Peak Stats & Drawdown
-            if self.cash > self.peak_cash:
-                self.peak_cash = self.cash
-            
-            is_new_high = False
-            if self.portfolio_value > self.max_equity:
-                self.max_equity = self.portfolio_value
-                self.current_drawdown = 0.0
-                is_new_high = True
+
+        close, high = bar_arrays(price_data, 'Close', 'High')
+        outputs, events, n_events = self.simulate(close, high, invest_period_days)
+        self._log_events(price_data.index, events, n_events)
+
+        # Record daily stats
+        equity, cash, stock_value, drawdown, allocation = outputs
+        self.equity_curve.append(pd.DataFrame({
+            'Date': price_data.index,
+            'Equity': equity,
+            'Cash': cash,
+            'StockValue': stock_value,
+            'Drawdown': drawdown,
+            'Allocation': allocation,
+            'Price': np.asarray(close, dtype=float),
+        }))
+        return pd.concat(self.equity_curve, ignore_index=True).set_index('Date')
+
+    def simulate(self, close, high, invest_period_days=20):
+        """
+        Array core of run(): advance the strategy state over close/high (from
+        core.harness.bar_arrays, or float64 arrays such as shared-memory views)
+        without building the history or the equity frame.
+
+        Returns:
+            tuple: ([Equity, Cash, StockValue, Drawdown, Allocation] arrays, event arrays, event count).
+        """
+        n = len(close)
+        book = new_book(len(self.lots) + n, self.lots)
+        events = [kernel_input(np.zeros(len(self.lots) + 3 * n, dtype=int), int) for _ in range(2)] + \
+                 [kernel_input(np.zeros(len(self.lots) + 3 * n)) for _ in range(4)]
+        outputs = [np.empty(n) for _ in range(5)]
+        state = kernel_input([self.cash, self.peak_cash, self.shares, self.max_equity,
+                              self.current_drawdown, self.portfolio_value])
+
+        n_events = _tqqq_kernel(close, high, invest_period_days, self.base_invest_ratio,
+                                self.profit_target_multiple, self.rebalance_threshold, self.rebalance_target,
+                                self.drawdown_coefficient, state, book, kernel_input(np.zeros(len(self.lots) + n, dtype=int), int),
+                                *events, *outputs)
+
+        self.cash, self.peak_cash, self.shares, self.max_equity, self.current_drawdown, self.portfolio_value = \
+            (float(v) for v in state)
+        self.lots = open_lots(book)
+        return outputs, events, n_events
+
+    def _log_events(self, index, events, n_events):
+        """Append the kernel's trade events to self.history."""
+        bars, kinds, prices, shares, values, info = events
+        for k in range(n_events):
+            date, kind, price = index[bars[k]], kinds[k], float(prices[k])
+            if kind == SELL_TP:
+                action, reason = 'SELL_TP', f"Hit TP (Entry: {info[k]:.2f})"
+            elif kind == BUY_DCA:
+                dd = float(info[k])
+                action, reason = 'BUY_DCA', f"Periodic (DD:{dd:.1%}, M:{self.calculate_drawdown_multiplier(dd):.1f})"
             else:
-                if self.max_equity > 0:
-                    self.current_drawdown = (self.max_equity - self.portfolio_value) / self.max_equity
-                else:
-                    self.current_drawdown = 0.0
-
-            # 2. Check Take Profit (TP) for individual lots
-            remaining_lots = []
-            for lot in self.lots:
-                # If High price crossed our TP target
-                if high >= lot['tp_price']:
-                    # Sell this lot
-                    # Logic: We sell at TP price (Limit Order filled)
-                    sell_price = lot['tp_price']
-                    proceeds = lot['shares'] * sell_price
-                    
-                    self.cash += proceeds
-                    self.shares -= lot['shares']
-                    
-                    # Log trade
-                    self.history.append({
-                        'date': date,
-                        'action': 'SELL_TP',
-                        'price': sell_price,
-                        'shares': lot['shares'],
-                        'value': proceeds,
-                        'reason': f"Hit TP (Entry: {lot['price']:.2f})"
-                    })
-                else:
-                    remaining_lots.append(lot)
-            self.lots = remaining_lots
-            
-            # Recalculate stock value after TP sales
-            stock_value = self.shares * price
-            self.portfolio_value = self.cash + stock_value
-
-            # 3. Regular Investment (Buy) - "每个周期...买入"
-            days_counter += 1
-            if days_counter >= invest_period_days:
-                days_counter = 0
-                
-                # Calculate Buy Amount
-                # "最大持有过的现金数 × 系数 × 随回撤提升的倍率"
-                dd_mult = self.calculate_drawdown_multiplier(self.current_drawdown)
-                buy_amount = self.peak_cash * self.base_invest_ratio * dd_mult
-                
-                # Check if we have enough cash
-                if self.cash >= buy_amount:
-                    shares_to_buy = buy_amount / price
-                    self.cash -= buy_amount
-                    self.shares += shares_to_buy
-                    
-                    self.lots.append({
-                        'price': price,
-                        'shares': shares_to_buy,
-                        'tp_price': price * self.profit_target_multiple
-                    })
-                    
-                    self.history.append({
-                        'date': date,
-                        'action': 'BUY_DCA',
-                        'price': price,
-                        'shares': shares_to_buy,
-                        'value': buy_amount,
-                        'reason': f"Periodic (DD:{self.current_drawdown:.1%}, M:{dd_mult:.1f})"
-                    })
-            
-            # 4. Rebalancing Logic (Sell on Highs)
-            # "如果达到新高，且仓位高于60%，则提前清理挂出的卖单，减仓至40%"
-            current_allocation = stock_value / self.portfolio_value if self.portfolio_value > 0 else 0
-            
-            if is_new_high and current_allocation > self.rebalance_threshold:
-                target_equity = self.portfolio_value * self.rebalance_target
-                target_stock_val = target_equity
-                
-                # Amount to sell to reach 40% allocation
-                sell_amount = stock_value - target_stock_val
-                
-                if sell_amount > 0:
-                    shares_to_sell = sell_amount / price
-                    
-                    self.cash += sell_amount
-                    self.shares -= shares_to_sell
-                    
-                    # FIFO Removal from lots
-                    # We just remove shares from the front of the list (oldest lots)
-                    shares_removed = 0
-                    new_lots = []
-                    for lot in self.lots:
-                        if shares_removed >= shares_to_sell:
-                            new_lots.append(lot)
-                            continue
-                            
-                        shares_in_lot = lot['shares']
-                        needed = shares_to_sell - shares_removed
-                        
-                        if shares_in_lot > needed:
-                            # Partial reduce
-                            lot['shares'] -= needed
-                            shares_removed += needed
-                            new_lots.append(lot)
-                        else:
-                            # Full consume
-                            shares_removed += shares_in_lot
-                            # Lot dropped
-                    
-                    self.lots = new_lots
-                    
-                    self.history.append({
-                        'date': date,
-                        'action': 'SELL_REBAL',
-                        'price': price,
-                        'shares': shares_to_sell,
-                        'value': sell_amount,
-                        'reason': f"ATH Rebalance (Alloc: {current_allocation:.1%})"
-                    })
-
-            # Record daily stats
-            self.equity_curve.append({
-                'Date': date,
-                'Equity': self.portfolio_value,
-                'Cash': self.cash,
-                'StockValue': stock_value,
-                'Drawdown': self.current_drawdown,
-                'Allocation': current_allocation,
-                'Price': price
+                action, reason = 'SELL_REBAL', f"ATH Rebalance (Alloc: {info[k]:.1%})"
+            self.history.append({
+                'date': date,
+                'action': action,
+                'price': price,
+                'shares': float(shares[k]),
+                'value': float(values[k]),
+                'reason': reason
             })
 
-        return pd.DataFrame(self.equity_curve).set_index('Date')
-
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
     # --- CONFIGURATION ---
     TICKER = "TQQQ"
     START_DATE = "2011-01-01" # TQQQ inception was 2010-02
@@ -235,10 +289,11 @@ if __name__ == "__main__":
     results = strategy.run(df, invest_period_days=INVEST_PERIOD)
     
     # --- METRICS ---
-    final_equity = results['Equity'].iloc[-1]
-    total_return = (final_equity - INITIAL_CASH) / INITIAL_CASH
-    cagr = (final_equity / INITIAL_CASH) ** (365 / (results.index[-1] - results.index[0]).days) - 1
-    max_dd = results['Drawdown'].max()
+    metrics = compute_metrics(results.index, results['Equity'].values, results['Drawdown'].values, INITIAL_CASH)
+    final_equity = metrics['final_equity']
+    total_return = metrics['total_return']
+    cagr = metrics['cagr']
+    max_dd = metrics['max_drawdown']
     
     print("\n" + "=" * 50)
     print(f"  STRATEGY RESULTS: {TICKER}")
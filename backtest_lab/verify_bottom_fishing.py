@@ -0,0 +1,160 @@
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.indicators import TechnicalIndicators, bars_last
+
+
+def reference_bars_last(condition_series):
+    """Original loop implementation of BARSLAST."""
+    res = np.full(len(condition_series), np.nan)
+    last_idx = -1
+    vals = condition_series.values
+    for i in range(len(vals)):
+        if vals[i]:
+            last_idx = i
+        if last_idx != -1:
+            res[i] = i - last_idx
+    return pd.Series(res, index=condition_series.index)
+
+
+def reference_strict_bottom_fishing(df: pd.DataFrame):
+    """Original per-bar loop implementation of the strict 抄底 (DXDX) signal, kept as the reference."""
+    df = df.copy()
+    ema12 = df['Close'].ewm(span=12, adjust=False).mean()
+    ema26 = df['Close'].ewm(span=26, adjust=False).mean()
+    df['DIF'] = ema12 - ema26
+    df['DEA'] = df['DIF'].ewm(span=9, adjust=False).mean()
+    df['MACD'] = (df['DIF'] - df['DEA']) * 2
+
+    d = df['DIF'].values
+    m = df['MACD'].values
+    close = df['Close'].values
+
+    ref_m = np.roll(m, 1); ref_m[0] = 0
+    cond_turn_green = (ref_m >= 0) & (m < 0)
+    cond_turn_red = (ref_m <= 0) & (m > 0)
+    n1_series = reference_bars_last(pd.Series(cond_turn_green))
+    mm1_series = reference_bars_last(pd.Series(cond_turn_red))
+
+    signals = np.zeros(len(df))
+    ccc_arr = np.zeros(len(df), dtype=bool)
+    jjj_arr = np.zeros(len(df), dtype=bool)
+
+    for i in range(1, len(df)):
+        n1 = n1_series.iloc[i]
+        mm1 = mm1_series.iloc[i]
+        if np.isnan(n1) or np.isnan(mm1): continue
+        n1 = int(n1); mm1 = int(mm1)
+
+        cc1 = np.min(close[max(0, i-n1):i+1])
+        difl1 = np.min(d[max(0, i-n1):i+1])
+
+        idx_prev = i - (mm1 + 1)
+        if idx_prev < 0:
+            ccc_arr[i] = False; continue
+
+        n1_prev = int(n1_series.iloc[idx_prev]) if not np.isnan(n1_series.iloc[idx_prev]) else 0
+        cc2 = np.min(close[max(0, idx_prev-n1_prev):idx_prev+1])
+        difl2 = np.min(d[max(0, idx_prev-n1_prev):idx_prev+1])
+
+        idx_prev2 = idx_prev - (int(mm1_series.iloc[idx_prev]) + 1) if not np.isnan(mm1_series.iloc[idx_prev]) else -1
+        if idx_prev2 >= 0:
+            n1_prev2 = int(n1_series.iloc[idx_prev2]) if not np.isnan(n1_series.iloc[idx_prev2]) else 0
+            cc3 = np.min(close[max(0, idx_prev2-n1_prev2):idx_prev2+1])
+            difl3 = np.min(d[max(0, idx_prev2-n1_prev2):idx_prev2+1])
+        else:
+            cc3 = np.inf; difl3 = -np.inf
+
+        is_green = (ref_m[i] < 0) & (d[i] < 0)
+        aaa = (cc1 < cc2) and (difl1 > difl2) and is_green
+        bbb = (cc1 < cc3) and (difl1 < difl2) and (difl1 > difl3) and is_green
+        ccc = (aaa or bbb) and (d[i] < 0)
+        ccc_arr[i] = ccc
+
+        jjj = ccc_arr[i-1] and (abs(d[i-1]) >= (abs(d[i]) * 1.01))
+        dxdx = (not jjj_arr[i-1]) and jjj
+        jjj_arr[i] = jjj
+
+        if dxdx: signals[i] = 1
+
+    df['bottom_fishing_signal'] = signals
+    return df
+
+
+def reference_relaxed_bottom_signal(df: pd.DataFrame, lookback=30):
+    """Original per-bar loop implementation of the relaxed bottom signal."""
+    df = df.copy()
+    ema12 = df['Close'].ewm(span=12, adjust=False).mean()
+    ema26 = df['Close'].ewm(span=26, adjust=False).mean()
+    df['DIF'] = ema12 - ema26
+    df['DEA'] = df['DIF'].ewm(span=9, adjust=False).mean()
+    df['MACD'] = (df['DIF'] - df['DEA']) * 2
+
+    signals = np.zeros(len(df))
+    lows = df['Low'].values
+    difs = df['DIF'].values
+    macds = df['MACD'].values
+    llv_price = df['Low'].rolling(window=lookback).min()
+    llv_dif = df['DIF'].rolling(window=lookback).min()
+
+    for i in range(lookback, len(df)):
+        is_price_low = lows[i] <= (llv_price.iloc[i] * 1.01)
+        is_divergence = is_price_low and (difs[i] > llv_dif.iloc[i] + 0.05)
+        momentum_improving = macds[i] > macds[i-1]
+        if is_divergence and momentum_improving and difs[i] < 0:
+            signals[i] = 1
+
+    df['bottom_fishing_signal'] = signals
+    return df
+
+
+def random_walk(n, seed, vol=0.03):
+    rng = np.random.default_rng(seed)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, vol, n)))
+    idx = pd.bdate_range("2000-01-03", periods=n)
+    return pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close, 'Volume': 1e6}, index=idx)
+
+
+if __name__ == "__main__":
+    cases = [random_walk(n, seed, vol) for seed, (n, vol) in enumerate([(50, 0.03), (300, 0.01), (2000, 0.03), (5000, 0.05)] * 5)]
+    # Flat stretches produce MACD == 0 bars, the edge case of the turn conditions
+    flat = random_walk(600, 99)
+    flat.iloc[100:160, flat.columns.get_loc('Close')] = flat['Close'].iloc[100]
+    cases.append(flat)
+    # Missing bars: NaN Close/Low on single bars, short and long runs, and the first bar
+    for seed, rows in [(7, [5, 200, 201, 500]), (8, [0, 300, 301, 302, 303, 304]), (9, list(range(900, 960)))]:
+        gappy = random_walk(1500, seed, 0.03)
+        gappy.iloc[rows, [gappy.columns.get_loc('Close'), gappy.columns.get_loc('Low')]] = np.nan
+        cases.append(gappy)
+    low_only = random_walk(1000, 10)
+    low_only.iloc[[50, 400, 401], low_only.columns.get_loc('Low')] = np.nan
+    cases.append(low_only)
+
+    total_signals = 0
+    for df in cases:
+        cond = df['Close'].diff() > 0
+        assert reference_bars_last(cond).equals(bars_last(cond)), "bars_last mismatch"
+
+        ref = reference_strict_bottom_fishing(df)['bottom_fishing_signal'].values
+        new = TechnicalIndicators.add_bottom_fishing_indicator(df)['bottom_fishing_signal'].values
+        assert np.array_equal(ref, new), f"Mismatch on case with {len(df)} bars"
+        total_signals += int(new.sum())
+
+        ref = reference_relaxed_bottom_signal(df)['bottom_fishing_signal'].values
+        new = TechnicalIndicators.add_relaxed_bottom_signal(df)['bottom_fishing_signal'].values
+        assert np.array_equal(ref, new), f"Relaxed mismatch on case with {len(df)} bars"
+        total_signals += int(new.sum())
+    print(f"OK: {len(cases)} cases identical for strict and relaxed signals ({total_signals} signals)")
+
+    df = random_walk(20000, 7)
+    for name, ref_fn, new_fn in [("strict", reference_strict_bottom_fishing, TechnicalIndicators.add_bottom_fishing_indicator),
+                                 ("relaxed", reference_relaxed_bottom_signal, TechnicalIndicators.add_relaxed_bottom_signal)]:
+        t = time.perf_counter(); ref_fn(df); t_ref = time.perf_counter() - t
+        t = time.perf_counter(); new_fn(df); t_new = time.perf_counter() - t
+        print(f"{name} 20000 bars: loop {t_ref * 1000:.1f} ms, vectorized {t_new * 1000:.1f} ms ({t_ref / t_new:.0f}x)")
@@ -0,0 +1,237 @@
+import sys
+import os
+import json
+import time
+import datetime
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core.data_provider as data_provider
+from core.cache import BarCache
+from core.providers import ReplayProvider
+from core.resample import ResampleCache, resample_bars, TIMEFRAMES
+from core.quotes import QuoteService
+from core.metadata import MetadataCache
+from verify_bottom_fishing import random_walk
+
+
+def intraday_walk(days, seed):
+    """1h bars (09:30 ... 15:30 New York) over `days` sessions, crossing both DST switches."""
+    rng = np.random.default_rng(seed)
+    sessions = pd.bdate_range("2023-01-03", periods=days)
+    idx = pd.DatetimeIndex([d + pd.Timedelta(hours=9, minutes=30) + pd.Timedelta(hours=h)
+                            for d in sessions for h in range(7)]).tz_localize("America/New_York")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.005, len(idx))))
+    volume = rng.integers(1000, 100000, len(idx))
+    return pd.DataFrame({'Open': close, 'High': close * 1.002, 'Low': close * 0.998, 'Close': close,
+                         'Volume': volume}, index=idx.rename("Datetime"))
+
+
+def write_fixtures(root):
+    """ReplayProvider layout: daily and hourly bars for AAA, info/calendar for AAA (stock) and QQQ (ETF)."""
+    daily = random_walk(2500, 11).rename_axis("Date")
+    daily['Volume'] = np.arange(len(daily), dtype=np.int64) + 1000
+    hourly = intraday_walk(400, 12)
+    for interval, df in [("1d", daily), ("1h", hourly)]:
+        os.makedirs(os.path.join(root, interval), exist_ok=True)
+        df.to_csv(os.path.join(root, interval, "AAA.csv"))
+    os.makedirs(os.path.join(root, "info"), exist_ok=True)
+    records = {
+        "AAA": {"info": {"quoteType": "EQUITY", "sector": "Technology", "trailingPE": 21.5, "marketCap": 123456789},
+                "calendar": {"Earnings Date": ["2024-05-01", "2024-05-06"], "Earnings Average": 1.25}},
+        "QQQ": {"info": {"quoteType": "ETF", "longName": "Invesco QQQ Trust"}, "calendar": {}},
+    }
+    for ticker, record in records.items():
+        with open(os.path.join(root, "info", f"{ticker}.json"), "w") as f:
+            json.dump(record, f)
+
+
+class CountingReplay(ReplayProvider):
+    """ReplayProvider that counts calls per method, optionally going through the BarCache."""
+
+    def __init__(self, root, cacheable=False, batch_quotes=False, failures=0):
+        super().__init__(root)
+        self.cacheable = cacheable
+        self.batch_quotes = batch_quotes
+        self.failures = failures  # latest_price raises this many times before answering
+        self.calls = {}
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def fetch_bars(self, ticker, start=None, end=None, period="max", interval="1d"):
+        self._count('fetch_bars')
+        return super().fetch_bars(ticker, start, end, period, interval)
+
+    def latest_price(self, ticker):
+        self._count('latest_price')
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("simulated timeout")
+        return super().latest_price(ticker)
+
+    def latest_prices(self, tickers):
+        self._count('latest_prices')
+        return super().latest_prices(tickers)
+
+    def metadata(self, ticker):
+        self._count('metadata')
+        return super().metadata(ticker)
+
+    def earnings_calendar(self, ticker):
+        self._count('earnings_calendar')
+        return super().earnings_calendar(ticker)
+
+
+def check_bar_cache(root, provider, interval, steps):
+    """Grow the cache through `steps` [(start, end)] and compare every result to a fresh fetch."""
+    cache = BarCache(root=os.path.join(root, "cache"))
+    ranges = []
+
+    def fetch(s, e):
+        ranges.append((s, e))
+        return provider.fetch_bars("AAA", s, e, interval=interval)
+
+    for start, end in steps:
+        ranges.clear()
+        got = cache.get("AAA", interval, fetch, start=start, end=end)
+        expected = provider.fetch_bars("AAA", start, end, interval=interval)
+        pd.testing.assert_frame_equal(got, expected, check_freq=False)
+        on_disk = cache.read("AAA", interval, start, end)
+        pd.testing.assert_frame_equal(on_disk, expected, check_freq=False)
+        # Only the missing head/tail was requested, never the range already cached
+        assert len(ranges) <= 2, f"{interval} {start}..{end}: fetched {ranges}"
+    assert not [f for f in os.listdir(os.path.join(root, "cache", interval)) if f.endswith(".tmp")]
+    return cache
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as root:
+        fixtures = os.path.join(root, "fixtures")
+        write_fixtures(fixtures)
+        provider = CountingReplay(fixtures)
+
+        # (a) BarCache: a cached range extended at the head and the tail equals a fresh full fetch
+        daily_steps = [("2004-01-01", "2005-01-01"), ("2003-06-01", "2005-01-01"), ("2003-06-01", "2006-06-01"),
+                       ("2002-01-01", "2007-01-01"), ("2004-03-01", "2004-04-01"), (None, None)]
+        cache = check_bar_cache(root, provider, "1d", daily_steps)
+        hourly_steps = [("2023-06-01", "2023-09-01"), ("2023-02-01", "2023-12-01"), (None, "2024-03-20"), (None, None)]
+        check_bar_cache(root, provider, "1h", hourly_steps)
+        df, meta = cache.load("AAA", "1h")
+        assert str(df.index.tz) == "America/New_York" and meta['complete_head']
+        # Within max_age an open-ended request is served from disk
+        before = provider.calls['fetch_bars']
+        cache.get("AAA", "1d", lambda s, e: provider.fetch_bars("AAA", s, e), start="2005-01-01")
+        assert provider.calls['fetch_bars'] == before
+        print(f"OK: BarCache head/tail extensions identical to a fresh fetch ({len(daily_steps)} daily, "
+              f"{len(hourly_steps)} hourly steps, no temp files left)")
+
+        # Atomic replace: a write that fails midway leaves the previous file untouched
+        path = cache._path("AAA", "1d")
+        with open(path, "rb") as f:
+            saved = f.read()
+        savez = np.savez
+        np.savez = lambda f, **arrays: (f.write(b"partial"), 1 / 0)
+        try:
+            cache.write("AAA", "1d", cache.read("AAA", "1d").iloc[:10], {})
+            raise AssertionError("write should have failed")
+        except ZeroDivisionError:
+            pass
+        finally:
+            np.savez = savez
+        with open(path, "rb") as f:
+            assert f.read() == saved
+        assert not [f for f in os.listdir(os.path.dirname(path)) if f.endswith(".tmp")]
+        print("OK: failed BarCache write leaves the cached file intact")
+
+        # get_stock_data(start_date=...) without end_date, with and without the BarCache
+        data_provider._bar_cache = BarCache(root=os.path.join(root, "gsd_cache"))
+        full = provider.fetch_bars("AAA", interval="1d")
+        for cacheable in (False, True):
+            data_provider.set_provider(CountingReplay(fixtures, cacheable=cacheable))
+            got = data_provider.get_stock_data("AAA", start_date="2005-03-01")
+            pd.testing.assert_frame_equal(got, full[full.index >= "2005-03-01"], check_freq=False)
+            got = data_provider.get_stocks_data(["AAA"], start_date="2006-01-01", end_date="2007-01-01")["AAA"]
+            pd.testing.assert_frame_equal(got, full[(full.index >= "2006-01-01") & (full.index < "2007-01-01")],
+                                          check_freq=False)
+        print("OK: get_stock_data/get_stocks_data honor start_date with and without end_date")
+
+        # (b) ResampleCache: incremental appends equal a full resample of the final history
+        hourly = provider.fetch_bars("AAA", interval="1h")
+        final = hourly.copy()
+        # A revised trailing bar arrives again in the next chunk with a new High
+        revised_at = 1000
+        final.iloc[revised_at, final.columns.get_loc('High')] *= 1.01
+        rc = ResampleCache()
+        rc.set_base("AAA", hourly.iloc[:300])
+        for timeframe in TIMEFRAMES:
+            rc.get("AAA", timeframe)
+        cuts = [300, 301, 520, 521, 700, revised_at + 1, 1400, 1401, 2100, len(final)]
+        for lo, hi in zip(cuts[:-1], cuts[1:]):
+            source = hourly if hi == revised_at + 1 else final
+            # Like get_resampled_data: each chunk starts at the last known base bar
+            rc.append("AAA", source.iloc[lo - 1:hi])
+            merged = source.iloc[:hi]
+            for timeframe in TIMEFRAMES:
+                pd.testing.assert_frame_equal(rc.get("AAA", timeframe), resample_bars(merged, timeframe),
+                                              check_freq=False)
+        pd.testing.assert_frame_equal(rc.base("AAA"), final)
+        print(f"OK: ResampleCache after {len(cuts) - 1} appends identical to a full resample for "
+              f"{', '.join(TIMEFRAMES)}")
+
+        # (c) MetadataCache: info/calendar types survive the JSON file, TTLs gate refetches
+        meta_root = os.path.join(root, "metadata")
+        provider = CountingReplay(fixtures)
+        mc = MetadataCache(lambda: provider, root=meta_root, field_ttls={'trailingPE': 0})
+        info, calendar = mc.info("AAA"), mc.calendar("AAA")
+        assert all(isinstance(d, datetime.date) for d in calendar["Earnings Date"])
+        reloaded = MetadataCache(lambda: provider, root=meta_root, field_ttls={'trailingPE': 0})
+        info2, calendar2 = reloaded.info("AAA", fields=['sector']), reloaded.calendar("AAA")
+        assert info2 == info and calendar2 == calendar
+        for a, b in [(info, info2), (calendar, calendar2)]:
+            assert {k: type(v) for k, v in a.items()} == {k: type(v) for k, v in b.items()}
+        assert [type(d) for d in calendar2["Earnings Date"]] == [type(d) for d in calendar["Earnings Date"]]
+        assert provider.calls == {'metadata': 1, 'earnings_calendar': 1}
+        reloaded.info("AAA", fields=['sector', 'trailingPE'])  # trailingPE expires immediately
+        assert provider.calls['metadata'] == 2
+        reloaded.calendar_ttl = 0
+        reloaded.calendar("AAA")
+        assert provider.calls['earnings_calendar'] == 2
+        reloaded.prefetch(["AAA", "QQQ"], fields=['sector'], calendar=True)
+        assert reloaded.calendar("QQQ") == {}
+        assert provider.calls['metadata'] == 3 and provider.calls['earnings_calendar'] == 3  # AAA only (ETF skipped)
+        print("OK: metadata/calendar types identical after a JSON reload; field and calendar TTLs respected")
+
+        # QuoteService: TTL, retry on errors only, batched quotes, token bucket
+        provider = CountingReplay(fixtures, failures=2)
+        quotes = QuoteService(lambda: provider, ttl=0.2, backoff=0.01)
+        last = float(full['Close'].iloc[-1])
+        assert quotes.get("AAA") == last and provider.calls['latest_price'] == 3
+        assert quotes.get("AAA") == last and provider.calls['latest_price'] == 3
+        time.sleep(0.25)
+        assert quotes.get("AAA") == last and provider.calls['latest_price'] == 4
+        t = time.perf_counter()
+        assert quotes.get("NOPE") == 0.0
+        assert provider.calls['latest_price'] == 5 and time.perf_counter() - t < 0.05, "missing price was retried"
+
+        provider = CountingReplay(fixtures, batch_quotes=True)
+        quotes = QuoteService(lambda: provider, batch_min=20)
+        tickers = ["AAA"] + [f"X{i:02d}" for i in range(24)]
+        prices = quotes.get_many(tickers)
+        assert prices["AAA"] == last and all(prices[t] == 0.0 for t in tickers[1:])
+        # One batched request, then the 24 tickers it missed one by one
+        assert provider.calls['latest_prices'] == 1 and provider.calls['latest_price'] == len(tickers) + 24
+
+        rate, n = 200.0, 400
+        provider = CountingReplay(fixtures)
+        quotes = QuoteService(lambda: provider, rate=rate)
+        t = time.perf_counter()
+        quotes.get_many([f"Y{i:03d}" for i in range(n)])
+        elapsed = time.perf_counter() - t
+        # The bucket starts full (int(rate) tokens), then refills at `rate` per second
+        assert elapsed >= (n - rate) / rate * 0.95, f"{n} quotes in {elapsed:.2f}s at {rate}/s"
+        print(f"OK: QuoteService TTL, error-only retries, batched quotes; {n} quotes at {rate:.0f}/s took {elapsed:.2f}s")
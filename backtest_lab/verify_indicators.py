@@ -8,7 +8,7 @@ import yfinance as yf
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(''), '..')))
 
-from core.indicators import TechnicalIndicators
+from core.indicator_cache import cached_indicators
 from core.data_provider import get_stock_data
 
 # 1. Get Data
@@ -19,8 +19,7 @@ df = get_stock_data(ticker, start_date="2023-01-01")
 
 # 2. Calculate Indicators
 print("Calculating indicators...")
-df = TechnicalIndicators.add_ladder_indicator(df)
-df = TechnicalIndicators.add_bottom_fishing_indicator(df)
+df = cached_indicators(ticker, "1d", df)
 
 # 3. Plotting
 print("Plotting...")
@@ -0,0 +1,406 @@
+import sys
+import os
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Keep the indicator cache used by run_complex_strategy out of data_cache/
+os.environ.setdefault("STOCK_DATA_CACHE", tempfile.mkdtemp())
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.strategies import TQQQ_DCA_Plus
+from core.harness import JIT_ENABLED
+from core.indicator_cache import cached_indicators
+from tqqq_backtest import TQQQStrategy
+from march_may_backtest import run_complex_strategy
+from verify_bottom_fishing import random_walk
+
+
+def reference_dca_plus(self, df):
+    """Original iterrows loop of TQQQ_DCA_Plus.run."""
+    cash = self.initial_cash
+    peak_cash = cash
+    shares = 0
+    lots = []
+    equity = []
+
+    max_equity = cash
+    curr_dd = 0
+
+    base_invest_ratio = 0.01
+    invest_period = 20
+    day_count = 0
+
+    for date, row in df.iterrows():
+        price = row['Close']
+        high = row['High']
+
+        # Only trade and inject cash after trading_start_date
+        if not self._should_trade(date):
+            # Buffer period: just track equity at initial cash
+            equity.append(self.initial_cash)
+            continue
+
+        cash, _ = self._inject_monthly_cash(date, cash)
+
+        # Update Stats
+        stock_val = shares * price
+        total_val = cash + stock_val
+
+        if cash > peak_cash: peak_cash = cash
+        if total_val > max_equity:
+            max_equity = total_val
+            curr_dd = 0
+            is_ath = True
+        else:
+            curr_dd = (max_equity - total_val) / max_equity
+            is_ath = False
+
+        # 1. Take Profit (3x)
+        new_lots = []
+        for lot in lots:
+            if high >= lot['tp_price']:
+                # Sell
+                cash += lot['shares'] * lot['tp_price']
+                shares -= lot['shares']
+            else:
+                new_lots.append(lot)
+        lots = new_lots
+
+        # 2. Invest
+        day_count += 1
+        if day_count >= invest_period:
+            day_count = 0
+            dd_mult = 1 + (curr_dd * 2)
+            amt = peak_cash * base_invest_ratio * dd_mult
+            if cash >= amt:
+                buy_shares = amt / price
+                cash -= amt
+                shares += buy_shares
+                lots.append({'shares': buy_shares, 'tp_price': price * 3.0})
+
+        # 3. Rebalance (ATH & > 60% Alloc)
+        alloc = (shares * price) / total_val if total_val > 0 else 0
+        if is_ath and alloc > 0.60:
+            target = total_val * 0.40
+            sell_val = (shares * price) - target
+            if sell_val > 0:
+                sell_shares = sell_val / price
+                cash += sell_val
+                shares -= sell_shares
+                # Remove from lots (FIFO) logic omitted for brevity, simplified:
+                # Just reduce total shares. Lots logic breaks here in simple version.
+                # For full version, we'd need strict lot tracking.
+                # Let's keep it simple: Rebalance just converts equity to cash.
+
+        equity.append(cash + (shares * price))
+
+    df['Equity'] = equity
+    return df
+
+
+class ReferenceTQQQStrategy(TQQQStrategy):
+    def run(self, price_data: pd.DataFrame, invest_period_days=20):
+        """Original iterrows loop of TQQQStrategy.run."""
+        days_counter = 0
+
+        for date, row in price_data.iterrows():
+            price = row['Close']
+            # High is safer for TP, but data might have splits/issues.
+            # Using Close for TP is safer for backtest to avoid "ghost" spikes.
+            # But strategy says "挂出的卖单", implying limit orders. Limit orders get filled at High.
+            # Let's use High for checking TP hit, but execute at TP Price.
+            high = row['High']
+
+            # 1. Update Portfolio Value (Mark to Market)
+            stock_value = self.shares * price
+            self.portfolio_value = self.cash + stock_value
+
+            # Update Peak Stats & Drawdown
+            if self.cash > self.peak_cash:
+                self.peak_cash = self.cash
+
+            is_new_high = False
+            if self.portfolio_value > self.max_equity:
+                self.max_equity = self.portfolio_value
+                self.current_drawdown = 0.0
+                is_new_high = True
+            else:
+                if self.max_equity > 0:
+                    self.current_drawdown = (self.max_equity - self.portfolio_value) / self.max_equity
+                else:
+                    self.current_drawdown = 0.0
+
+            # 2. Check Take Profit (TP) for individual lots
+            remaining_lots = []
+            for lot in self.lots:
+                # If High price crossed our TP target
+                if high >= lot['tp_price']:
+                    # Sell this lot
+                    # Logic: We sell at TP price (Limit Order filled)
+                    sell_price = lot['tp_price']
+                    proceeds = lot['shares'] * sell_price
+
+                    self.cash += proceeds
+                    self.shares -= lot['shares']
+
+                    # Log trade
+                    self.history.append({
+                        'date': date,
+                        'action': 'SELL_TP',
+                        'price': sell_price,
+                        'shares': lot['shares'],
+                        'value': proceeds,
+                        'reason': f"Hit TP (Entry: {lot['price']:.2f})"
+                    })
+                else:
+                    remaining_lots.append(lot)
+            self.lots = remaining_lots
+
+            # Recalculate stock value after TP sales
+            stock_value = self.shares * price
+            self.portfolio_value = self.cash + stock_value
+
+            # 3. Regular Investment (Buy) - "每个周期...买入"
+            days_counter += 1
+            if days_counter >= invest_period_days:
+                days_counter = 0
+
+                # Calculate Buy Amount
+                # "最大持有过的现金数 × 系数 × 随回撤提升的倍率"
+                dd_mult = self.calculate_drawdown_multiplier(self.current_drawdown)
+                buy_amount = self.peak_cash * self.base_invest_ratio * dd_mult
+
+                # Check if we have enough cash
+                if self.cash >= buy_amount:
+                    shares_to_buy = buy_amount / price
+                    self.cash -= buy_amount
+                    self.shares += shares_to_buy
+
+                    self.lots.append({
+                        'price': price,
+                        'shares': shares_to_buy,
+                        'tp_price': price * self.profit_target_multiple
+                    })
+
+                    self.history.append({
+                        'date': date,
+                        'action': 'BUY_DCA',
+                        'price': price,
+                        'shares': shares_to_buy,
+                        'value': buy_amount,
+                        'reason': f"Periodic (DD:{self.current_drawdown:.1%}, M:{dd_mult:.1f})"
+                    })
+
+            # 4. Rebalancing Logic (Sell on Highs)
+            # "如果达到新高，且仓位高于60%，则提前清理挂出的卖单，减仓至40%"
+            current_allocation = stock_value / self.portfolio_value if self.portfolio_value > 0 else 0
+
+            if is_new_high and current_allocation > self.rebalance_threshold:
+                target_equity = self.portfolio_value * self.rebalance_target
+                target_stock_val = target_equity
+
+                # Amount to sell to reach 40% allocation
+                sell_amount = stock_value - target_stock_val
+
+                if sell_amount > 0:
+                    shares_to_sell = sell_amount / price
+
+                    self.cash += sell_amount
+                    self.shares -= shares_to_sell
+
+                    # FIFO Removal from lots
+                    # We just remove shares from the front of the list (oldest lots)
+                    shares_removed = 0
+                    new_lots = []
+                    for lot in self.lots:
+                        if shares_removed >= shares_to_sell:
+                            new_lots.append(lot)
+                            continue
+
+                        shares_in_lot = lot['shares']
+                        needed = shares_to_sell - shares_removed
+
+                        if shares_in_lot > needed:
+                            # Partial reduce
+                            lot['shares'] -= needed
+                            shares_removed += needed
+                            new_lots.append(lot)
+                        else:
+                            # Full consume
+                            shares_removed += shares_in_lot
+                            # Lot dropped
+
+                    self.lots = new_lots
+
+                    self.history.append({
+                        'date': date,
+                        'action': 'SELL_REBAL',
+                        'price': price,
+                        'shares': shares_to_sell,
+                        'value': sell_amount,
+                        'reason': f"ATH Rebalance (Alloc: {current_allocation:.1%})"
+                    })
+
+            # Record daily stats
+            self.equity_curve.append({
+                'Date': date,
+                'Equity': self.portfolio_value,
+                'Cash': self.cash,
+                'StockValue': stock_value,
+                'Drawdown': self.current_drawdown,
+                'Allocation': current_allocation,
+                'Price': price
+            })
+
+        return pd.DataFrame(self.equity_curve).set_index('Date')
+
+
+def reference_complex(df, ticker):
+    """Original iterrows loop of run_complex_strategy."""
+    df = cached_indicators(ticker, "4h", df, n1=26, n2=89)
+    cash = 100000
+    shares = 0
+    trades = []
+    equity = []
+
+    # States: 'NEUTRAL', 'BOTTOM_SEEN', 'INVESTED'
+    state = 'NEUTRAL'
+    bottom_seen_price = 0
+
+    # We might want to expire the 'BOTTOM_SEEN' signal if price makes a new low?
+    # Or just keep it valid until we buy.
+    # Let's say valid until a Buy happens or price drops significantly below the bottom signal low (Stop Loss logic on signal).
+    # For now, keep simple: Valid until Buy.
+
+    for date, row in df.iterrows():
+        price = row['Close']
+
+        # Check Indicators
+        is_bottom = row['bottom_fishing_signal'] == 1
+        above_yellow = price > row['ladder_yellow_top']
+        below_blue = price < row['ladder_blue_bottom']
+
+        if state == 'NEUTRAL':
+            if is_bottom:
+                state = 'BOTTOM_SEEN'
+                bottom_seen_price = price
+                trades.append({'date': date, 'action': 'SIGNAL', 'price': price, 'type': 'Bottom Found'})
+
+        elif state == 'BOTTOM_SEEN':
+            # We have seen a bottom, waiting for Yellow Breakout
+
+            # If another bottom signal comes, update reference? (Optional)
+            if is_bottom:
+                 trades.append({'date': date, 'action': 'SIGNAL', 'price': price, 'type': 'Bottom Again'})
+
+            if above_yellow:
+                # BUY!
+                shares = cash / price
+                cash = 0
+                state = 'INVESTED'
+                trades.append({'date': date, 'action': 'BUY', 'price': price, 'type': 'Yellow Breakout'})
+
+        elif state == 'INVESTED':
+            # Sell logic
+            if below_blue:
+                # SELL!
+                cash = shares * price
+                shares = 0
+                state = 'NEUTRAL' # Reset to Neutral, need new Bottom signal to enter again?
+                # User query implies: "抄底...再有超过黄色梯子".
+                # Usually after selling, we might just trade the Ladder (Trend)?
+                # Or strictly need a new Bottom signal?
+                # Let's assume strict: Need new Bottom to restart the cycle.
+                # Or maybe just Neutral -> Yellow Breakout is enough in Bull market?
+                # User said: "本来就是要先有抄底...再有超过黄色梯子". implied dependency.
+                trades.append({'date': date, 'action': 'SELL', 'price': price, 'type': 'Blue Breakdown'})
+
+        # Record Equity
+        curr_val = cash + (shares * price)
+        equity.append(curr_val)
+
+    df['Equity'] = equity
+    return df, trades
+
+
+def trending_walk(n, seed, vol):
+    """Random walk with drift, so 3x take-profits and ATH rebalances actually happen."""
+    df = random_walk(n, seed, vol)
+    drift = np.exp(np.arange(n) * 0.0006)
+    for col in ('Open', 'High', 'Low', 'Close'):
+        df[col] = df[col] * drift
+    return df
+
+
+if __name__ == "__main__":
+    print(f"Kernel backend: {'numba' if JIT_ENABLED else 'pure Python'}")
+    cases = []
+    for seed, (n, vol) in enumerate([(200, 0.02), (1500, 0.03), (5000, 0.04)] * 2):
+        df = trending_walk(n, seed, vol)
+        start = None if seed % 2 == 0 else df.index[n // 4]
+        cases.append((df, start))
+
+    for df, start in cases:
+        ref = reference_dca_plus(TQQQ_DCA_Plus(trading_start_date=start), df.copy())['Equity'].values
+        new = TQQQ_DCA_Plus(trading_start_date=start).run(df.copy())['Equity'].values
+        assert np.array_equal(ref, new), f"TQQQ_DCA_Plus mismatch ({len(df)} bars)"
+    print(f"OK: {len(cases)} cases, TQQQ_DCA_Plus equity identical to the loop")
+
+    actions = {}
+    for df, _ in cases:
+        for params in [{}, {'profit_target_multiple': 1.5, 'rebalance_threshold': 0.3, 'rebalance_target': 0.2},
+                       {'drawdown_coefficient': 5.0}]:
+            ref_strategy, new_strategy = ReferenceTQQQStrategy(**params), TQQQStrategy(**params)
+            # Two consecutive runs: state (cash, lots, curve) carries over
+            half = len(df) // 2
+            for part in (df.iloc[:half], df.iloc[half:]):
+                ref, new = ref_strategy.run(part, invest_period_days=10), new_strategy.run(part, invest_period_days=10)
+            pd.testing.assert_frame_equal(ref, new, check_exact=True)
+            assert ref_strategy.history == new_strategy.history
+            assert ref_strategy.lots == new_strategy.lots
+            assert (ref_strategy.cash, ref_strategy.shares) == (new_strategy.cash, new_strategy.shares)
+            for h in new_strategy.history:
+                actions[h['action']] = actions.get(h['action'], 0) + 1
+    print(f"OK: TQQQStrategy curves, trade history and lots identical ({actions})")
+
+    # Hundreds of open lots: daily buys, far TP, frequent partial FIFO reductions
+    df = trending_walk(4000, 11, 0.03)
+    params = {'base_invest_ratio': 0.002, 'profit_target_multiple': 2.0, 'rebalance_threshold': 0.5, 'rebalance_target': 0.45}
+    ref_strategy, new_strategy = ReferenceTQQQStrategy(**params), TQQQStrategy(**params)
+    t = time.perf_counter(); ref = ref_strategy.run(df, invest_period_days=1); t_ref = time.perf_counter() - t
+    t = time.perf_counter(); new = new_strategy.run(df, invest_period_days=1); t_new = time.perf_counter() - t
+    pd.testing.assert_frame_equal(ref, new, check_exact=True)
+    assert ref_strategy.history == new_strategy.history and ref_strategy.lots == new_strategy.lots
+    print(f"OK: lot book with {len(new_strategy.lots)} open lots identical "
+          f"({len(new_strategy.history)} trades, loop {t_ref * 1e3:.0f} ms, kernel {t_new * 1e3:.0f} ms)")
+
+    n_trades = 0
+    for i, (df, _) in enumerate(cases):
+        ref, ref_trades = reference_complex(df.copy(), f"RW{i}")
+        new, new_trades = run_complex_strategy(df.copy(), f"RW{i}")
+        assert np.array_equal(ref['Equity'].values, new['Equity'].values)
+        assert ref_trades == new_trades
+        # Without a ticker the indicators are computed without the cache
+        plain, plain_trades = run_complex_strategy(df.copy())
+        assert np.array_equal(plain['Equity'].values, new['Equity'].values) and plain_trades == new_trades
+        # Appended bars extend the cached file from the state saved by the full compute
+        run_complex_strategy(df.iloc[:-50].copy(), f"RW_EXT{i}")
+        extended, extended_trades = run_complex_strategy(df.copy(), f"RW_EXT{i}")
+        assert np.array_equal(extended['Equity'].values, new['Equity'].values) and extended_trades == new_trades
+        n_trades += len(new_trades)
+    print(f"OK: run_complex_strategy equity and {n_trades} trade events identical")
+
+    df = trending_walk(20000, 1, 0.03)
+    for name, ref_fn, new_fn in [
+        ("TQQQ_DCA_Plus", lambda: reference_dca_plus(TQQQ_DCA_Plus(), df.copy()), lambda: TQQQ_DCA_Plus().run(df.copy())),
+        ("TQQQStrategy", lambda: ReferenceTQQQStrategy().run(df), lambda: TQQQStrategy().run(df)),
+        ("run_complex_strategy", lambda: reference_complex(df.copy(), "RW_BIG"), lambda: run_complex_strategy(df.copy(), "RW_BIG")),
+    ]:
+        new_fn()  # warm up (JIT compile, indicator cache)
+        t = time.perf_counter(); ref_fn(); t_ref = time.perf_counter() - t
+        t = time.perf_counter(); new_fn(); t_new = time.perf_counter() - t
+        print(f"{name} {len(df)} bars: iterrows {t_ref * 1e3:.0f} ms, kernel {t_new * 1e3:.1f} ms ({t_ref / t_new:.0f}x)")
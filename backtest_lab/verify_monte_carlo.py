@@ -0,0 +1,84 @@
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.strategies import BuyAndHold, SimpleDCA, MA200Strategy, DavidStrategy
+from core.monte_carlo import BlockBootstrap, JumpDiffusion, MonteCarlo
+from verify_bottom_fishing import random_walk
+
+STRATEGIES = (BuyAndHold, SimpleDCA, MA200Strategy, DavidStrategy)
+
+
+def history(n, seed):
+    """Random walk with drift, intrabar ranges and a few crashes."""
+    df = random_walk(n, seed, 0.03)
+    rng = np.random.default_rng(seed)
+    jumps = np.where(rng.random(n) < 0.002, -0.15, 0.0)
+    close = df['Close'].to_numpy() * np.exp(np.cumsum(jumps + 0.0012))
+    df['Close'] = close
+    df['High'] = close * (1 + rng.uniform(0, 0.03, n))
+    df['Low'] = close * (1 - rng.uniform(0, 0.03, n))
+    return df
+
+
+if __name__ == "__main__":
+    df = history(2500, 3)
+    start = df.index[300]
+
+    # Batched equity on every path == single-path run() of the same bars
+    for generator in (BlockBootstrap(df, block=15), JumpDiffusion.fit(df, n_bars=1500)):
+        paths = generator.sample(25, np.random.default_rng(1))
+        for cls in STRATEGIES:
+            strategy = cls(trading_start_date=start)
+            batch = strategy.simulate_paths(paths, generator.index, strategy._contribution_schedule(generator.index))
+            for i in range(len(batch)):
+                frame = pd.DataFrame({field: values[i] for field, values in paths.items()}, index=generator.index)
+                expected = cls(trading_start_date=start).run(frame)['Equity'].to_numpy()
+                err = np.max(np.abs(batch[i] - expected) / expected)
+                assert err < 1e-9, f"{type(generator).__name__} {cls.__name__} path {i}: rel err {err:.2e}"
+        print(f"OK: {type(generator).__name__} batched equity matches per-path run() for {len(STRATEGIES)} strategies")
+
+    # Bootstrap paths are made of historical blocks
+    boot = BlockBootstrap(df, block=10)
+    paths = boot.sample(50, np.random.default_rng(2))
+    steps = np.diff(np.log(paths['Close']), axis=1)
+    ratios = paths['High'][:, 1:] / paths['Close'][:, 1:]
+    for drawn, source in ((steps, boot.returns), (ratios, boot.high_ratio)):
+        source = np.sort(source)
+        pos = np.clip(np.searchsorted(source, drawn), 1, len(source) - 1)
+        nearest = np.minimum(np.abs(drawn - source[pos - 1]), np.abs(drawn - source[pos]))
+        assert nearest.max() < 1e-9
+    print("OK: bootstrap steps and intrabar ranges come from the history")
+
+    # Jump diffusion: E[S_T] = S_0 exp(mu T), jumps included
+    jd = JumpDiffusion(mu=0.08, sigma=0.25, jump_rate=3, jump_mean=-0.08, jump_std=0.05, n_bars=253)
+    close = jd.sample(200000, np.random.default_rng(3))['Close'][:, -1]
+    mean, stderr = close.mean(), close.std() / np.sqrt(len(close))
+    assert abs(mean - 100 * np.exp(0.08)) < 4 * stderr, (mean, 100 * np.exp(0.08), stderr)
+    fitted = JumpDiffusion.fit(df)
+    print(f"OK: jump diffusion mean terminal price {mean:.2f} (expected {100 * np.exp(0.08):.2f}); "
+          f"fit on history: mu={fitted.mu:.3f} sigma={fitted.sigma:.3f} jumps/yr={fitted.jump_rate:.2f}")
+
+    # Chunking only changes how paths are grouped
+    mc = MonteCarlo([MA200Strategy(trading_start_date=start)], n_paths=300, chunk_size=300, seed=5)
+    whole = mc.run(BlockBootstrap(df))
+    assert len(whole) == 300 and whole['path'].is_unique
+    assert whole['max_drawdown'].between(0, 1).all() and np.isfinite(whole['cagr']).all()
+
+    # 10k paths, ten years each
+    df = history(2520, 4)
+    strategies = [cls(trading_start_date=df.index[252]) for cls in STRATEGIES]
+    for generator in (BlockBootstrap(df), JumpDiffusion.fit(df)):
+        mc = MonteCarlo(strategies, n_paths=10000, chunk_size=1000)
+        t = time.perf_counter()
+        mc.run(generator)
+        elapsed = time.perf_counter() - t
+        print(f"\n{type(generator).__name__}: 10000 paths x {len(generator.index)} bars x {len(strategies)} strategies "
+              f"in {elapsed:.1f}s")
+        with pd.option_context('display.width', 200, 'display.max_columns', None):
+            print(mc.summary().round(3))
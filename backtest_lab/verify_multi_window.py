@@ -0,0 +1,64 @@
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.indicators import (_ewm_sweep, _SWEEP_MIN_SERIES, ema_sweep, sma_multi, dema_multi,
+                             calculate_ema, calculate_sma, calculate_dema)
+from verify_bottom_fishing import random_walk
+
+
+def gappy_walk(n, seed):
+    """Close series with NaN bars, including a leading one."""
+    close = random_walk(n, seed)['Close'].copy()
+    close.iloc[[0, 40, 41, n // 2]] = np.nan
+    return close
+
+
+if __name__ == "__main__":
+    close = gappy_walk(400, 1)
+    values = close.to_numpy()
+
+    # _ewm_sweep: alpha and span parameter sets, narrow (pandas ewm) and wide (recursion) paths
+    windows = list(range(2, 62))
+    params = [{'alpha': 1 / w} for w in windows] + [{'span': w} for w in windows]
+    min_periods = windows + windows
+    narrow = np.column_stack([values, values[::-1]])
+    wide = np.column_stack([gappy_walk(400, seed).to_numpy() for seed in range(_SWEEP_MIN_SERIES // len(params) + 1)])
+    for name, flat in [("narrow", narrow), ("wide", wide)]:
+        assert (len(params) * flat.shape[1] >= _SWEEP_MIN_SERIES) == (name == "wide")
+        got = _ewm_sweep(flat, params, min_periods=min_periods)
+        frame = pd.DataFrame(flat)
+        for k, (p, mp) in enumerate(zip(params, min_periods)):
+            ref = frame.ewm(adjust=False, min_periods=mp, **p).mean().to_numpy()
+            assert np.array_equal(got[k], ref, equal_nan=True), f"_ewm_sweep {name} {p} mismatch"
+    print(f"OK: _ewm_sweep identical to pandas ewm for {len(params)} alpha/span sets on the narrow and wide paths")
+
+    # ema_sweep / dema_multi on one series: few windows run pandas ewm, thousands run the recursion
+    short = values[:200]
+    for name, spans in [("narrow", [30, 60]), ("wide", list(range(2, _SWEEP_MIN_SERIES + 2)))]:
+        ema = ema_sweep(short, spans)
+        dema = dema_multi(short, spans)
+        s = pd.Series(short)
+        for k, span in enumerate(spans):
+            assert np.array_equal(ema[k], calculate_ema(s, span).to_numpy(), equal_nan=True), f"ema_sweep {name} {span}"
+            assert np.array_equal(dema[k], calculate_dema(s, span).to_numpy(), equal_nan=True), f"dema_multi {name} {span}"
+    print(f"OK: ema_sweep/dema_multi identical to calculate_ema/calculate_dema for 2 and {_SWEEP_MIN_SERIES} windows")
+
+    sma = sma_multi(close, [5, 20, 50, 200])
+    for k, w in enumerate([5, 20, 50, 200]):
+        assert np.array_equal(sma[k], calculate_sma(close, w).to_numpy(), equal_nan=True), f"sma_multi {w}"
+    print("OK: sma_multi identical to calculate_sma")
+
+    close = random_walk(5000, 3)['Close']
+    spans = list(range(5, 95, 5))
+    t = time.perf_counter(); dema_multi(close, spans); t_multi = time.perf_counter() - t
+    t = time.perf_counter()
+    for span in spans:
+        calculate_dema(close, span)
+    t_loop = time.perf_counter() - t
+    print(f"5000 bars x {len(spans)} DEMA windows: dema_multi {t_multi * 1000:.1f} ms, per-window calculate_dema {t_loop * 1000:.1f} ms")
@@ -0,0 +1,113 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.indicators import (TechnicalIndicators, panel_ladder, panel_macd, ema_sweep, ladder_sweep, calculate_ema,
+                             LADDER_COLUMNS, MACD_COLUMNS)
+from core.data_provider import to_panel
+from core.engine import IndicatorEngine, clear_memo, memo_stats, _memo
+from verify_bottom_fishing import random_walk
+
+
+def universe(n_tickers, n_bars, seed=0):
+    """Random tickers with staggered IPO dates on a shared calendar."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(n_tickers):
+        df = random_walk(n_bars, seed * 1000 + i)
+        data[f"T{i:03d}"] = df.iloc[int(rng.integers(0, n_bars // 2)):]
+    return data
+
+
+if __name__ == "__main__":
+    data = universe(50, 800)
+    high, low, close = (to_panel(data, f) for f in ('High', 'Low', 'Close'))
+    out = panel_ladder(high, low, close)
+    out.update(panel_macd(close))
+    for ticker, df in data.items():
+        ref = TechnicalIndicators.add_bottom_fishing_indicator(TechnicalIndicators.add_ladder_indicator(df))
+        for col in LADDER_COLUMNS + MACD_COLUMNS:
+            got = out[col][ticker].loc[df.index].values.astype(float)
+            assert np.array_equal(got, ref[col].values.astype(float)), f"{col} mismatch for {ticker}"
+    # 2D arrays in, 2D arrays out
+    arr = panel_ladder(high.values, low.values, close.values)
+    assert np.array_equal(arr['ladder_blue_top'], out['ladder_blue_top'].values, equal_nan=True)
+    print(f"OK: panel ladder/MACD identical to per-ticker results for {len(data)} NaN-padded tickers")
+
+    data = universe(500, 500, seed=1)
+    high, low, close = (to_panel(data, f) for f in ('High', 'Low', 'Close'))
+    clear_memo()
+    t = time.perf_counter()
+    for df in data.values():
+        TechnicalIndicators.add_ladder_indicator(df)
+        IndicatorEngine(df).macd()
+    t_loop = time.perf_counter() - t
+    t = time.perf_counter()
+    panel_ladder(high, low, close)
+    panel_macd(close)
+    t_panel = time.perf_counter() - t
+    print(f"500 tickers x 500 bars: per-ticker {t_loop * 1000:.0f} ms, "
+          f"panel {t_panel * 1000:.0f} ms (ladder + MACD)")
+
+    # Parameter sweeps: one pass over time for every span (and every ticker)
+    spans = [10, 13, 21, 26, 34, 55, 89, 144]
+    sweep = ema_sweep(close, spans)
+    for k, span in enumerate(spans):
+        assert np.array_equal(sweep[k], calculate_ema(close, span).values, equal_nan=True), f"sweep mismatch span {span}"
+    narrow = ema_sweep(close.iloc[:, :20], spans)
+    for k, span in enumerate(spans):
+        assert np.array_equal(narrow[k], calculate_ema(close.iloc[:, :20], span).values, equal_nan=True)
+    df = next(iter(data.values()))
+    grid = ladder_sweep(df, [13, 21, 26], [55, 89])
+    for (n1, n2), cols in grid.items():
+        ref = TechnicalIndicators.add_ladder_indicator(df, n1=n1, n2=n2)
+        for col in LADDER_COLUMNS:
+            assert np.array_equal(cols[col], ref[col].values), f"ladder_sweep mismatch {col} ({n1}, {n2})"
+    print(f"OK: ema_sweep/ladder_sweep identical to pandas ewm for {len(spans)} spans")
+
+    clear_memo()
+    t = time.perf_counter()
+    for span in spans:
+        for ticker in close.columns:
+            calculate_ema(close[ticker], span)
+    t_loop = time.perf_counter() - t
+    t = time.perf_counter()
+    ema_sweep(close, spans)
+    t_sweep = time.perf_counter() - t
+    print(f"{len(spans)} spans x 500 tickers x 500 bars: one ewm per (span, ticker) {t_loop * 1000:.0f} ms, "
+          f"ema_sweep {t_sweep * 1000:.0f} ms")
+
+    # A single series is narrow: the sweep falls back to pandas ewm per span
+    series = random_walk(5000, 3)['Close']
+    many = list(range(5, 95, 5))
+    t = time.perf_counter()
+    for span in many:
+        calculate_ema(series, span)
+    t_loop = time.perf_counter() - t
+    t = time.perf_counter()
+    ema_sweep(series, many)
+    t_sweep = time.perf_counter() - t
+    print(f"{len(many)} spans x 1 series x 5000 bars: ewm per span {t_loop * 1000:.1f} ms, "
+          f"ema_sweep {t_sweep * 1000:.1f} ms")
+
+    # The engine memo is bounded by bytes as well as entries
+    clear_memo()
+    limit = _memo.max_bytes
+    _memo.max_bytes = 2 * 2**20
+    try:
+        long = random_walk(50_000, 4)
+        engine = IndicatorEngine(long)
+        first = engine.ema('Close', 10)
+        for span in range(10, 40):
+            engine.ema('Close', span)
+        stats = memo_stats()
+        assert stats['bytes'] <= _memo.max_bytes and stats['entries'] == _memo.max_bytes // first.nbytes
+        assert np.array_equal(engine.ema('Close', 10), first) and memo_stats()['misses'] == stats['misses'] + 1
+    finally:
+        _memo.max_bytes = limit
+        clear_memo()
+    print(f"OK: engine memo held {stats['entries']} arrays ({stats['bytes'] / 2**20:.1f} MB) under a 2 MB limit")
@@ -0,0 +1,132 @@
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.portfolio import PortfolioBacktest, load_panels
+from core.strategies import MA200Strategy, DavidStrategy
+from verify_bottom_fishing import random_walk
+
+
+def make_universe(n_tickers, n_bars, seed):
+    """{ticker: OHLCV} with staggered listings and a few delistings."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(n_tickers):
+        df = random_walk(n_bars, seed * 1000 + i, rng.uniform(0.01, 0.04))
+        start = int(rng.integers(0, n_bars // 3)) if i % 3 else 0
+        end = int(rng.integers(n_bars // 2, n_bars)) if i % 7 == 3 else n_bars
+        data[f"T{i:03d}"] = df.iloc[start:end]
+    return data
+
+
+def reference_portfolio(bt, panels, strategy):
+    """Bar-by-bar, ticker-by-ticker version of PortfolioBacktest.run."""
+    close = panels['Close'].astype(float).to_numpy()
+    index = panels['Close'].index
+    n_bars, n_tickers = close.shape
+    trading = [strategy._should_trade(d) for d in index]
+    targets = strategy.panel_targets(panels)
+    score = bt._rank_scores(panels['Close'].astype(float)) if bt.max_positions else None
+    inv_vol = bt._inverse_vol(panels['Close'].astype(float)) if bt.weighting == 'inverse_vol' else None
+
+    cash = float(strategy.initial_cash)
+    shares = [0.0] * n_tickers
+    last_price = [0.0] * n_tickers
+    state = [0.0] * n_tickers      # latest non-NaN target
+    members = np.zeros(n_tickers, dtype=bool)
+    prev_qualified = None
+    equity = []
+    for t in range(n_bars):
+        for j in range(n_tickers):
+            if not np.isnan(close[t, j]):
+                last_price[j] = close[t, j]
+        if not trading[t]:
+            equity.append(strategy.initial_cash)
+            continue
+        qualified = np.zeros(n_tickers, dtype=bool)
+        for j in range(n_tickers):
+            if not np.isnan(targets[t, j]):
+                state[j] = targets[t, j]
+            qualified[j] = state[j] == 1 and not np.isnan(close[t, j])
+        cash, contributed = strategy._inject_monthly_cash(index[t], cash)
+        if prev_qualified is None or contributed or (qualified != prev_qualified).any():
+            value = cash + sum(shares[j] * last_price[j] for j in range(n_tickers))
+            members = bt._select(qualified, members, score[t] if score is not None else None)
+            weights = bt._weights(members, inv_vol[t] if inv_vol is not None else None)
+            # Size positions so that they plus the fees fit in the account
+            held = [shares[j] * last_price[j] for j in range(n_tickers)]
+            budget = value
+            for _ in range(100 if bt.commission else 0):
+                nxt = value - bt.commission * sum(abs(budget * weights[j] - held[j]) for j in range(n_tickers))
+                done = abs(nxt - budget) <= 1e-15 * abs(value)
+                budget = nxt
+                if done:
+                    break
+            traded = 0.0
+            for j in range(n_tickers):
+                new = budget * weights[j] / last_price[j] if members[j] else 0.0
+                traded += abs(new - shares[j]) * last_price[j]
+                shares[j] = new
+            cash = value - sum(shares[j] * last_price[j] for j in range(n_tickers)) - bt.commission * traded
+        prev_qualified = qualified
+        equity.append(cash + sum(shares[j] * last_price[j] for j in range(n_tickers)))
+    return np.array(equity)
+
+
+if __name__ == "__main__":
+    # One ticker, no contributions: same as the single-series strategies
+    df = random_walk(3000, 4, 0.03)
+    for cls in (MA200Strategy, DavidStrategy):
+        single = cls(trading_start_date=df.index[500])
+        single.monthly_contribution = 0
+        account = cls(trading_start_date=df.index[500])
+        account.monthly_contribution = 0
+        expected = single.run(df)['Equity'].values
+        got = PortfolioBacktest(account).run(load_panels({'X': df}))['Equity'].values
+        err = np.max(np.abs(got - expected) / expected)
+        assert err < 1e-10, f"{cls.__name__}: rel err {err:.2e}"
+    print("OK: one-ticker portfolio equals MA200/David single-series equity")
+
+    data = make_universe(15, 1200, 1)
+    panels = load_panels(data)
+    configs = [
+        dict(),
+        dict(max_positions=4, commission=0.001),
+        dict(weighting='inverse_vol', max_positions=6, max_weight=0.25),
+    ]
+    for cls in (MA200Strategy, DavidStrategy):
+        for cfg in configs:
+            start = panels['Close'].index[300]
+            bt = PortfolioBacktest(cls(trading_start_date=start), **cfg)
+            got = bt.run(panels)['Equity'].values
+            expected = reference_portfolio(bt, panels, cls(trading_start_date=start))
+            err = np.max(np.abs(got - expected) / expected)
+            assert err < 1e-9, f"{cls.__name__} {cfg}: rel err {err:.2e}"
+            assert (bt.positions.to_numpy() >= 0).all()
+            if cfg.get('max_positions'):
+                assert ((bt.positions > 0).sum(axis=1) <= cfg['max_positions']).all()
+    print(f"OK: {len(configs) * 2} configurations match the bar-by-bar reference (staggered IPOs, delistings)")
+
+    # Fees are paid out of the account, never borrowed
+    panels = load_panels(make_universe(5, 1500, 3))
+    for commission in (0.001, 0.01):
+        for cfg in (dict(), dict(max_positions=2, weighting='inverse_vol')):
+            result = PortfolioBacktest(MA200Strategy(trading_start_date=panels['Close'].index[250]),
+                                       commission=commission, **cfg).run(panels)
+            assert (result['Cash'] >= 0).all(), f"commission={commission} {cfg}: min cash {result['Cash'].min():.2f}"
+    print("OK: cash never negative with commissions")
+
+    for n_tickers, n_bars in [(100, 6000), (500, 6000)]:
+        panels = load_panels(make_universe(n_tickers, n_bars, 2))
+        for cls in (MA200Strategy, DavidStrategy):
+            bt = PortfolioBacktest(cls(), max_positions=20, weighting='inverse_vol')
+            t = time.perf_counter()
+            result = bt.run(panels)
+            elapsed = time.perf_counter() - t
+            print(f"{cls.__name__}: {n_tickers} tickers x {n_bars} bars in {elapsed:.2f}s "
+                  f"(final equity ${result['Equity'].iloc[-1]:,.0f})")
@@ -0,0 +1,109 @@
+import sys
+import os
+import time
+import signal
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.shared_data import SharedDataset, attach
+from core.indicator_cache import CACHED_COLUMNS
+from core.indicators import TechnicalIndicators
+from core.strategies import DavidStrategy
+from verify_bottom_fishing import random_walk
+
+
+def private_mb() -> float:
+    """Private (unshared) resident memory of this process, Linux only."""
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return float('nan')
+    kb = sum(int(fields[k].split()[0]) for k in ("Private_Clean", "Private_Dirty"))
+    return kb / 1024
+
+
+def worker_checksum(handle):
+    """Touch every shared page and report how much private memory that cost."""
+    data = attach(handle)
+    before = private_mb()
+    total = float(data.block.sum())
+    try:
+        data['Close'][0] = 0.0
+        writable = True
+    except ValueError:
+        writable = False
+    return total, private_mb() - before, writable
+
+
+def worker_strategy(handle):
+    data = attach(handle)
+    return DavidStrategy().run(data.frame(['Open', 'High', 'Low', 'Close', 'Volume']))['Equity'].values
+
+
+def segment_exists(name) -> bool:
+    return os.path.exists(os.path.join("/dev/shm", name.lstrip("/")))
+
+
+if __name__ == "__main__":
+    df = random_walk(3000, 5, 0.03)
+    data = SharedDataset.publish(df, indicators=CACHED_COLUMNS)
+    view = attach(data.handle)
+    expected = TechnicalIndicators.indicator_arrays(df, CACHED_COLUMNS)
+    for col in df.columns:
+        assert np.array_equal(view[col], df[col].to_numpy(dtype=float))
+    for col in CACHED_COLUMNS:
+        assert np.array_equal(view[col], expected[col].astype(float), equal_nan=True)
+    assert view.index.equals(df.index)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(worker_strategy, [data.handle] * 2))
+    reference = DavidStrategy().run(df)['Equity'].values
+    assert all(np.array_equal(r, reference) for r in results)
+    data.close()
+    print(f"OK: {len(data.handle['columns'])} columns round-trip, DavidStrategy in workers identical")
+
+    # N workers touching all of a 160 MB dataset
+    # Minute index: 4M business days would run past pandas' Timestamp range
+    n = 4_000_000 // 5 * 5
+    close = 50 * np.exp(np.cumsum(np.random.default_rng(1).normal(0, 0.001, n)))
+    big = pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close, 'Volume': 1e6},
+                       index=pd.date_range("2000-01-03", periods=n, freq="min"))
+    t = time.perf_counter()
+    with SharedDataset.publish(big) as data:
+        publish_s = time.perf_counter() - t
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(worker_checksum, [data.handle] * 4))
+        name = data.handle['name']
+        assert segment_exists(name) or not os.path.isdir("/dev/shm")
+    expected_sum = float(big.to_numpy(dtype=float).sum())
+    assert all(np.isclose(r[0], expected_sum) for r in results)
+    assert not any(r[2] for r in results), "views must be read-only"
+    assert not segment_exists(name), "segment not unlinked on close"
+    print(f"OK: {data.nbytes / 2**20:.0f} MB published in {publish_s * 1e3:.0f} ms; "
+          f"private memory per worker after reading all of it: "
+          f"{', '.join(f'{r[1]:.1f} MB' for r in results)}")
+
+    # Owner killed without cleanup: the resource tracker unlinks the segment
+    code = ("import sys, os, time; sys.path.insert(0, %r)\n"
+            "from core.shared_data import SharedDataset\n"
+            "import numpy as np, pandas as pd\n"
+            "d = SharedDataset(pd.date_range('2020', periods=1000), {'Close': np.ones(1000)})\n"
+            "print(d.handle['name'], flush=True)\n"
+            "time.sleep(60)\n") % os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    proc = subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    name = proc.stdout.readline().strip()
+    assert segment_exists(name) or not os.path.isdir("/dev/shm")
+    proc.send_signal(signal.SIGKILL)
+    proc.wait()
+    for _ in range(50):
+        if not segment_exists(name):
+            break
+        time.sleep(0.1)
+    assert not segment_exists(name), "segment leaked after owner crash"
+    print("OK: segment removed after the owner was killed")
@@ -0,0 +1,93 @@
+import sys
+import os
+import time
+import json
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.indicators import TechnicalIndicators
+from core.streaming import IndicatorState
+from verify_bottom_fishing import random_walk
+
+COLUMNS = ['ladder_blue_top', 'ladder_blue_bottom', 'ladder_yellow_top', 'ladder_yellow_bottom', 'ladder_signal',
+           'DIF', 'DEA', 'MACD', 'bottom_fishing_signal']
+
+
+def batch(df):
+    out = TechnicalIndicators.add_ladder_indicator(df)
+    out = TechnicalIndicators.add_bottom_fishing_indicator(out)
+    out['relaxed_bottom_signal'] = TechnicalIndicators.add_relaxed_bottom_signal(df)['bottom_fishing_signal']
+    return out
+
+
+def stream(df, restart_at):
+    """Seed on the first bars, save/restore through JSON, then stream the rest bar by bar."""
+    state = IndicatorState().seed(df.iloc[:restart_at])
+    rows = [None] * restart_at
+    state = IndicatorState.from_dict(json.loads(json.dumps(state.to_dict())))
+    for ts, bar in df.iloc[restart_at:].iterrows():
+        rows.append(state.update(ts, bar))
+    return rows, state
+
+
+if __name__ == "__main__":
+    cases = [random_walk(n, seed, vol) for seed, (n, vol) in enumerate([(300, 0.01), (2000, 0.03), (3000, 0.05)] * 3)]
+    flat = random_walk(600, 99)
+    flat.iloc[100:160, flat.columns.get_loc('Close')] = flat['Close'].iloc[100]
+    cases.append(flat)
+    gappy = random_walk(800, 42)
+    gappy.iloc[[5, 200, 201, 500], :] = np.nan
+    cases.append(gappy)
+
+    for df in cases:
+        # Full stream from scratch
+        ref = batch(df)
+        state = IndicatorState()
+        got = [state.update(ts, bar) for ts, bar in df.iterrows()]
+        for col in COLUMNS + ['relaxed_bottom_signal']:
+            vals = np.array([g[col] for g in got], dtype=float)
+            assert np.array_equal(vals, ref[col].values.astype(float), equal_nan=True), f"{col} mismatch ({len(df)} bars)"
+
+        # Restart through JSON half way
+        rows, _ = stream(df, len(df) // 2)
+        tail = ref.iloc[len(df) // 2:]
+        for col in COLUMNS + ['relaxed_bottom_signal']:
+            vals = np.array([r[col] for r in rows[len(df) // 2:]], dtype=float)
+            assert np.array_equal(vals, tail[col].values.astype(float), equal_nan=True), f"{col} mismatch after restore"
+    print(f"OK: {len(cases)} cases, streaming outputs identical to batch (including JSON restore)")
+
+    # from_history builds the same state as seed() without a per-bar replay
+    checked = 0
+    for df in cases:
+        for cut in sorted({1, 2, 30, 202, 501, len(df) // 2, len(df)}):
+            if cut > len(df):
+                continue
+            seeded = IndicatorState().seed(df.iloc[:cut]).to_dict()
+            built = IndicatorState.from_history(df.iloc[:cut]).to_dict()
+            # JSON text compares NaNs as equal and tuples / lists alike
+            assert json.dumps(built, sort_keys=True) == json.dumps(seeded, sort_keys=True), f"state mismatch at {cut}"
+            checked += 1
+    print(f"OK: from_history state identical to seed() at {checked} cut points (NaN bars included)")
+
+    df = random_walk(500, 7)
+    state = IndicatorState().seed(df.iloc[:-1])
+    ts, bar = df.index[-1], df.iloc[-1].to_dict()
+    n = 2000
+    t = time.perf_counter()
+    for _ in range(n):
+        state.peek(ts, bar)
+    t_peek = (time.perf_counter() - t) / n
+    t = time.perf_counter()
+    for i in range(n):
+        state.update(ts, bar)
+    t_update = (time.perf_counter() - t) / n
+    t = time.perf_counter(); batch(df); t_batch = time.perf_counter() - t
+    print(f"500-bar ticker: batch recompute {t_batch * 1000:.2f} ms, "
+          f"streaming update {t_update * 1e6:.0f} us, peek {t_peek * 1e6:.0f} us")
+
+    df = random_walk(50000, 8)
+    t = time.perf_counter(); IndicatorState().seed(df); t_seed = time.perf_counter() - t
+    t = time.perf_counter(); IndicatorState.from_history(df); t_hist = time.perf_counter() - t
+    print(f"50000 bars: seed() {t_seed * 1000:.0f} ms, from_history() {t_hist * 1000:.0f} ms")
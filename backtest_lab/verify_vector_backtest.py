@@ -0,0 +1,156 @@
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.strategies import BuyAndHold, SimpleDCA, MA200Strategy, DavidStrategy
+from core.indicators import TechnicalIndicators
+from verify_bottom_fishing import random_walk
+
+
+def reference_buy_and_hold(strategy, df):
+    """Original iterrows loop of BuyAndHold.run."""
+    df = df.copy()
+    cash = strategy.initial_cash
+    shares = 0
+    equity = []
+    for date, row in df.iterrows():
+        price = row['Close']
+        if strategy._should_trade(date):
+            cash, _ = strategy._inject_monthly_cash(date, cash)
+            if cash > 0:
+                shares += cash / price
+                cash = 0
+        else:
+            equity.append(strategy.initial_cash)
+            continue
+        equity.append(shares * price)
+    df['Equity'] = equity
+    return df
+
+
+def reference_dca(strategy, df):
+    """Original iterrows loop of SimpleDCA.run."""
+    df = df.copy()
+    cash = strategy.initial_cash
+    shares = 0
+    equity = []
+    for date, row in df.iterrows():
+        price = row['Close']
+        if strategy._should_trade(date):
+            cash, month_changed = strategy._inject_monthly_cash(date, cash)
+            if month_changed and cash > 0:
+                amount = min(cash, strategy.monthly_invest)
+                if amount > 0:
+                    shares += amount / price
+                    cash -= amount
+            equity.append(cash + (shares * price))
+        else:
+            equity.append(strategy.initial_cash)
+    df['Equity'] = equity
+    return df
+
+
+def reference_ma200(strategy, df):
+    """Original iterrows loop of MA200Strategy.run, kept as the reference."""
+    df = df.copy()
+    df['MA200'] = df['Close'].rolling(window=200).mean()
+    cash = strategy.initial_cash
+    shares = 0
+    equity = []
+    for date, row in df.iterrows():
+        price = row['Close']
+        ma = row['MA200']
+        if not strategy._should_trade(date):
+            equity.append(strategy.initial_cash)
+            continue
+        cash, _ = strategy._inject_monthly_cash(date, cash)
+        if pd.isna(ma):
+            equity.append(cash + (shares * price))
+            continue
+        total_value = cash + (shares * price)
+        if price > ma:
+            shares = total_value / price
+            cash = 0
+        elif price < ma:
+            cash = total_value
+            shares = 0
+        equity.append(cash + (shares * price))
+    df['Equity'] = equity
+    return df
+
+
+def reference_david(strategy, df):
+    """Original iterrows loop of DavidStrategy.run, kept as the reference."""
+    df = TechnicalIndicators.add_ladder_indicator(df)
+    cash = strategy.initial_cash
+    shares = 0
+    equity = []
+    for date, row in df.iterrows():
+        price = row['Close']
+        if not strategy._should_trade(date):
+            equity.append(strategy.initial_cash)
+            continue
+        cash, _ = strategy._inject_monthly_cash(date, cash)
+        blue_top = row['ladder_blue_top']
+        blue_bottom = row['ladder_blue_bottom']
+        if pd.isna(blue_top) or pd.isna(blue_bottom):
+            equity.append(cash + (shares * price))
+            continue
+        if price > blue_top and cash > 0:
+            shares += cash / price
+            cash = 0
+        elif price < blue_bottom and shares > 0:
+            cash += shares * price
+            shares = 0
+        equity.append(cash + (shares * price))
+    df['Equity'] = equity
+    return df
+
+
+if __name__ == "__main__":
+    cases = []
+    for seed, (n, vol) in enumerate([(150, 0.02), (1000, 0.03), (3000, 0.04)] * 3):
+        df = random_walk(n, seed, vol)
+        start = None if seed % 3 == 0 else df.index[n // (seed % 3 + 2)]
+        cases.append((df, start))
+    # MA200 == price exactly: the hold branch with shares and cash both non-zero
+    flat = random_walk(800, 77)
+    flat.iloc[400:520, flat.columns.get_loc('Close')] = flat['Close'].iloc[400]
+    cases.append((flat, None))
+
+    # Closed-form baselines must match exactly, including cash running out under DCA
+    for df, start in cases:
+        for make, ref_fn in [(lambda: BuyAndHold(trading_start_date=start), reference_buy_and_hold),
+                             (lambda: SimpleDCA(trading_start_date=start), reference_dca),
+                             (lambda: SimpleDCA(initial_cash=3000.5, monthly_invest=1500.25, trading_start_date=start), reference_dca)]:
+            ref_strategy, new_strategy = make(), make()
+            ref_strategy.monthly_contribution = new_strategy.monthly_contribution = 1234.56
+            ref = ref_fn(ref_strategy, df)['Equity'].values
+            new = new_strategy.run(df)['Equity'].values
+            assert np.array_equal(ref, new), f"{type(new_strategy).__name__} mismatch ({len(df)} bars)"
+            assert ref_strategy._last_contribution_month == new_strategy._last_contribution_month
+    print(f"OK: {len(cases)} cases, BuyAndHold/SimpleDCA equity exactly equal to the loops")
+
+    # simulate_target_position uses the closed form W = G * (W_0 + cumsum(d / G)), which rounds
+    # differently from the loops' per-bar share/cash updates: equal to rounding, not bit for bit
+    worst = 0.0
+    for df, start in cases:
+        for cls, ref_fn in [(MA200Strategy, reference_ma200), (DavidStrategy, reference_david)]:
+            ref = ref_fn(cls(trading_start_date=start), df)['Equity'].values
+            new = cls(trading_start_date=start).run(df)['Equity'].values
+            err = np.max(np.abs(new - ref) / np.abs(ref))
+            assert err < 1e-10, f"{cls.__name__} mismatch ({len(df)} bars): rel err {err:.2e}"
+            worst = max(worst, err)
+    print(f"OK: {len(cases)} cases, MA200/David equity within rel 1e-10 of the loops (max rel diff {worst:.1e})")
+
+    df = random_walk(5000, 3)
+    for cls, ref_fn in [(BuyAndHold, reference_buy_and_hold), (SimpleDCA, reference_dca),
+                        (MA200Strategy, reference_ma200), (DavidStrategy, reference_david)]:
+        t = time.perf_counter(); ref_fn(cls(), df); t_ref = time.perf_counter() - t
+        t = time.perf_counter(); cls().run(df); t_new = time.perf_counter() - t
+        print(f"{cls.__name__} 5000 bars: loop {t_ref * 1000:.0f} ms, vectorized {t_new * 1000:.1f} ms ({t_ref / t_new:.0f}x)")
@@ -0,0 +1,89 @@
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.strategies import BuyAndHold, SimpleDCA, MA200Strategy, DavidStrategy, TQQQ_DCA_Plus
+from core.walk_forward import WalkForward, walk_forward_windows, window_metrics
+from core.vectorized import month_starts
+from verify_bottom_fishing import random_walk
+
+
+def reference_window(cls, df, params, start, end):
+    """Metrics of a plain run() over the whole prefix, trading from bar start."""
+    strategy = cls(trading_start_date=df.index[start], **params)
+    equity = strategy.run(df.iloc[:end].copy())['Equity'].to_numpy(dtype=float)[start:]
+    index = df.index[start:end]
+    month_start, _ = month_starts(index, np.ones(len(index), dtype=bool))
+    return equity, window_metrics(index, equity, np.where(month_start, float(strategy.monthly_contribution), 0.0))
+
+
+if __name__ == "__main__":
+    df = random_walk(3000, 7, 0.025)
+    index = df.index
+
+    # Window layout
+    rolling = walk_forward_windows(index, 500, 100)
+    assert rolling[0] == (0, 500, 600) and all(b - a == 500 and c - b == 100 for a, b, c in rolling)
+    assert all(rolling[i + 1][1] == rolling[i][2] for i in range(len(rolling) - 1))
+    assert rolling[-1][2] <= len(index) < rolling[-1][2] + 100
+    anchored = walk_forward_windows(index, 500, 100, step=50, anchored=True)
+    assert all(a == 0 for a, _, _ in anchored) and anchored[1][1] - anchored[0][1] == 50
+    dated = walk_forward_windows(index, "3y", "6mo")
+    for a, b, c in dated:
+        assert (a == 0 or index[a - 1] < index[b] - pd.DateOffset(years=3)) and index[b] - pd.DateOffset(years=3) <= index[a]
+        assert index[c - 1] < index[b] + pd.DateOffset(months=6) <= index[c]
+    print(f"OK: window layouts ({len(rolling)} rolling, {len(anchored)} anchored, {len(dated)} dated)")
+
+    # A window of the prepared full history == run() on the prefix with the same trading_start_date
+    cases = [(BuyAndHold, {}), (SimpleDCA, {}), (TQQQ_DCA_Plus, {}),
+             (MA200Strategy, {'window': 100}), (MA200Strategy, {}), (DavidStrategy, {'n1': 13, 'n2': 55})]
+    for cls, params in cases:
+        wf = WalkForward(cls, train=400, test=150)
+        prepared = cls(**params).prepare(df)
+        arrays = cls(**params).target_arrays(prepared)
+        for start, end in [(0, 400), (250, 900), (1700, 2999), (2500, 2650)]:
+            expected, ref = reference_window(cls, df, params, start, end)
+            # Frame slice through run_prepared, and array slices where the strategy has targets
+            for got in [wf.evaluate(prepared, params, start, end), wf.evaluate(prepared, params, start, end, arrays=arrays)]:
+                err = abs(got['final_equity'] - expected[-1]) / expected[-1]
+                assert err < 1e-12, f"{cls.__name__} {params} [{start}:{end}]: rel err {err:.2e}"
+                for key in ('total_return', 'cagr', 'max_drawdown'):
+                    assert abs(got[key] - ref[key]) < 1e-12, (cls.__name__, key)
+    print(f"OK: {len(cases)} strategies, windows of the prepared history match prefix run()s")
+
+    # Chosen parameters are the best train-window ones; test metrics are their prefix runs
+    grid = {'window': [50, 100, 150, 200]}
+    wf = WalkForward(MA200Strategy, param_grid=grid, train=600, test=200)
+    table = wf.run(df)
+    for row, (a, b, c) in zip(table.itertuples(), walk_forward_windows(index, 600, 200)):
+        scores = {w: reference_window(MA200Strategy, df, {'window': w}, a, b)[1]['cagr'] for w in grid['window']}
+        best = max(grid['window'], key=lambda w: scores[w])
+        assert row.window == best and abs(row.train_cagr - scores[best]) < 1e-12
+        assert abs(row.test_cagr - reference_window(MA200Strategy, df, {'window': best}, b, c)[1]['cagr']) < 1e-12
+    assert wf.oos_equity.index[0] == table['test_start'].iloc[0] and wf.oos_equity.index.is_unique
+    print(f"OK: {len(table)} re-optimized windows pick the best train parameters")
+
+    # Hundreds of windows vs one full-history run
+    df = random_walk(6000, 8, 0.02)
+    for cls, grid in [(MA200Strategy, None), (DavidStrategy, None), (MA200Strategy, {'window': [100, 150, 200, 250]})]:
+        t = time.perf_counter()
+        cls().run(df)
+        full = time.perf_counter() - t
+        wf = WalkForward(cls, param_grid=grid, train=252, test=21)
+        t = time.perf_counter()
+        table = wf.run(df)
+        elapsed = time.perf_counter() - t
+        runs = len(table) * (1 + (len(wf.points()) if grid else 0))
+        print(f"{cls.__name__} grid={grid}: {len(table)} windows ({runs} runs) in {elapsed:.2f}s, "
+              f"one full-history run {full * 1000:.1f}ms")
+        if grid is None:
+            # Without prepare(): every window recomputes its indicators over the prefix
+            t = time.perf_counter()
+            for _, b, c in walk_forward_windows(df.index, 252, 21):
+                cls(trading_start_date=df.index[b]).run(df.iloc[:c])
+            print(f"  recomputing indicators per window: {time.perf_counter() - t:.2f}s")
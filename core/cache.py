@@ -0,0 +1,221 @@
+import os
+import json
+import tempfile
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: atomic os.replace still keeps readers consistent
+    fcntl = None
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "STOCK_DATA_CACHE",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data_cache'))
+)
+
+
+def period_offset(period: str) -> pd.DateOffset:
+    """Convert a yfinance style length ("2y", "6mo", "5d", "4h") into a DateOffset."""
+    units = [("mo", "months"), ("wk", "weeks"), ("y", "years"), ("d", "days"), ("h", "hours"), ("m", "minutes")]
+    for suffix, unit in units:
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def period_start(period: str, now: pd.Timestamp = None):
+    """
+    Convert a yfinance style period ("2y", "6mo", "5d", "ytd", "max") into a start Timestamp.
+    Returns None for "max" (full history).
+    """
+    if period is None or period == "max":
+        return None
+    now = (now or pd.Timestamp.now()).normalize()
+    if period == "ytd":
+        return pd.Timestamp(year=now.year, month=1, day=1)
+    return now - period_offset(period)
+
+
+class BarCache:
+    """
+    Persistent columnar OHLCV cache, one file per (ticker, interval).
+
+    Each file is an uncompressed .npz holding the sorted int64 (ns) date index plus one
+    array per column. load() reads the whole file into memory (nothing is memory-mapped)
+    and slicing is a binary search on the index. The cached range is always contiguous: new bars are
+    only ever fetched before the first or after the last cached bar and merged in.
+
+    Writes go to a temp file followed by os.replace, so readers never see a partial
+    file; updates (fetch + merge + write) are serialized across processes with a
+    per-file lock.
+    """
+
+    def __init__(self, root: str = None, max_age: float = 15 * 60):
+        """
+        Args:
+            root (str): Cache directory (default: $STOCK_DATA_CACHE or ./data_cache).
+            max_age (float): Seconds after a fetch during which an open-ended request
+                is served from disk without asking the provider for new tail bars.
+        """
+        self.root = root or DEFAULT_CACHE_DIR
+        self.max_age = max_age
+
+    def _path(self, ticker: str, interval: str) -> str:
+        return os.path.join(self.root, interval, f"{ticker.upper()}.npz")
+
+    @contextmanager
+    def lock(self, ticker: str, interval: str):
+        """Exclusive inter-process lock for updating one (ticker, interval) file."""
+        path = self._path(ticker, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".lock", "a") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def load(self, ticker: str, interval: str):
+        """
+        Load the cached frame and its metadata.
+
+        Returns:
+            (pd.DataFrame, dict) or (None, None) if nothing is cached.
+        """
+        path = self._path(ticker, interval)
+        if not os.path.exists(path):
+            return None, None
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            index = _to_index(data['index'], meta.get('tz'), meta.get('index_name'), meta.get('unit', 'ns'))
+            columns = {col: data[f"col_{i}"] for i, col in enumerate(meta['columns'])}
+        return pd.DataFrame(columns, index=index), meta
+
+    def read(self, ticker: str, interval: str, start=None, end=None) -> pd.DataFrame:
+        """Return cached bars in [start, end) using binary search on the sorted index."""
+        df, _ = self.load(ticker, interval)
+        if df is None:
+            return None
+        return _slice(df, start, end)
+
+    def write(self, ticker: str, interval: str, df: pd.DataFrame, meta: dict):
+        """Atomically replace the cached file for (ticker, interval)."""
+        path = self._path(ticker, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        index = df.index
+        meta = dict(meta, columns=list(df.columns), index_name=index.name, unit=index.unit,
+                    tz=str(index.tz) if index.tz is not None else None)
+        arrays = {f"col_{i}": df[col].to_numpy() for i, col in enumerate(df.columns)}
+        arrays['index'] = index.as_unit('ns').asi8
+        arrays['meta'] = np.array(json.dumps(meta))
+
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def plan(self, ticker: str, interval: str, start=None, end=None, df: pd.DataFrame = None, meta: dict = None):
+        """
+        Return the (start, end) ranges that must be fetched to serve [start, end).
+
+        At most two ranges are returned: a head range before the first cached bar and a
+        tail range from the last cached bar (re-fetched, it may have been incomplete).
+        """
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        if df is None:
+            df, meta = self.load(ticker, interval)
+        if df is None or df.empty:
+            return [(start, end)]
+
+        first, last = df.index[0], df.index[-1]
+        ranges = []
+
+        # Head: requested range starts before what we have
+        if not meta.get('complete_head'):
+            if start is None:
+                ranges.append((None, _naive(first)))
+            elif _localize(start, df.index.tz) < first:
+                ranges.append((start, _naive(first)))
+
+        # Tail
+        if end is not None:
+            need_tail = _localize(end, df.index.tz) > last
+        else:
+            need_tail = time.time() - meta.get('fetched_at', 0) > self.max_age
+        if need_tail:
+            ranges.append((_naive(last), end))
+        return ranges
+
+    def get(self, ticker: str, interval: str, fetch, start=None, end=None) -> pd.DataFrame:
+        """
+        Serve [start, end) from the cache, fetching only the missing head/tail bars.
+
+        Args:
+            fetch (callable): fetch(start, end) -> DataFrame. start=None means full history,
+                end=None means up to now.
+            start: Start of the requested range, None for full history.
+            end: Exclusive end of the requested range, None for "up to now".
+        """
+        with self.lock(ticker, interval):
+            df, meta = self.load(ticker, interval)
+            ranges = self.plan(ticker, interval, start, end, df=df, meta=meta)
+            if not ranges:
+                return _slice(df, start, end)
+
+            meta = dict(meta or {})
+            parts = [] if df is None else [df]
+            for s, e in ranges:
+                parts.append(fetch(s, e))
+                if s is None:
+                    meta['complete_head'] = True
+                if e is None:
+                    meta['fetched_at'] = time.time()
+
+            parts = [p for p in parts if p is not None and not p.empty]
+            if not parts:
+                return df if df is not None else pd.DataFrame()
+            merged = pd.concat(parts) if len(parts) > 1 else parts[0]
+            merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+            self.write(ticker, interval, merged, meta)
+
+        return _slice(merged, start, end)
+
+
+def _to_index(values: np.ndarray, tz, name=None, unit: str = 'ns') -> pd.DatetimeIndex:
+    # Stored as ns; restore the resolution the bars were fetched with (pandas 3 parses to us)
+    index = pd.DatetimeIndex(values.view('M8[ns]'), name=name).as_unit(unit)
+    if tz is not None:
+        index = index.tz_localize('UTC').tz_convert(tz)
+    return index
+
+
+def _localize(ts: pd.Timestamp, tz) -> pd.Timestamp:
+    if tz is None:
+        return ts.tz_localize(None) if ts.tz is not None else ts
+    return ts.tz_localize(tz) if ts.tz is None else ts.tz_convert(tz)
+
+
+def _naive(ts: pd.Timestamp) -> pd.Timestamp:
+    return ts.tz_localize(None) if ts.tz is not None else ts
+
+
+def _slice(df: pd.DataFrame, start=None, end=None) -> pd.DataFrame:
+    """Slice [start, end) by binary search on the (sorted) index."""
+    if df is None or df.empty:
+        return df
+    values = df.index.as_unit('ns').asi8
+    lo = 0 if start is None else np.searchsorted(values, _localize(pd.Timestamp(start), df.index.tz).as_unit('ns').value, side='left')
+    hi = len(values) if end is None else np.searchsorted(values, _localize(pd.Timestamp(end), df.index.tz).as_unit('ns').value, side='left')
+    return df.iloc[lo:hi]
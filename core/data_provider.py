@@ -1,56 +1,176 @@
-import yfinance as yf
 import pandas as pd
 
-def get_stock_data(ticker: str, start_date: str = None, end_date: str = None, period: str = "max") -> pd.DataFrame:
+from .cache import BarCache, period_start
+from .providers import DataProvider, YFinanceProvider
+from .quotes import QuoteService
+from .metadata import MetadataCache
+
+_bar_cache = BarCache()
+_provider = YFinanceProvider()
+_quotes = QuoteService(lambda: _provider)
+_metadata = MetadataCache(lambda: _provider)
+
+def set_provider(provider: DataProvider):
+    """Swap the data source (e.g. a ReplayProvider for offline, deterministic runs)."""
+    global _provider
+    _provider = provider
+    _quotes.invalidate()
+
+def get_provider() -> DataProvider:
+    return _provider
+
+def _download(ticker: str, start=None, end=None, period: str = "max", interval: str = "1d") -> pd.DataFrame:
+    return _provider.fetch_bars(ticker, start, end, period, interval)
+
+def _download_many(tickers: list, start=None, end=None, period: str = "max", interval: str = "1d",
+                   chunk_size: int = None) -> dict:
+    return _provider.fetch_bars_many(tickers, start, end, period, interval, chunk_size=chunk_size)
+
+def _date_range(start_date, end_date, period):
+    """(start, end) of a request: start_date (with an open end if end_date is None), else the last period."""
+    if start_date:
+        return start_date, end_date
+    return period_start(period), None
+
+def get_stock_data(ticker: str, start_date: str = None, end_date: str = None, period: str = "max",
+                   interval: str = "1d", use_cache: bool = True) -> pd.DataFrame:
     """
-    Fetch historical stock data using yfinance.
+    Fetch historical stock data from the active provider (yfinance by default).
+    
+    Bars are served from the on-disk BarCache (core/cache.py); only bars missing from
+    the cache (usually just the tail since the last run) are downloaded.
     
     Args:
         ticker (str): Stock symbol (e.g., "TQQQ").
         start_date (str): Start date in "YYYY-MM-DD" format.
-        end_date (str): End date in "YYYY-MM-DD" format.
-        period (str): Period to fetch if dates are not provided (default "max").
+        end_date (str): End date in "YYYY-MM-DD" format (None: up to the latest bar).
+        period (str): Period to fetch if start_date is not provided (default "max").
+        interval (str): Bar interval (default "1d").
+        use_cache (bool): Read/update the local cache (default True).
         
     Returns:
         pd.DataFrame: DataFrame with Date index and columns [Open, High, Low, Close, Volume].
     """
     print(f"Fetching data for {ticker}...")
-    if start_date and end_date:
-        df = yf.download(ticker, start=start_date, end=end_date, progress=False)
+    start, end = _date_range(start_date, end_date, period)
+
+    if use_cache and _provider.cacheable:
+        fetch = lambda s, e: _download(ticker, s, e, interval=interval)
+        df = _bar_cache.get(ticker, interval, fetch, start=start, end=end)
+    elif start_date:
+        df = _download(ticker, start_date, end_date, interval=interval)
     else:
-        df = yf.download(ticker, period=period, progress=False)
+        df = _download(ticker, period=period, interval=interval)
         
-    if df.empty:
+    if df is None or df.empty:
         print(f"Warning: No data found for {ticker}")
-        return df
-
-    # Standardize columns
-    # yfinance sometimes returns multi-level columns if multiple tickers, but here we assume one.
-    if isinstance(df.columns, pd.MultiIndex):
-        # Flatten multi-index columns if they exist (e.g. ('Close', 'TQQQ') -> 'Close')
-        # Keep only the Price column names
-        try:
-            df.columns = df.columns.droplevel(1)
-        except:
-            pass
+        return pd.DataFrame() if df is None else df
     
     return df
 
+def get_stocks_data(tickers: list, start_date: str = None, end_date: str = None, period: str = "max",
+                    interval: str = "1d", chunk_size: int = None, use_cache: bool = True) -> dict:
+    """
+    Fetch historical data for many tickers with a handful of batched requests.
+    
+    With the cache enabled, tickers are grouped by the range each one is missing
+    (usually the same tail since the last run), and every group is downloaded in
+    chunks of chunk_size tickers per request.
+    
+    Args:
+        tickers (list): Stock symbols.
+        start_date (str): Start date in "YYYY-MM-DD" format.
+        end_date (str): End date in "YYYY-MM-DD" format (None: up to the latest bar).
+        period (str): Period to fetch if start_date is not provided (default "max").
+        interval (str): Bar interval (default "1d").
+        chunk_size (int): Max tickers per download request (provider default if None).
+        use_cache (bool): Read/update the local cache (default True).
+        
+    Returns:
+        dict: {ticker: DataFrame with columns [Open, High, Low, Close, Volume]}.
+              Tickers without data are omitted.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    print(f"Fetching data for {len(tickers)} tickers...")
+    start, end = _date_range(start_date, end_date, period)
+
+    if not (use_cache and _provider.cacheable):
+        if start_date:
+            data = _download_many(tickers, start_date, end_date, interval=interval, chunk_size=chunk_size)
+        else:
+            data = _download_many(tickers, period=period, interval=interval, chunk_size=chunk_size)
+    else:
+        # Group tickers by the (start, end) range missing from their cache
+        groups = {}
+        for ticker in tickers:
+            for rng in _bar_cache.plan(ticker, interval, start, end):
+                groups.setdefault(rng, []).append(ticker)
+
+        fetched = {}
+        for (s, e), group in groups.items():
+            for ticker, df in _download_many(group, s, e, interval=interval, chunk_size=chunk_size).items():
+                fetched[(ticker, s, e)] = df
+
+        data = {}
+        for ticker in tickers:
+            def fetch(s, e, ticker=ticker):
+                key = (ticker, s, e)
+                if key in fetched:
+                    return fetched[key]
+                # Cache changed since planning (e.g. another process updated it)
+                return _download(ticker, s, e, interval=interval)
+            df = _bar_cache.get(ticker, interval, fetch, start=start, end=end)
+            if df is not None and not df.empty:
+                data[ticker] = df
+
+    missing = [t for t in tickers if t not in data]
+    if missing:
+        print(f"Warning: No data found for {missing}")
+    return data
+
+def to_panel(data: dict, field: str = "Close") -> pd.DataFrame:
+    """
+    Align one field of a {ticker: DataFrame} dict into a wide (dates x tickers) panel.
+    Dates missing for a ticker (e.g. before its IPO) are NaN.
+    """
+    return pd.DataFrame({ticker: df[field] for ticker, df in data.items()}).sort_index()
+
 def get_current_price(ticker: str) -> float:
     """
     Get the latest available price for a ticker.
+    Quotes are cached for a few seconds (see core/quotes.py).
     """
-    ticker_obj = yf.Ticker(ticker)
-    # Try to get fast info first (faster)
-    try:
-        price = ticker_obj.fast_info['last_price']
-        return price
-    except:
-        pass
-        
-    # Fallback to history
-    df = ticker_obj.history(period="1d")
-    if not df.empty:
-        return df['Close'].iloc[-1]
-    return 0.0
+    return _quotes.get(ticker)
+
+def get_current_prices(tickers: list) -> dict:
+    """
+    Get the latest prices for many tickers concurrently.
+    
+    Returns:
+        dict: {ticker: price}, 0.0 for tickers that could not be quoted.
+    """
+    return _quotes.get_many(tickers)
+
+def get_ticker_info(ticker: str, fields: list = None) -> dict:
+    """
+    Ticker fundamentals (yfinance Ticker.info), served from the metadata cache.
+    
+    Args:
+        ticker (str): Stock symbol.
+        fields (list): Fields the caller needs; the cached dict is reused while it is
+            younger than the shortest TTL among them (see core/metadata.py).
+    """
+    if not _provider.cacheable:
+        return _provider.metadata(ticker)
+    return _metadata.info(ticker, fields)
+
+def get_earnings_calendar(ticker: str) -> dict:
+    """Earnings calendar (yfinance Ticker.calendar), served from the metadata cache."""
+    if not _provider.cacheable:
+        return _provider.earnings_calendar(ticker)
+    return _metadata.calendar(ticker)
 
+def prefetch_metadata(tickers: list, fields: list = None, calendar: bool = False):
+    """Concurrently refresh stale info (and optionally calendar) entries for many tickers."""
+    if _provider.cacheable:
+        _metadata.prefetch(tickers, fields, calendar)
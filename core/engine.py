@@ -0,0 +1,154 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def fingerprint(values: np.ndarray) -> str:
+    """Content hash of an array (dtype, length and bytes)."""
+    values = np.ascontiguousarray(values)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str((values.dtype.str, values.shape)).encode())
+    h.update(values.tobytes())
+    return h.hexdigest()
+
+
+class _LRUMemo:
+    """
+    Small LRU map of computed arrays, bounded by entry count and by the total nbytes
+    of the stored arrays (a few long histories would otherwise pin hundreds of MB).
+    Stored arrays are read-only so callers cannot corrupt them.
+    """
+
+    def __init__(self, maxsize: int = 256, max_bytes: int = 256 * 2**20):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _arrays(value) -> tuple:
+        return value if isinstance(value, tuple) else (value,)
+
+    def get_or_compute(self, key, fn):
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+        self.misses += 1
+        value = fn()
+        for arr in self._arrays(value):
+            arr.flags.writeable = False
+        self._data[key] = value
+        self.nbytes += sum(arr.nbytes for arr in self._arrays(value))
+        # Evict least recently used entries; the new one is kept even if it alone exceeds max_bytes
+        while len(self._data) > 1 and (len(self._data) > self.maxsize or self.nbytes > self.max_bytes):
+            _, evicted = self._data.popitem(last=False)
+            self.nbytes -= sum(arr.nbytes for arr in self._arrays(evicted))
+        return value
+
+    def clear(self):
+        self._data.clear()
+        self.nbytes = 0
+        self.hits = self.misses = 0
+
+
+_memo = _LRUMemo()
+
+
+class Indicator:
+    """
+    Declarative indicator node.
+
+    Args:
+        name (str): Output column name.
+        inputs (tuple): OHLCV columns the indicator reads (part of the memo key).
+        params (dict): Parameter names and defaults (part of the memo key).
+        fn (callable): fn(engine, **params) -> np.ndarray, may call other engine nodes.
+    """
+
+    def __init__(self, name: str, inputs: tuple, params: dict, fn):
+        self.name = name
+        self.inputs = inputs
+        self.params = params
+        self.fn = fn
+
+
+INDICATORS = {}
+
+
+def register_indicator(name: str, inputs: tuple, params: dict = None):
+    """Decorator registering fn(engine, **params) as the indicator `name`."""
+    def wrap(fn):
+        INDICATORS[name] = Indicator(name, tuple(inputs), dict(params or {}), fn)
+        return fn
+    return wrap
+
+
+class IndicatorEngine:
+    """
+    Indicator graph over one OHLCV frame.
+
+    Intermediates (EMAs, SMAs, DIF/DEA/MACD) and registered outputs are memoized
+    process-wide by (operation, content fingerprint of the input columns, parameters),
+    so the scanner and every strategy that look at the same bars share one EMA12,
+    one EMA(High, 26), etc., even when each works on its own copy of the frame.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._fps = {}
+
+    def values(self, column: str) -> np.ndarray:
+        return self.df[column].to_numpy(dtype=float)
+
+    def fp(self, column: str) -> str:
+        if column not in self._fps:
+            self._fps[column] = fingerprint(self.values(column))
+        return self._fps[column]
+
+    # --- shared intermediates ---
+
+    def ema(self, column: str, span: int) -> np.ndarray:
+        return _memo.get_or_compute(
+            ('ema', self.fp(column), span),
+            lambda: pd.Series(self.values(column)).ewm(span=span, adjust=False).mean().to_numpy())
+
+    def sma(self, column: str, window: int) -> np.ndarray:
+        return _memo.get_or_compute(
+            ('sma', self.fp(column), window),
+            lambda: pd.Series(self.values(column)).rolling(window=window).mean().to_numpy())
+
+    def macd(self, fast: int = 12, slow: int = 26, signal: int = 9) -> tuple:
+        """(DIF, DEA, MACD) of Close."""
+        def compute():
+            dif = self.ema('Close', fast) - self.ema('Close', slow)
+            dea = pd.Series(dif).ewm(span=signal, adjust=False).mean().to_numpy()
+            return dif, dea, (dif - dea) * 2
+        return _memo.get_or_compute(('macd', self.fp('Close'), fast, slow, signal), compute)
+
+    # --- registered outputs ---
+
+    def get(self, name: str, **params) -> np.ndarray:
+        """One registered output; unknown params are ignored so callers can pass a shared set."""
+        if name not in INDICATORS:
+            raise KeyError(f"Unknown indicator '{name}' (registered: {sorted(INDICATORS)})")
+        ind = INDICATORS[name]
+        kwargs = {k: params.get(k, default) for k, default in ind.params.items()}
+        key = ('out', name, tuple(self.fp(c) for c in ind.inputs), tuple(sorted(kwargs.items())))
+        return _memo.get_or_compute(key, lambda: np.asarray(ind.fn(self, **kwargs)))
+
+    def compute(self, names: list, **params) -> pd.DataFrame:
+        """Several outputs in one call, as a DataFrame aligned to the input index."""
+        return pd.DataFrame({name: self.get(name, **params) for name in names}, index=self.df.index)
+
+
+def memo_stats() -> dict:
+    return {'hits': _memo.hits, 'misses': _memo.misses, 'entries': len(_memo._data), 'bytes': _memo.nbytes}
+
+
+def clear_memo():
+    _memo.clear()
@@ -0,0 +1,53 @@
+"""
+Array harness for strategies whose state does not vectorize (open lots, state machines).
+
+Such a strategy writes its bar loop as a kernel: a plain function that walks input
+arrays and fills preallocated output arrays, using only numbers and NumPy arrays
+(no dicts, Series or other Python objects). By default the function runs as ordinary
+Python, which is still far cheaper than building a Series per bar with iterrows().
+
+Set STOCK_JIT=1 (with numba installed) to compile kernels with numba instead. The JIT
+path is opt-in until it is exercised: run backtest_lab/verify_kernels.py with
+STOCK_JIT=1 to check it against the reference loops before relying on it.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import numba
+except ImportError:  # Optional: kernels run as plain Python
+    numba = None
+
+JIT_ENABLED = numba is not None and os.environ.get("STOCK_JIT", "0") == "1"
+
+
+def kernel(fn):
+    """
+    Compile fn with numba.njit when STOCK_JIT=1 and numba is installed, else return it unchanged.
+
+    Kernels are compiled without fastmath, so they round exactly like the Python
+    loop they replace.
+    """
+    if not JIT_ENABLED:
+        return fn
+    return numba.njit(cache=True, nogil=True)(fn)
+
+
+def bar_arrays(df: pd.DataFrame, *columns: str) -> list:
+    """
+    Columns of df as contiguous float64 arrays, ready to pass to a kernel.
+
+    On the pure-Python path the arrays are converted to lists: indexing a list
+    yields Python floats, which is several times faster than NumPy scalar access
+    and gives the same IEEE results.
+    """
+    arrays = [np.ascontiguousarray(df[col].to_numpy(dtype=float)) for col in columns]
+    return arrays if JIT_ENABLED else [a.tolist() for a in arrays]
+
+
+def kernel_input(values, dtype=float):
+    """Any extra per-bar input (masks, contributions) prepared like bar_arrays."""
+    arr = np.ascontiguousarray(np.asarray(values, dtype=dtype))
+    return arr if JIT_ENABLED else arr.tolist()
@@ -0,0 +1,171 @@
+import os
+import json
+import hashlib
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .cache import DEFAULT_CACHE_DIR
+from .engine import fingerprint
+from .indicators import TechnicalIndicators, LADDER_COLUMNS, MACD_COLUMNS
+from .streaming import IndicatorState
+
+CACHED_COLUMNS = LADDER_COLUMNS + MACD_COLUMNS + ['bottom_fishing_signal', 'relaxed_bottom_signal']
+
+# Modules whose source defines the cached numbers; editing any of them invalidates the cache
+_CODE_MODULES = ['indicators.py', 'engine.py', 'primitives.py', 'streaming.py']
+_code_version = None
+
+
+def code_version() -> str:
+    """Hash of the indicator source files."""
+    global _code_version
+    if _code_version is None:
+        h = hashlib.blake2b(digest_size=8)
+        for name in _CODE_MODULES:
+            with open(os.path.join(os.path.dirname(__file__), name), 'rb') as f:
+                h.update(f.read())
+        _code_version = h.hexdigest()
+    return _code_version
+
+
+def _bars_fingerprint(df: pd.DataFrame, n: int) -> str:
+    return fingerprint(df[['High', 'Low', 'Close']].to_numpy(dtype=float)[:n])
+
+
+class IndicatorCache:
+    """
+    On-disk cache of the ladder / MACD / bottom-fishing columns, one .npz per
+    (ticker, interval, parameters).
+
+    A file is reused when the indicator code version matches and the requested bars
+    start with the cached bars (same timestamps, same fingerprint). All but the last
+    cached bar are treated as final: if bars were appended, or only the last bar was
+    revised, the cached columns are extended from the saved streaming state
+    (core/streaming.py) instead of being recomputed.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root or os.path.join(DEFAULT_CACHE_DIR, "indicators")
+
+    def _path(self, ticker: str, interval: str, params: dict) -> str:
+        key = hashlib.blake2b(json.dumps(params, sort_keys=True).encode(), digest_size=6).hexdigest()
+        return os.path.join(self.root, interval, f"{ticker.upper()}_{key}.npz")
+
+    def _load(self, path: str):
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                columns = {col: data[f"col_{i}"] for i, col in enumerate(CACHED_COLUMNS)}
+                index = data['index']
+        except (OSError, ValueError, KeyError):
+            return None
+        return index, columns, meta
+
+    def _write(self, path: str, index: np.ndarray, columns: dict, meta: dict):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        arrays = {f"col_{i}": np.asarray(columns[col]) for i, col in enumerate(CACHED_COLUMNS)}
+        arrays['index'] = index
+        arrays['meta'] = np.array(json.dumps(meta))
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def get(self, ticker: str, interval: str, df: pd.DataFrame, n1=26, n2=89, lookback=30) -> pd.DataFrame:
+        """
+        Indicator columns (CACHED_COLUMNS) for df, computing only what the cache lacks.
+
+        Args:
+            ticker (str): Ticker the bars belong to.
+            interval (str): Bar interval ("1d", "4h", ...).
+            df (pd.DataFrame): OHLC bars with a DatetimeIndex.
+            n1, n2 (int): Ladder spans.
+            lookback (int): Relaxed bottom signal window.
+
+        Returns:
+            pd.DataFrame: Indicator columns aligned to df.index.
+        """
+        params = {'n1': n1, 'n2': n2, 'lookback': lookback}
+        path = self._path(ticker, interval, params)
+        index = df.index.as_unit('ns').asi8
+        cached = self._load(path)
+
+        if cached is not None:
+            cached_index, columns, meta = cached
+            n = len(cached_index)
+            final = meta['final']
+            usable = (meta['version'] == code_version() and meta['params'] == params
+                      and n <= len(df) and np.array_equal(index[:final], cached_index[:final])
+                      and _bars_fingerprint(df, final) == meta['final_fingerprint'])
+            if usable and n == len(df) and index[-1] == cached_index[-1] \
+                    and _bars_fingerprint(df, n) == meta['fingerprint']:
+                return pd.DataFrame(columns, index=df.index)
+            if usable:
+                return self._extend(path, df, index, columns, meta, params)
+
+        arrays = TechnicalIndicators.indicator_arrays(df, CACHED_COLUMNS, **params)
+        # Save the state at the last final bar, so the next call can extend from it
+        final = max(len(df) - 1, 0)
+        self._save(path, df, index, arrays, params, state=IndicatorState.from_history(df.iloc[:final], **params))
+        return pd.DataFrame(arrays, index=df.index)
+
+    def _extend(self, path, df, index, columns, meta, params):
+        """Append outputs for the bars after the last final cached bar."""
+        final = meta['final']
+        if meta['state'] is not None:
+            state = IndicatorState.from_dict(meta['state'])
+        else:
+            # Files written before the state was saved on every compute
+            state = IndicatorState.from_history(df.iloc[:final], **params)
+        high, low, close = (df[c].to_numpy(dtype=float) for c in ('High', 'Low', 'Close'))
+        rows = []
+        for i in range(final, len(df)):
+            bar = {'High': high[i], 'Low': low[i], 'Close': close[i]}
+            # The newest bar may still change: evaluate it without committing
+            rows.append(state.update(df.index[i], bar) if i < len(df) - 1 else state.peek(df.index[i], bar))
+        arrays = {col: np.concatenate([columns[col][:final], np.array([r[col] for r in rows], dtype=columns[col].dtype)])
+                  for col in CACHED_COLUMNS}
+        self._save(path, df, index, arrays, params, state=state)
+        return pd.DataFrame(arrays, index=df.index)
+
+    def _save(self, path, df, index, arrays, params, state):
+        final = max(len(df) - 1, 0)
+        meta = {
+            'version': code_version(),
+            'params': params,
+            'final': final,
+            'final_fingerprint': _bars_fingerprint(df, final),
+            'fingerprint': _bars_fingerprint(df, len(df)),
+            'state': state.to_dict() if state is not None else None,
+        }
+        self._write(path, index, arrays, meta)
+
+
+_indicator_cache = IndicatorCache()
+
+
+def cached_indicators(ticker: str, interval: str, df: pd.DataFrame, n1=26, n2=89, lookback=30, out=None) -> pd.DataFrame:
+    """
+    Ladder, MACD and bottom-fishing columns for df through the default IndicatorCache,
+    added to a copy of df (out=None) or written into out (e.g. out=df).
+    ticker=None computes the columns without touching the cache.
+    """
+    if ticker is None:
+        result = pd.DataFrame(TechnicalIndicators.indicator_arrays(df, CACHED_COLUMNS, n1=n1, n2=n2, lookback=lookback),
+                              index=df.index)
+    else:
+        result = _indicator_cache.get(ticker, interval, df, n1=n1, n2=n2, lookback=lookback)
+    if out is None:
+        out = df.copy()
+    for col in CACHED_COLUMNS:
+        out[col] = result[col].values
+    return out
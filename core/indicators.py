@@ -2,152 +2,424 @@ import pandas as pd
 import numpy as np
 from scipy.signal import argrelextrema
 
+from .primitives import BARSLAST, LLV, REF
+from .engine import IndicatorEngine, register_indicator
+
 def calculate_ema(series, span):
     return series.ewm(span=span, adjust=False).mean()
 
+def calculate_sma(series, window):
+    return series.rolling(window=window).mean()
+
+def calculate_rsi(series, window):
+    """RSI from simple moving averages of gains and losses (legacy utils.calculate_rsi)."""
+    delta = series.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+def calculate_wilder_rsi(series, window):
+    """Wilder's RSI: gains and losses smoothed with EMA(alpha=1/window) (legacy calculate_rsi_David)."""
+    delta = series.diff()
+    gain = delta.clip(lower=0)
+    loss = -delta.clip(upper=0)
+    ema_gain = gain.ewm(alpha=1/window, adjust=False, min_periods=window).mean()
+    ema_loss = loss.ewm(alpha=1/window, adjust=False, min_periods=window).mean()
+    rs = ema_gain / ema_loss
+    return 100 - (100 / (1 + rs))
+
+def calculate_dema(series, window):
+    """Double EMA: 2 * EMA - EMA(EMA) (legacy calculate_dema_David)."""
+    ema = series.ewm(span=window, adjust=False).mean()
+    return 2 * ema - ema.ewm(span=window, adjust=False).mean()
+
 def bars_last(condition_series):
-    res = np.full(len(condition_series), np.nan)
-    last_idx = -1
-    vals = condition_series.values
-    for i in range(len(vals)):
-        if vals[i]:
-            last_idx = i
-        if last_idx != -1:
-            res[i] = i - last_idx
-    return pd.Series(res, index=condition_series.index)
+    return BARSLAST(condition_series)
+
+LADDER_COLUMNS = ['ladder_blue_top', 'ladder_blue_bottom', 'ladder_yellow_top', 'ladder_yellow_bottom', 'ladder_signal']
+MACD_COLUMNS = ['DIF', 'DEA', 'MACD']
+
+def _emit(df: pd.DataFrame, arrays: dict, out):
+    """
+    Deliver indicator arrays: added to a copy of df (out=None), written into a caller
+    frame (out=df for in place), or into a preallocated (len(df), len(arrays)) buffer.
+    """
+    if out is None:
+        out = df.copy()
+    if isinstance(out, pd.DataFrame):
+        for col, values in arrays.items():
+            out[col] = values
+    else:
+        # Checked before writing, so a wrong buffer is never left half filled
+        shape = (len(df), len(arrays))
+        if not isinstance(out, np.ndarray) or out.shape != shape:
+            raise ValueError(f"out buffer must be an ndarray of shape {shape}, got {getattr(out, 'shape', type(out).__name__)}")
+        for j, values in enumerate(arrays.values()):
+            out[:, j] = values
+    return out
 
 class TechnicalIndicators:
+    """
+    DataFrame-in / DataFrame-out wrappers around the IndicatorEngine (core/engine.py).
+    EMAs and the MACD family are memoized, so calling several of these on the same
+    bars (or on copies of them) computes each EMA only once.
+    
+    By default each add_* returns a copy of df with the new columns. In hot paths pass
+    out=df to add the columns in place, out=<ndarray> to fill a preallocated buffer, or
+    use indicator_arrays() to get just the arrays. Peak memory of ladder + strict signal
+    on a 500k-bar OHLCV frame (24 MB): 196 MB copying per call, 170 MB with out=df,
+    130 MB for the bare arrays, most of which is the indicator outputs and strict-kernel
+    temporaries (backtest_lab/measure_indicator_memory.py).
+    """
+    
+    @staticmethod
+    def indicator_arrays(df: pd.DataFrame, names: list, **params) -> dict:
+        """{name: array} for registered indicators. Arrays are read-only and shared with the memo."""
+        engine = IndicatorEngine(df)
+        return {name: engine.get(name, **params) for name in names}
     
     @staticmethod
-    def add_ladder_indicator(df: pd.DataFrame, n1=26, n2=89):
-        df = df.copy()
-        df['ladder_blue_top'] = calculate_ema(df['High'], n1) 
-        df['ladder_blue_bottom'] = calculate_ema(df['Low'], n1) 
-        df['ladder_yellow_top'] = calculate_ema(df['High'], n2) 
-        df['ladder_yellow_bottom'] = calculate_ema(df['Low'], n2) 
-        
-        conditions = [
-            (df['Close'] > df['ladder_blue_top']),
-            (df['Close'] < df['ladder_blue_bottom'])
-        ]
-        choices = [1, -1]
-        df['ladder_signal'] = np.select(conditions, choices, default=0)
-        return df
+    def add_ladder_indicator(df: pd.DataFrame, n1=26, n2=89, out=None):
+        arrays = TechnicalIndicators.indicator_arrays(df, LADDER_COLUMNS, n1=n1, n2=n2)
+        return _emit(df, arrays, out)
 
     @staticmethod
-    def add_bottom_fishing_indicator(df: pd.DataFrame):
+    def add_bottom_fishing_indicator(df: pd.DataFrame, out=None):
         """Strict Implementation returning DataFrame"""
-        return TechnicalIndicators._add_strict_bottom_fishing(df)
+        return TechnicalIndicators._add_strict_bottom_fishing(df, out=out)
 
     @staticmethod
-    def add_relaxed_bottom_signal(df: pd.DataFrame, lookback=30):
-        df = df.copy()
-        
-        ema12 = df['Close'].ewm(span=12, adjust=False).mean()
-        ema26 = df['Close'].ewm(span=26, adjust=False).mean()
-        df['DIF'] = ema12 - ema26
-        df['DEA'] = df['DIF'].ewm(span=9, adjust=False).mean()
-        df['MACD'] = (df['DIF'] - df['DEA']) * 2
-        
-        signals = np.zeros(len(df))
-        
-        lows = df['Low'].values
-        difs = df['DIF'].values
-        macds = df['MACD'].values
-        
-        llv_price = df['Low'].rolling(window=lookback).min()
-        llv_dif = df['DIF'].rolling(window=lookback).min()
-        
-        for i in range(lookback, len(df)):
-            curr_low = lows[i]
-            curr_dif = difs[i]
-            
-            # Using iloc for access inside loop is slow but safer if index is not int
-            # Here we use array access (lows[i]) which is fine.
-            # llv_price is a Series, so we need iloc or values
-            
-            lowest_p = llv_price.iloc[i]
-            lowest_d = llv_dif.iloc[i]
-            
-            is_price_low = curr_low <= (lowest_p * 1.01)
-            
-            # Relaxed logic: Price is low, but DIF is NOT at its low
-            # lowest_d is the min DIF in window.
-            # If curr_dif > lowest_d * 0.95 (meaning it's higher/less negative)
-            
-            # Wait, if DIF is negative (-2), and curr is -1.5.
-            # -1.5 > -2.0 is True.
-            # But we want "Significant" divergence.
-            
-            is_divergence = is_price_low and (curr_dif > lowest_d + 0.05) # Add absolute buffer
-            
-            momentum_improving = macds[i] > macds[i-1]
-            
-            if is_divergence and momentum_improving and difs[i] < 0:
-                signals[i] = 1
-                
-        df['bottom_fishing_signal'] = signals
-        return df
+    def add_relaxed_bottom_signal(df: pd.DataFrame, lookback=30, out=None):
+        arrays = TechnicalIndicators.indicator_arrays(df, MACD_COLUMNS + ['relaxed_bottom_signal'], lookback=lookback)
+        arrays['bottom_fishing_signal'] = arrays.pop('relaxed_bottom_signal')
+        return _emit(df, arrays, out)
 
     @staticmethod
-    def _add_strict_bottom_fishing(df: pd.DataFrame):
-        df = df.copy()
-        ema12 = df['Close'].ewm(span=12, adjust=False).mean()
-        ema26 = df['Close'].ewm(span=26, adjust=False).mean()
-        df['DIF'] = ema12 - ema26
-        df['DEA'] = df['DIF'].ewm(span=9, adjust=False).mean()
-        df['MACD'] = (df['DIF'] - df['DEA']) * 2
-        
-        d = df['DIF'].values
-        m = df['MACD'].values
-        close = df['Close'].values
-        
-        ref_m = np.roll(m, 1); ref_m[0] = 0 
-        cond_turn_green = (ref_m >= 0) & (m < 0)
-        cond_turn_red = (ref_m <= 0) & (m > 0)
-        n1_series = bars_last(pd.Series(cond_turn_green))
-        mm1_series = bars_last(pd.Series(cond_turn_red))
-        
-        signals = np.zeros(len(df))
-        ccc_arr = np.zeros(len(df), dtype=bool)
-        jjj_arr = np.zeros(len(df), dtype=bool)
-        
-        for i in range(1, len(df)):
-            n1 = n1_series.iloc[i]
-            mm1 = mm1_series.iloc[i]
-            if np.isnan(n1) or np.isnan(mm1): continue
-            n1 = int(n1); mm1 = int(mm1)
-            
-            cc1 = np.min(close[max(0, i-n1):i+1])
-            difl1 = np.min(d[max(0, i-n1):i+1])
-            
-            idx_prev = i - (mm1 + 1)
-            if idx_prev < 0: 
-                ccc_arr[i] = False; continue
-            
-            n1_prev = int(n1_series.iloc[idx_prev]) if not np.isnan(n1_series.iloc[idx_prev]) else 0
-            cc2 = np.min(close[max(0, idx_prev-n1_prev):idx_prev+1])
-            difl2 = np.min(d[max(0, idx_prev-n1_prev):idx_prev+1])
-            
-            idx_prev2 = idx_prev - (int(mm1_series.iloc[idx_prev]) + 1) if not np.isnan(mm1_series.iloc[idx_prev]) else -1
-            if idx_prev2 >= 0:
-                n1_prev2 = int(n1_series.iloc[idx_prev2]) if not np.isnan(n1_series.iloc[idx_prev2]) else 0
-                cc3 = np.min(close[max(0, idx_prev2-n1_prev2):idx_prev2+1])
-                difl3 = np.min(d[max(0, idx_prev2-n1_prev2):idx_prev2+1])
-            else:
-                cc3 = np.inf; difl3 = -np.inf
-
-            is_green = (ref_m[i] < 0) & (d[i] < 0)
-            aaa = (cc1 < cc2) and (difl1 > difl2) and is_green
-            bbb = (cc1 < cc3) and (difl1 < difl2) and (difl1 > difl3) and is_green
-            ccc = (aaa or bbb) and (d[i] < 0)
-            ccc_arr[i] = ccc
-            
-            jjj = ccc_arr[i-1] and (abs(d[i-1]) >= (abs(d[i]) * 1.01))
-            dxdx = (not jjj_arr[i-1]) and jjj
-            jjj_arr[i] = jjj
-            
-            if dxdx: signals[i] = 1
-            
-        df['bottom_fishing_signal'] = signals
-        return df
+    def _add_strict_bottom_fishing(df: pd.DataFrame, out=None):
+        arrays = TechnicalIndicators.indicator_arrays(df, MACD_COLUMNS + ['bottom_fishing_signal'])
+        return _emit(df, arrays, out)
+
+
+# --- Panel (dates x tickers) variants ---
+
+def _panel_frame(x) -> pd.DataFrame:
+    return x if isinstance(x, pd.DataFrame) else pd.DataFrame(np.asarray(x, dtype=float))
+
+def _panel_out(like, frame: pd.DataFrame):
+    return frame if isinstance(like, pd.DataFrame) else frame.to_numpy()
+
+def panel_ema(x, span):
+    """
+    EMA of every column of a wide (dates x tickers) DataFrame or 2D array in one ewm pass.
+    Each column starts at its own first non-NaN value, so NaN-padded leading history
+    (tickers with later IPO dates) gives the same numbers as the trimmed single-ticker series.
+    """
+    return _panel_out(x, _panel_frame(x).ewm(span=span, adjust=False).mean())
+
+def panel_macd(close, fast=12, slow=26, signal=9) -> dict:
+    """DIF, DEA and MACD for every ticker column. Returns {name: panel} shaped like close."""
+    frame = _panel_frame(close)
+    dif = frame.ewm(span=fast, adjust=False).mean() - frame.ewm(span=slow, adjust=False).mean()
+    dea = dif.ewm(span=signal, adjust=False).mean()
+    return {name: _panel_out(close, v) for name, v in (('DIF', dif), ('DEA', dea), ('MACD', (dif - dea) * 2))}
+
+def panel_ladder(high, low, close, n1=26, n2=89) -> dict:
+    """
+    Ladder bands and ladder_signal for every ticker column.
+    
+    Args:
+        high, low, close: Wide (dates x tickers) DataFrames (e.g. from to_panel or
+            UniverseStore.panel) or 2D arrays of the same shape.
+        n1 (int): Blue ladder span.
+        n2 (int): Yellow ladder span.
+    
+    Returns:
+        dict: {column name: panel} with the same type and shape as close. ladder_signal
+            is 0 where the ticker has no data yet.
+    """
+    out = {
+        'ladder_blue_top': panel_ema(high, n1),
+        'ladder_blue_bottom': panel_ema(low, n1),
+        'ladder_yellow_top': panel_ema(high, n2),
+        'ladder_yellow_bottom': panel_ema(low, n2),
+    }
+    c = np.asarray(close, dtype=float)
+    signal = np.select([c > np.asarray(out['ladder_blue_top']), c < np.asarray(out['ladder_blue_bottom'])], [1, -1], default=0)
+    out['ladder_signal'] = pd.DataFrame(signal, index=close.index, columns=close.columns) if isinstance(close, pd.DataFrame) else signal
+    return out
+
+
+# --- Parameter sweeps ---
+
+def _ewm_alpha(p: dict) -> float:
+    # Same rounding as pandas: span or alpha -> center of mass -> alpha
+    com = (p['span'] - 1.0) / 2.0 if 'span' in p else (1.0 - p['alpha']) / p['alpha']
+    return 1.0 / (1.0 + com)
+
+def _ewm_recursive(flat: np.ndarray, alpha: np.ndarray, min_periods=0) -> np.ndarray:
+    """
+    pandas ewm(adjust=False).mean() recursion over the rows of a (T x B) array, vectorized
+    across an alpha array broadcastable to (K, B). min_periods may be an array of the
+    same shape. Returns (K x T x B).
+    """
+    shape = np.broadcast_shapes(alpha.shape, (1, flat.shape[1]))
+    decay = 1.0 - alpha
+    y = np.full(shape, np.nan)
+    old_wt = np.ones(shape)
+    nobs = np.zeros(shape, dtype=np.int64)
+    out = np.empty((shape[0], len(flat), shape[1]))
+    for t in range(len(flat)):
+        cur = flat[t]
+        obs = cur == cur
+        has = y == y
+        nobs += obs
+        old_wt = np.where(has, old_wt * decay, old_wt)
+        # pandas weighs a new value by 1 - old_wt instead of alpha when com == 1 (alpha 0.5);
+        # the two only differ after NaN bars
+        step = np.where(alpha == 0.5, old_wt * y + (1.0 - old_wt) * cur, (old_wt * y + alpha * cur) / (old_wt + alpha))
+        y = np.where(has & obs & (y != cur), step, y)
+        old_wt = np.where(has & obs, 1.0, old_wt)
+        y = np.where(~has & obs, cur, y)
+        out[:, t] = y if np.max(min_periods) <= 1 else np.where(nobs >= min_periods, y, np.nan)
+    return out
+
+# Below this many (parameter set x column) series one pandas ewm per parameter set is
+# faster: the step-by-step recursion pays ~20 us of NumPy overhead per bar, which only
+# pays off once it is spread over thousands of series (e.g. 8 spans x 500 tickers).
+_SWEEP_MIN_SERIES = 2000
+
+def _ewm_sweep(flat: np.ndarray, params: list, min_periods=None) -> np.ndarray:
+    """
+    ewm(adjust=False).mean() of every column of a (T x B) array for K parameter sets
+    (dicts like {'span': 26} or {'alpha': 1 / 14}), as (K x T x B). Narrow blocks run
+    pandas ewm once per parameter set, wide ones the vectorized recursion; both give
+    the pandas numbers exactly.
+    """
+    min_periods = np.zeros(len(params), dtype=np.int64) if min_periods is None else np.asarray(min_periods)
+    if len(params) * flat.shape[1] < _SWEEP_MIN_SERIES:
+        frame = pd.DataFrame(flat)
+        return np.stack([frame.ewm(adjust=False, min_periods=int(mp), **p).mean().to_numpy()
+                         for p, mp in zip(params, min_periods)])
+    alpha = np.array([_ewm_alpha(p) for p in params])
+    return _ewm_recursive(flat, alpha[:, None], min_periods[:, None])
+
+def ema_sweep(x, spans) -> np.ndarray:
+    """
+    EMAs of one series (or panel) for a whole vector of spans.
+    
+    Wide panels update all spans and ticker columns together in one pass over time,
+    with the same arithmetic as pandas ewm(span, adjust=False), NaN handling included;
+    a single series or a narrow panel just runs pandas ewm per span (see _ewm_sweep).
+    Either way each slice equals calculate_ema(x, span) exactly.
+    
+    Args:
+        x: 1D series/array of length T, or a (T x tickers) panel.
+        spans (list): K EMA spans.
+    
+    Returns:
+        np.ndarray: (K x T) for 1D input, (K x T x tickers) for a panel.
+    """
+    values = np.asarray(x, dtype=float)
+    out = _ewm_sweep(values.reshape(len(values), -1), [{'span': span} for span in spans])
+    return out.reshape((len(spans),) + values.shape)
+
+def sma_multi(x, windows) -> np.ndarray:
+    """(K x T) calculate_sma for several windows (legacy decide_trade's short/long MAs)."""
+    s = pd.Series(np.asarray(x, dtype=float))
+    return np.vstack([calculate_sma(s, w).to_numpy() for w in windows])
+
+def dema_multi(x, windows) -> np.ndarray:
+    """(K x T) calculate_dema for several windows (legacy decide_trade_David's short/long DEMAs)."""
+    ema = ema_sweep(x, windows)
+    ema_of_ema = np.stack([ema_sweep(ema[k], [w])[0] for k, w in enumerate(windows)])
+    return 2 * ema - ema_of_ema
+
+def ladder_sweep(df: pd.DataFrame, n1_values, n2_values) -> dict:
+    """
+    Ladder columns for every (n1, n2) combination from one EMA sweep each over High and Low.
+    
+    Returns:
+        dict: {(n1, n2): {column: array}} with the same columns as add_ladder_indicator.
+            Band arrays are views into the shared sweep output.
+    """
+    spans = sorted(set(n1_values) | set(n2_values))
+    row = {span: i for i, span in enumerate(spans)}
+    highs = ema_sweep(df['High'], spans)
+    lows = ema_sweep(df['Low'], spans)
+    close = df['Close'].to_numpy(dtype=float)
+    signals = {n1: np.select([close > highs[row[n1]], close < lows[row[n1]]], [1, -1], default=0) for n1 in set(n1_values)}
+    return {
+        (n1, n2): {
+            'ladder_blue_top': highs[row[n1]],
+            'ladder_blue_bottom': lows[row[n1]],
+            'ladder_yellow_top': highs[row[n2]],
+            'ladder_yellow_bottom': lows[row[n2]],
+            'ladder_signal': signals[n1],
+        }
+        for n1 in n1_values for n2 in n2_values
+    }
+
+
+# --- Indicator graph nodes ---
+
+@register_indicator('ladder_blue_top', inputs=('High',), params={'n1': 26})
+def _ladder_blue_top(e, n1):
+    return e.ema('High', n1)
+
+@register_indicator('ladder_blue_bottom', inputs=('Low',), params={'n1': 26})
+def _ladder_blue_bottom(e, n1):
+    return e.ema('Low', n1)
+
+@register_indicator('ladder_yellow_top', inputs=('High',), params={'n2': 89})
+def _ladder_yellow_top(e, n2):
+    return e.ema('High', n2)
+
+@register_indicator('ladder_yellow_bottom', inputs=('Low',), params={'n2': 89})
+def _ladder_yellow_bottom(e, n2):
+    return e.ema('Low', n2)
+
+@register_indicator('ladder_signal', inputs=('High', 'Low', 'Close'), params={'n1': 26})
+def _ladder_signal(e, n1):
+    close = e.values('Close')
+    conditions = [
+        (close > e.ema('High', n1)),
+        (close < e.ema('Low', n1))
+    ]
+    choices = [1, -1]
+    return np.select(conditions, choices, default=0)
+
+@register_indicator('DIF', inputs=('Close',), params={'fast': 12, 'slow': 26, 'signal': 9})
+def _dif(e, fast, slow, signal):
+    return e.macd(fast, slow, signal)[0]
+
+@register_indicator('DEA', inputs=('Close',), params={'fast': 12, 'slow': 26, 'signal': 9})
+def _dea(e, fast, slow, signal):
+    return e.macd(fast, slow, signal)[1]
+
+@register_indicator('MACD', inputs=('Close',), params={'fast': 12, 'slow': 26, 'signal': 9})
+def _macd(e, fast, slow, signal):
+    return e.macd(fast, slow, signal)[2]
+
+@register_indicator('MA', inputs=('Close',), params={'window': 200})
+def _ma(e, window):
+    return e.sma('Close', window)
+
+@register_indicator('RSI', inputs=('Close',), params={'window': 14})
+def _rsi(e, window):
+    return calculate_rsi(pd.Series(e.values('Close')), window).to_numpy()
+
+@register_indicator('WILDER_RSI', inputs=('Close',), params={'window': 14})
+def _wilder_rsi(e, window):
+    return calculate_wilder_rsi(pd.Series(e.values('Close')), window).to_numpy()
+
+@register_indicator('DEMA', inputs=('Close',), params={'window': 30})
+def _dema(e, window):
+    ema = e.ema('Close', window)
+    return 2 * ema - pd.Series(ema).ewm(span=window, adjust=False).mean().to_numpy()
+
+@register_indicator('bottom_fishing_signal', inputs=('Close',))
+def _bottom_fishing_signal(e):
+    dif, _, macd = e.macd()
+    return strict_bottom_signal(e.values('Close'), dif, macd)
+
+@register_indicator('relaxed_bottom_signal', inputs=('Low', 'Close'), params={'lookback': 30})
+def _relaxed_bottom_signal(e, lookback):
+    dif, _, macd = e.macd()
+    return relaxed_bottom_signal(e.values('Low'), dif, macd, lookback)
+
+
+# --- Array kernels ---
+
+def strict_bottom_signal(close: np.ndarray, d: np.ndarray, m: np.ndarray) -> np.ndarray:
+    """Strict 抄底 (DXDX) signal in O(n) from Close, DIF and MACD arrays (see strict_bottom_parts)."""
+    return strict_bottom_parts(close, d, m)['signal']
+
+
+def strict_bottom_parts(close: np.ndarray, d: np.ndarray, m: np.ndarray) -> dict:
+    """
+    Strict 抄底 (DXDX) signal and its per-bar intermediates (running minima, red
+    turns, ccc / jjj), which core.streaming uses to rebuild its state machine.
+    
+    Every per-bar window in the 通达信 formula starts at the last MACD green turn
+    (N1 = BARSLAST(green turn)), so the window minima are segmented running minima
+    that reset at each green turn. The "previous phase" lookups (REF(..., MM1+1))
+    are plain gathers at (last red turn - 1). Gives the same signals as the original
+    per-bar loop (see backtest_lab/verify_bottom_fishing.py).
+    """
+    n = len(close)
+
+    ref_m = np.roll(m, 1); ref_m[0] = 0 
+    cond_turn_green = (ref_m >= 0) & (m < 0)
+    cond_turn_red = (ref_m <= 0) & (m > 0)
+    
+    # Index of the last green / red turn at or before each bar (-1 if none yet)
+    idx = np.arange(n)
+    last_green = np.maximum.accumulate(np.where(cond_turn_green, idx, -1))
+    last_red = np.maximum.accumulate(np.where(cond_turn_red, idx, -1))
+    
+    # CC1 / DIFL1: min of close / DIF since the last green turn
+    segment = np.cumsum(cond_turn_green)
+    cc1 = _segment_cummin(close, segment)
+    difl1 = _segment_cummin(d, segment)
+    # Window of a bar with no green turn yet is the bar itself (N1 treated as 0)
+    has_green = last_green >= 0
+    cc_at = np.where(has_green, cc1, close)
+    difl_at = np.where(has_green, difl1, d)
+    
+    # Previous phase ends one bar before the last red turn
+    valid = has_green & (last_red >= 0) & (idx >= 1)
+    idx_prev = last_red - 1
+    valid &= idx_prev >= 0
+    prev = np.clip(idx_prev, 0, None)
+    cc2 = cc_at[prev]
+    difl2 = difl_at[prev]
+    
+    # The phase before that ends one bar before the red turn preceding idx_prev
+    red_prev = last_red[prev]
+    idx_prev2 = np.where(red_prev >= 0, red_prev - 1, -1)
+    has_prev2 = idx_prev2 >= 0
+    prev2 = np.clip(idx_prev2, 0, None)
+    cc3 = np.where(has_prev2, cc_at[prev2], np.inf)
+    difl3 = np.where(has_prev2, difl_at[prev2], -np.inf)
+    
+    is_green = (ref_m < 0) & (d < 0)
+    aaa = (cc1 < cc2) & (difl1 > difl2) & is_green
+    bbb = (cc1 < cc3) & (difl1 < difl2) & (difl1 > difl3) & is_green
+    ccc = (aaa | bbb) & (d < 0) & valid
+    
+    ccc_prev = np.zeros(n, dtype=bool); ccc_prev[1:] = ccc[:-1]
+    d_prev = np.zeros(n); d_prev[1:] = d[:-1]
+    jjj = valid & ccc_prev & (np.abs(d_prev) >= (np.abs(d) * 1.01))
+    jjj_prev = np.zeros(n, dtype=bool); jjj_prev[1:] = jjj[:-1]
+    dxdx = (~jjj_prev) & jjj
+    return {'signal': dxdx.astype(float), 'cc1': cc1, 'difl1': difl1, 'cc_at': cc_at, 'difl_at': difl_at,
+            'has_green': has_green, 'turn_red': cond_turn_red, 'ccc': ccc, 'jjj': jjj}
+
+
+def relaxed_bottom_signal(lows: np.ndarray, difs: np.ndarray, macds: np.ndarray, lookback=30) -> np.ndarray:
+    """Relaxed bottom signal (price at its low, DIF not at its low, MACD improving) from arrays."""
+    llv_price = LLV(lows, lookback, min_periods=lookback)
+    llv_dif = LLV(difs, lookback, min_periods=lookback)
+    
+    is_price_low = lows <= (llv_price * 1.01)
+    
+    # Relaxed logic: Price is low, but DIF is NOT at its low
+    # lowest_d is the min DIF in window.
+    # If DIF is negative (-2), and curr is -1.5: -1.5 > -2.0 is True.
+    # But we want "Significant" divergence, so add an absolute buffer.
+    is_divergence = is_price_low & (difs > llv_dif + 0.05)
+    
+    momentum_improving = macds > REF(macds, 1)
+    
+    signals = (is_divergence & momentum_improving & (difs < 0)).astype(float)
+    signals[:lookback] = 0
+    return signals
+
+
+def _segment_cummin(values: np.ndarray, segment: np.ndarray) -> np.ndarray:
+    """Running minimum that restarts at each new segment id; NaN poisons the rest of its segment like np.min."""
+    s = pd.Series(values)
+    res = s.groupby(segment).cummin().values
+    nan_seen = s.isna().groupby(segment).cummax().values
+    return np.where(nan_seen, np.nan, res)
@@ -0,0 +1,146 @@
+"""
+Struct-of-arrays lot book for take-profit strategies, usable inside harness kernels.
+
+A book is a tuple of parallel arrays, indexed by lot id (ids are handed out in
+purchase order, so id order is FIFO order):
+
+    price, shares, tp   entry price, open shares and take-profit price per lot
+    alive               False once a lot is sold (TP) or fully consumed (FIFO)
+    heap                lot ids, a min-heap on tp (lazy: dead ids are dropped on pop)
+    meta                [head, count, heap_size]: oldest possibly-open id, ids used
+
+Take-profit fills pop the k hit lots in O(k log n) and FIFO reductions walk forward
+from head, so each lot is touched O(1) times over its life instead of once per bar.
+Hits are returned in purchase order, so cash and trade logs accumulate in the same
+order as the old list-of-dicts loops.
+"""
+import numpy as np
+
+from .harness import kernel, kernel_input
+
+HEAD, COUNT, HEAP_SIZE = 0, 1, 2
+
+
+def new_book(capacity: int, lots=()) -> tuple:
+    """
+    Empty book with room for capacity lots, pre-filled with lots
+    (dicts with 'shares', 'tp_price' and optionally 'price', oldest first).
+    """
+    capacity = max(capacity, len(lots))
+    book = (kernel_input(np.zeros(capacity)), kernel_input(np.zeros(capacity)), kernel_input(np.zeros(capacity)),
+            kernel_input(np.zeros(capacity, dtype=bool), bool), kernel_input(np.zeros(capacity, dtype=int), int),
+            kernel_input(np.zeros(3, dtype=int), int))
+    for lot in lots:
+        push_lot(book, lot.get('price', np.nan), lot['shares'], lot['tp_price'])
+    return book
+
+
+def open_lots(book) -> list:
+    """Open lots as {'price', 'shares', 'tp_price'} dicts, oldest first."""
+    price, shares, tp, alive, heap, meta = book
+    return [{'price': float(price[i]), 'shares': float(shares[i]), 'tp_price': float(tp[i])}
+            for i in range(meta[HEAD], meta[COUNT]) if alive[i]]
+
+
+@kernel
+def push_lot(book, price_i, shares_i, tp_i):
+    """Add a lot; returns its id."""
+    price, shares, tp, alive, heap, meta = book
+    lot = meta[COUNT]
+    price[lot] = price_i
+    shares[lot] = shares_i
+    tp[lot] = tp_i
+    alive[lot] = True
+    meta[COUNT] = lot + 1
+
+    # Sift up
+    pos = meta[HEAP_SIZE]
+    meta[HEAP_SIZE] = pos + 1
+    while pos > 0:
+        parent = (pos - 1) >> 1
+        if tp[heap[parent]] <= tp_i:
+            break
+        heap[pos] = heap[parent]
+        pos = parent
+    heap[pos] = lot
+    return lot
+
+
+@kernel
+def _heap_pop(tp, heap, meta):
+    """Remove and return the id with the lowest tp."""
+    size = meta[HEAP_SIZE] - 1
+    top = heap[0]
+    last = heap[size]
+    meta[HEAP_SIZE] = size
+
+    # Sift the last entry down from the root
+    pos = 0
+    while True:
+        child = 2 * pos + 1
+        if child >= size:
+            break
+        if child + 1 < size and tp[heap[child + 1]] < tp[heap[child]]:
+            child += 1
+        if tp[last] <= tp[heap[child]]:
+            break
+        heap[pos] = heap[child]
+        pos = child
+    if size > 0:
+        heap[pos] = last
+    return top
+
+
+@kernel
+def pop_tp_hits(book, high, hits):
+    """
+    Close every open lot with tp <= high. Their ids are written to hits in
+    purchase order; returns how many. Shares of the hit lots are left in the
+    book for the caller to book the fills.
+    """
+    price, shares, tp, alive, heap, meta = book
+    k = 0
+    while meta[HEAP_SIZE] > 0 and tp[heap[0]] <= high:
+        lot = _heap_pop(tp, heap, meta)
+        if alive[lot]:
+            alive[lot] = False
+            hits[k] = lot
+            k += 1
+    if k > 1:
+        hits[:k] = np.sort(np.asarray(hits[:k]))
+    if k > 0:
+        _advance_head(alive, meta)
+    return k
+
+
+@kernel
+def consume_fifo(book, amount):
+    """
+    Remove amount shares from the oldest open lots: whole lots first, the last
+    one partially (same rules as the old per-bar FIFO scan). Returns shares removed.
+    """
+    price, shares, tp, alive, heap, meta = book
+    removed = 0.0
+    lot = meta[HEAD]
+    count = meta[COUNT]
+    while lot < count and removed < amount:
+        if alive[lot]:
+            needed = amount - removed
+            if shares[lot] > needed:
+                shares[lot] -= needed
+                removed += needed
+            else:
+                removed += shares[lot]
+                alive[lot] = False
+        lot += 1
+    _advance_head(alive, meta)
+    return removed
+
+
+@kernel
+def _advance_head(alive, meta):
+    head = meta[HEAD]
+    count = meta[COUNT]
+    while head < count and not alive[head]:
+        head += 1
+    meta[HEAD] = head
@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from .cache import DEFAULT_CACHE_DIR
+
+DAY = 24 * 3600
+
+# Seconds each Ticker.info field stays fresh; fields not listed use DEFAULT_INFO_TTL
+INFO_FIELD_TTLS = {
+    'sector': 30 * DAY,
+    'industry': 30 * DAY,
+    'longName': 30 * DAY,
+    'quoteType': 30 * DAY,
+    'earningsQuarterlyGrowth': 7 * DAY,
+    'earningsGrowth': 7 * DAY,
+    'dividendYield': DAY,
+    'trailingPE': DAY,
+    'marketCap': DAY,
+    'targetMeanPrice': DAY,
+    'buyRatingCount': DAY,
+    'holdRatingCount': DAY,
+    'sellRatingCount': DAY,
+}
+DEFAULT_INFO_TTL = DAY
+CALENDAR_TTL = 12 * 3600
+# Ticker.info quoteType values of instruments that never report earnings
+NO_EARNINGS_QUOTE_TYPES = ('ETF', 'MUTUALFUND', 'INDEX')
+
+
+class MetadataCache:
+    """
+    Two-level (memory + on-disk JSON) cache for Ticker.info and Ticker.calendar.
+
+    A single provider call refreshes the whole info dict, so freshness is tracked per
+    fetch: a lookup for some fields is served from cache while the fetch is younger
+    than the shortest TTL among those fields.
+    """
+
+    def __init__(self, provider_getter, root: str = None, field_ttls: dict = None,
+                 calendar_ttl: float = CALENDAR_TTL, max_workers: int = 8):
+        """
+        Args:
+            provider_getter (callable): Returns the active DataProvider.
+            root (str): Directory for the JSON files (default: <bar cache dir>/metadata).
+            field_ttls (dict): Overrides for INFO_FIELD_TTLS.
+            calendar_ttl (float): Seconds an earnings calendar stays fresh.
+            max_workers (int): Threads used by prefetch().
+        """
+        self.provider_getter = provider_getter
+        self.root = root or os.path.join(DEFAULT_CACHE_DIR, "metadata")
+        self.field_ttls = dict(INFO_FIELD_TTLS, **(field_ttls or {}))
+        self.calendar_ttl = calendar_ttl
+        self.max_workers = max_workers
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.root, f"{ticker.upper()}.json")
+
+    def _entry(self, ticker: str) -> dict:
+        with self._lock:
+            if ticker in self._memory:
+                return self._memory[ticker]
+        entry = {}
+        path = self._path(ticker)
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                entry = {}
+        with self._lock:
+            return self._memory.setdefault(ticker, entry)
+
+    def _save(self, ticker: str, entry: dict):
+        with self._lock:
+            payload = json.dumps(entry, default=str)
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(payload)
+        os.replace(tmp, self._path(ticker))
+
+    def _info_ttl(self, fields) -> float:
+        if not fields:
+            return DEFAULT_INFO_TTL
+        return min(self.field_ttls.get(f, DEFAULT_INFO_TTL) for f in fields)
+
+    def _info_fresh(self, ticker: str, fields=None) -> bool:
+        entry = self._entry(ticker)
+        return 'info' in entry and time.time() - entry.get('info_at', 0) < self._info_ttl(fields)
+
+    def _calendar_fresh(self, ticker: str) -> bool:
+        entry = self._entry(ticker)
+        return 'calendar' in entry and time.time() - entry.get('calendar_at', 0) < self.calendar_ttl
+
+    def _no_earnings(self, ticker: str) -> bool:
+        """Whether the cached info marks ticker as an ETF / fund / index (no calendar to fetch)."""
+        return self._entry(ticker).get('info', {}).get('quoteType') in NO_EARNINGS_QUOTE_TYPES
+
+    def info(self, ticker: str, fields: list = None) -> dict:
+        """Ticker.info, refetched only if older than the TTL of the requested fields."""
+        if not self._info_fresh(ticker, fields):
+            info = self.provider_getter().metadata(ticker) or {}
+            entry = self._entry(ticker)
+            with self._lock:
+                entry['info'] = info
+                entry['info_at'] = time.time()
+            self._save(ticker, entry)
+        return self._entry(ticker)['info']
+
+    def calendar(self, ticker: str) -> dict:
+        """Ticker.calendar ('Earnings Date' values are datetime.date); {} for ETFs, funds and indices."""
+        if self._no_earnings(ticker):
+            return {}
+        if not self._calendar_fresh(ticker):
+            calendar = self.provider_getter().earnings_calendar(ticker) or {}
+            entry = self._entry(ticker)
+            with self._lock:
+                entry['calendar'] = calendar
+                entry['calendar_at'] = time.time()
+            self._save(ticker, entry)
+        calendar = dict(self._entry(ticker)['calendar'])
+        if 'Earnings Date' in calendar:
+            # JSON round trip stores dates as strings
+            calendar['Earnings Date'] = [pd.to_datetime(d).date() for d in calendar['Earnings Date']]
+        return calendar
+
+    def prefetch(self, tickers: list, fields: list = None, calendar: bool = False):
+        """
+        Refresh stale entries for many tickers concurrently. With calendar=True, info is
+        refreshed first so calendars are only requested for tickers whose quoteType can
+        report earnings (not ETFs, funds or indices).
+        """
+        info_jobs = [(t, 'info') for t in tickers if not self._info_fresh(t, fields)]
+        self._run_jobs(info_jobs, fields)
+        if calendar:
+            self._run_jobs([(t, 'calendar') for t in tickers
+                            if not self._no_earnings(t) and not self._calendar_fresh(t)], fields)
+
+    def _run_jobs(self, jobs: list, fields):
+        if not jobs:
+            return
+
+        def run(job):
+            ticker, kind = job
+            try:
+                if kind == 'info':
+                    self.info(ticker, fields)
+                else:
+                    self.calendar(ticker)
+            except Exception as e:
+                print(f"Error fetching metadata for {ticker}: {e}")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            list(pool.map(run, jobs))
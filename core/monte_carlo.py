@@ -0,0 +1,226 @@
+"""
+Monte Carlo robustness runs over resampled price paths.
+
+A path generator draws a (paths x time) batch of Close/High/Low prices on one shared
+calendar:
+
+    BlockBootstrap   circular block bootstrap of a history's daily bars (log return
+                     plus the bar's High/Close and Low/Close ratios, so volatility
+                     clusters and intrabar ranges survive within a block)
+    JumpDiffusion    geometric Brownian motion with Poisson (Merton) jumps
+
+MonteCarlo runs strategies on every path through BaseStrategy.simulate_paths, which
+is array code over the whole batch (panel_targets with one column per path plus the
+batched simulators in core/vectorized.py), so there is no per-path loop. Paths are
+drawn and simulated chunk_size at a time to bound memory, and only per-path metrics
+are kept: time-weighted CAGR and max drawdown from trading_start_date on, and final
+equity (contributions included).
+"""
+import numpy as np
+import pandas as pd
+
+from .walk_forward import window_metrics
+
+BARS_PER_YEAR = 252
+
+
+def _ranges(df: pd.DataFrame):
+    """High/Close and Low/Close of every bar, used to rebuild bars around a close."""
+    close = df['Close'].to_numpy(dtype=float)
+    high = df['High'].to_numpy(dtype=float) / close if 'High' in df else np.ones(len(df))
+    low = df['Low'].to_numpy(dtype=float) / close if 'Low' in df else np.ones(len(df))
+    return high, low
+
+
+def _bars(close: np.ndarray, high_ratio: np.ndarray, low_ratio: np.ndarray) -> dict:
+    return {'Close': close, 'High': close * high_ratio, 'Low': close * low_ratio}
+
+
+class BlockBootstrap:
+    """
+    Args:
+        df (pd.DataFrame): History with 'Close' (and 'High'/'Low').
+        block (int): Bars per resampled block.
+        n_bars (int): Path length (default: len(df)). Paths use df's dates, extended
+            with business days if longer.
+        start_price (float): First close of every path (default: df's first close).
+    """
+
+    def __init__(self, df: pd.DataFrame, block=21, n_bars=None, start_price=None):
+        close = df['Close'].to_numpy(dtype=float)
+        high, low = _ranges(df)
+        self.returns = np.diff(np.log(close))
+        self.high_ratio, self.low_ratio = high[1:], low[1:]
+        self.block = block
+        self.n_bars = n_bars or len(df)
+        self.start_price = start_price or close[0]
+        self.first_ratios = (high[0], low[0])
+        if self.n_bars <= len(df):
+            self.index = df.index[:self.n_bars]
+        else:
+            self.index = pd.bdate_range(df.index[0], periods=self.n_bars)
+
+    def sample(self, n_paths: int, rng: np.random.Generator) -> dict:
+        """{'Close', 'High', 'Low': (n_paths x n_bars) arrays}."""
+        m, steps = len(self.returns), self.n_bars - 1
+        n_blocks = -(-steps // self.block)
+        starts = rng.integers(0, m, (n_paths, n_blocks, 1))
+        picks = ((starts + np.arange(self.block)) % m).reshape(n_paths, -1)[:, :steps]
+
+        log_close = np.empty((n_paths, self.n_bars))
+        log_close[:, 0] = np.log(self.start_price)
+        log_close[:, 1:] = self.returns[picks]
+        close = np.exp(np.cumsum(log_close, axis=1))
+        high_ratio = np.empty_like(close)
+        low_ratio = np.empty_like(close)
+        high_ratio[:, 0], low_ratio[:, 0] = self.first_ratios
+        high_ratio[:, 1:] = self.high_ratio[picks]
+        low_ratio[:, 1:] = self.low_ratio[picks]
+        return _bars(close, high_ratio, low_ratio)
+
+
+class JumpDiffusion:
+    """
+    Daily log return (mu - sigma^2 / 2 - lam * k) dt + sigma sqrt(dt) Z plus N ~ Poisson(lam dt)
+    jumps of size N(jump_mean, jump_std), k = E[e^jump] - 1, so mu stays the expected
+    annual drift including jumps.
+
+    Args:
+        mu, sigma (float): Annual drift and diffusion volatility.
+        jump_rate (float): Expected jumps per year (lam).
+        jump_mean, jump_std (float): Log jump size distribution.
+        n_bars (int): Path length.
+        start_price (float): First close of every path.
+        start: First date of the (business day) calendar.
+        ranges (pd.DataFrame): History whose High/Close and Low/Close ratios are drawn
+            for the simulated bars (None: High = Low = Close).
+    """
+
+    def __init__(self, mu=0.1, sigma=0.2, jump_rate=0.0, jump_mean=0.0, jump_std=0.0, n_bars=BARS_PER_YEAR * 10,
+                 start_price=100.0, start="2000-01-03", ranges=None):
+        self.mu = mu
+        self.sigma = sigma
+        self.jump_rate = jump_rate
+        self.jump_mean = jump_mean
+        self.jump_std = jump_std
+        self.n_bars = n_bars
+        self.start_price = start_price
+        self.index = pd.bdate_range(start, periods=n_bars)
+        self.ranges = _ranges(ranges) if ranges is not None else None
+
+    @classmethod
+    def fit(cls, df: pd.DataFrame, jump_threshold=4.0, **kwargs) -> "JumpDiffusion":
+        """
+        Parameters estimated from a history's daily log returns: returns beyond
+        jump_threshold robust (MAD) standard deviations count as jumps, the rest set sigma.
+        kwargs override the estimates or set n_bars / start_price (default: len(df), first close).
+        """
+        r = np.diff(np.log(df['Close'].to_numpy(dtype=float)))
+        scale = 1.4826 * np.median(np.abs(r - np.median(r)))
+        is_jump = np.abs(r - np.median(r)) > jump_threshold * scale
+        years = len(r) / BARS_PER_YEAR
+        jumps, normal = r[is_jump], r[~is_jump]
+        params = {
+            'mu': float((r.mean() + r.var() / 2) * BARS_PER_YEAR),
+            'sigma': float(normal.std() * np.sqrt(BARS_PER_YEAR)),
+            'jump_rate': len(jumps) / years,
+            'jump_mean': float(jumps.mean()) if len(jumps) else 0.0,
+            'jump_std': float(jumps.std()) if len(jumps) > 1 else 0.0,
+            'n_bars': len(df),
+            'start_price': float(df['Close'].iloc[0]),
+            'start': df.index[0],
+            'ranges': df,
+        }
+        params.update(kwargs)
+        return cls(**params)
+
+    def sample(self, n_paths: int, rng: np.random.Generator) -> dict:
+        """{'Close', 'High', 'Low': (n_paths x n_bars) arrays}."""
+        dt = 1.0 / BARS_PER_YEAR
+        shape = (n_paths, self.n_bars - 1)
+        k = np.exp(self.jump_mean + self.jump_std ** 2 / 2) - 1
+        drift = (self.mu - self.sigma ** 2 / 2 - self.jump_rate * k) * dt
+
+        log_close = np.empty((n_paths, self.n_bars))
+        log_close[:, 0] = np.log(self.start_price)
+        steps = log_close[:, 1:]
+        steps[:] = rng.standard_normal(shape)
+        steps *= self.sigma * np.sqrt(dt)
+        steps += drift
+        if self.jump_rate > 0:
+            count = rng.poisson(self.jump_rate * dt, shape)
+            hit = count > 0
+            # The sum of count normal jumps is N(count * mean, count * std^2)
+            steps[hit] += count[hit] * self.jump_mean + np.sqrt(count[hit]) * self.jump_std * rng.standard_normal(hit.sum())
+        close = np.exp(np.cumsum(log_close, axis=1))
+
+        if self.ranges is None:
+            return _bars(close, 1.0, 1.0)
+        picks = rng.integers(0, len(self.ranges[0]), close.shape)
+        return _bars(close, self.ranges[0][picks], self.ranges[1][picks])
+
+
+class MonteCarlo:
+    """
+    Args:
+        strategies (list): Strategies with a batched simulate_paths (BuyAndHold,
+            SimpleDCA, MA200Strategy, DavidStrategy, or anything with panel_targets).
+        n_paths (int): Paths to draw.
+        chunk_size (int): Paths drawn and simulated at once; peak memory is roughly
+            20 * chunk_size * n_bars * 8 bytes.
+        seed (int): Seed of the path draws (results depend on seed and chunk_size).
+    """
+
+    def __init__(self, strategies, n_paths=10000, chunk_size=1000, seed=0):
+        self.strategies = strategies
+        self.n_paths = n_paths
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.results = None
+
+    def run(self, generator) -> pd.DataFrame:
+        """
+        Args:
+            generator: BlockBootstrap, JumpDiffusion or any object with an index and
+                sample(n_paths, rng) returning (paths x time) 'Close' / 'High' / 'Low'.
+
+        Returns:
+            pd.DataFrame: One row per strategy and path with cagr, max_drawdown,
+            total_return and final_equity. Also kept in self.results.
+        """
+        index = generator.index
+        rng = np.random.default_rng(self.seed)
+        schedules = []
+        for strategy in self.strategies:
+            # Fresh contribution state, so the schedule does not depend on earlier runs
+            strategy._last_contribution_month = None
+            schedules.append(strategy._contribution_schedule(index))
+
+        frames = []
+        for first in range(0, self.n_paths, self.chunk_size):
+            n = min(self.chunk_size, self.n_paths - first)
+            paths = generator.sample(n, rng)
+            for strategy, schedule in zip(self.strategies, schedules):
+                trading, _, contributions = schedule
+                start = int(np.argmax(trading)) if trading.any() else 0
+                equity = strategy.simulate_paths(paths, index, schedule)
+                if equity is None:
+                    raise ValueError(f"{strategy.name} has no batched form (simulate_paths or panel_targets)")
+                metrics = window_metrics(index[start:], equity[:, start:], contributions[start:])
+                metrics.pop('growth')
+                frames.append(pd.DataFrame({'strategy': strategy.name, 'path': np.arange(first, first + n), **metrics}))
+            del paths
+
+        self.results = pd.concat(frames, ignore_index=True)
+        return self.results
+
+    def summary(self, percentiles=(0.05, 0.25, 0.5, 0.75, 0.95)) -> pd.DataFrame:
+        """Distribution of CAGR and max drawdown per strategy, plus the share of losing paths."""
+        grouped = self.results.groupby('strategy', sort=False)
+        table = {}
+        for metric in ('cagr', 'max_drawdown'):
+            table[(metric, 'mean')] = grouped[metric].mean()
+            for q in percentiles:
+                table[(metric, f"p{q * 100:g}")] = grouped[metric].quantile(q)
+        table[('total_return', 'P(loss)')] = grouped['total_return'].apply(lambda r: (r < 0).mean())
+        return pd.DataFrame(table)
@@ -0,0 +1,184 @@
+"""
+Multi-ticker backtests from one account.
+
+PortfolioBacktest runs a strategy's panel_targets (see BaseStrategy) over a whole
+watchlist on a common date calendar, with the strategy's initial_cash,
+monthly_contribution and trading_start_date applied to a single cash pool.
+
+A ticker is a member while its latest non-NaN target is 1 (NaN = hold, as in the
+single-ticker strategies) and it has a price. Whenever membership changes or a
+contribution arrives the account is rebalanced to the allocation weights of the
+members; in between, shares and cash are constant, so the equity of all other bars
+is filled in with one (dates x tickers) product. Only rebalance bars are visited
+one by one, and their work is vectorized across tickers.
+"""
+import numpy as np
+import pandas as pd
+
+from .data_provider import to_panel
+
+
+def load_panels(data: dict, fields=("Open", "High", "Low", "Close", "Volume")) -> dict:
+    """{field: (dates x tickers) panel} from a {ticker: DataFrame} dict (e.g. get_stocks_data)."""
+    return {field: to_panel(data, field) for field in fields if all(field in df for df in data.values())}
+
+
+class PortfolioBacktest:
+    """
+    Args:
+        strategy (BaseStrategy): Provides panel_targets and the account settings
+            (initial_cash, monthly_contribution, trading_start_date).
+        weighting (str): 'equal' (1 / members) or 'inverse_vol' (1 / trailing volatility).
+        max_positions (int): Cap on members (None: no cap). When more tickers qualify,
+            current holdings are kept and free slots go to the best trailing return.
+        max_weight (float): Cap per position; the rest stays in cash.
+        commission (float): Fee as a fraction of traded notional.
+        vol_window (int): Bars of daily returns for inverse_vol.
+        rank_window (int): Bars of trailing return used to fill max_positions slots.
+    """
+
+    def __init__(self, strategy, weighting='equal', max_positions=None, max_weight=1.0, commission=0.0,
+                 vol_window=60, rank_window=63):
+        if weighting not in ('equal', 'inverse_vol'):
+            raise ValueError(f"Unknown weighting: {weighting}")
+        self.strategy = strategy
+        self.weighting = weighting
+        self.max_positions = max_positions
+        self.max_weight = max_weight
+        self.commission = commission
+        self.vol_window = vol_window
+        self.rank_window = rank_window
+        self.positions = None
+
+    def run(self, panels: dict) -> pd.DataFrame:
+        """
+        Args:
+            panels (dict): {field: (dates x tickers) DataFrame} with at least the fields
+                the strategy needs; 'Close' is used for fills and valuation.
+
+        Returns:
+            pd.DataFrame: Equity, Cash, Invested and Positions (count) per date.
+            Shares held per date and ticker are kept in self.positions.
+        """
+        close = panels['Close'].astype(float)
+        index, tickers = close.index, close.columns
+        n_bars, n_tickers = close.shape
+        strategy = self.strategy
+
+        trading, _, contributions = strategy._contribution_schedule(index)
+        valid = close.notna().to_numpy()
+        # Delisted / missing bars are valued (and sold) at the last known price
+        price = close.ffill().fillna(0.0).to_numpy()
+
+        target = strategy.panel_targets(panels)
+        if target is None:
+            raise ValueError(f"{strategy.name} has no panel_targets (multi-ticker) form")
+        # Targets before trading starts are ignored, like simulate_target_position
+        target = np.where(trading[:, None], target, np.nan)
+        qualified = (pd.DataFrame(target).ffill().to_numpy() == 1) & valid
+
+        changed = np.zeros(n_bars, dtype=bool)
+        changed[1:] = (qualified[1:] != qualified[:-1]).any(axis=1)
+        first = np.flatnonzero(trading)[:1]
+        changed[first] = True
+        events = np.flatnonzero(trading & (changed | (contributions != 0)))
+
+        score = self._rank_scores(close) if self.max_positions else None
+        inv_vol = self._inverse_vol(close) if self.weighting == 'inverse_vol' else None
+
+        cash = float(strategy.initial_cash)
+        shares = np.zeros(n_tickers)
+        members = np.zeros(n_tickers, dtype=bool)
+        event_cash = np.empty(len(events))
+        event_shares = np.empty((len(events), n_tickers))
+
+        for k, t in enumerate(events):
+            p = price[t]
+            cash += contributions[t]
+            equity = cash + shares @ p
+
+            members = self._select(qualified[t], members, score[t] if score is not None else None)
+            weights = self._weights(members, inv_vol[t] if inv_vol is not None else None)
+            budget = self._net_of_fees(equity, weights, shares * p)
+            new_shares = np.zeros(n_tickers)
+            np.divide(budget * weights, p, out=new_shares, where=members)
+
+            fees = self.commission * (np.abs(new_shares - shares) @ p)
+            # Non-negative up to rounding (budget is sized so that positions + fees fit in equity)
+            cash = max(equity - new_shares @ p - fees, 0.0)
+            shares = new_shares
+            event_cash[k] = cash
+            event_shares[k] = shares
+
+        # Positions are constant between rebalance bars
+        slot = np.searchsorted(events, np.arange(n_bars), side='right') - 1
+        held = slot >= 0
+        shares_panel = np.zeros((n_bars, n_tickers))
+        shares_panel[held] = event_shares[slot[held]]
+        cash_series = np.full(n_bars, float(strategy.initial_cash))
+        cash_series[held] = event_cash[slot[held]]
+        invested = np.einsum('ij,ij->i', shares_panel, price)
+
+        self.positions = pd.DataFrame(shares_panel, index=index, columns=tickers)
+        return pd.DataFrame({
+            'Equity': cash_series + invested,
+            'Cash': cash_series,
+            'Invested': invested,
+            'Positions': (shares_panel > 0).sum(axis=1),
+        }, index=index)
+
+    def _select(self, qualified: np.ndarray, members: np.ndarray, score) -> np.ndarray:
+        """Members after this bar: everything qualified, or holdings first, then best score, up to max_positions."""
+        cap = self.max_positions
+        if not cap or qualified.sum() <= cap:
+            return qualified.copy()
+        keep = qualified & members
+        if keep.sum() >= cap:
+            pool, selected, n_pick = keep, np.zeros_like(keep), cap
+        else:
+            pool, selected, n_pick = qualified & ~members, keep.copy(), cap - keep.sum()
+        candidates = np.flatnonzero(pool)
+        best = candidates[np.argsort(-score[candidates], kind='stable')][:n_pick]
+        selected[best] = True
+        return selected
+
+    def _net_of_fees(self, equity: float, weights: np.ndarray, held: np.ndarray) -> float:
+        """
+        Amount F to allocate by weights so that F + fees on the resulting trades equals
+        equity, i.e. F = equity - commission * sum |F * w - held|. The right-hand side is
+        a contraction (slope <= commission), so a few fixed-point steps reach it exactly.
+        """
+        if self.commission == 0:
+            return equity
+        budget = equity
+        for _ in range(100):
+            nxt = equity - self.commission * np.abs(budget * weights - held).sum()
+            if abs(nxt - budget) <= 1e-15 * abs(equity):
+                return nxt
+            budget = nxt
+        return budget
+
+    def _weights(self, members: np.ndarray, inv_vol) -> np.ndarray:
+        n = members.sum()
+        if n == 0:
+            return np.zeros(len(members))
+        if inv_vol is None:
+            weights = members / n
+        else:
+            raw = np.where(members, inv_vol, 0.0)
+            # Members without a volatility estimate yet get the average inverse vol
+            missing = members & ~np.isfinite(raw)
+            if missing.any():
+                known = raw[members & ~missing]
+                raw[missing] = known.mean() if len(known) else 1.0
+            weights = raw / raw.sum()
+        return np.minimum(weights, self.max_weight)
+
+    def _rank_scores(self, close: pd.DataFrame) -> np.ndarray:
+        score = (close / close.shift(self.rank_window) - 1).to_numpy()
+        return np.where(np.isnan(score), -1e300, score)
+
+    def _inverse_vol(self, close: pd.DataFrame) -> np.ndarray:
+        vol = close.pct_change(fill_method=None).rolling(self.vol_window).std().to_numpy()
+        with np.errstate(divide='ignore'):
+            return np.where(vol > 0, 1.0 / vol, np.nan)
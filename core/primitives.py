@@ -0,0 +1,65 @@
+"""
+Whole-array versions of the 通达信 (TDX) formula primitives the indicators port.
+
+Every function accepts a pd.Series or a NumPy array and returns the same kind
+(Series keep their index). None of them loop in Python.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _values(x) -> np.ndarray:
+    return x.values if isinstance(x, pd.Series) else np.asarray(x)
+
+
+def _wrap(like, values: np.ndarray):
+    return pd.Series(values, index=like.index) if isinstance(like, pd.Series) else values
+
+
+def BARSLAST(cond):
+    """
+    Bars since cond was last true (0 on the bar itself); NaN before the first true bar.
+    Running max of "index where true" instead of a Python loop.
+    """
+    vals = _values(cond).astype(bool)
+    idx = np.arange(len(vals))
+    last = np.maximum.accumulate(np.where(vals, idx, -1)) if len(vals) else idx
+    res = np.where(last >= 0, idx - last, np.nan).astype(float)
+    return _wrap(cond, res)
+
+
+def LLV(x, n: int, min_periods: int = 1):
+    """
+    Lowest value over the last n bars (n=0: since the first bar).
+    Like TDX, the first bars use the partial window; pass min_periods=n for pandas' NaN warm-up.
+    """
+    s = pd.Series(_values(x), dtype=float)
+    res = s.cummin() if n == 0 else s.rolling(window=n, min_periods=min_periods).min()
+    return _wrap(x, res.values)
+
+
+def HHV(x, n: int, min_periods: int = 1):
+    """Highest value over the last n bars (n=0: since the first bar). See LLV."""
+    s = pd.Series(_values(x), dtype=float)
+    res = s.cummax() if n == 0 else s.rolling(window=n, min_periods=min_periods).max()
+    return _wrap(x, res.values)
+
+
+def REF(x, n: int = 1):
+    """Value n bars ago; NaN for the first n bars."""
+    vals = _values(x).astype(float)
+    res = np.full(len(vals), np.nan)
+    if n == 0:
+        res[:] = vals
+    elif n < len(vals):
+        res[n:] = vals[:-n]
+    return _wrap(x, res)
+
+
+def CROSS(a, b):
+    """True on the bar where a moves from <= b to > b."""
+    above = _values(a) > _values(b)
+    res = np.zeros(len(above), dtype=bool)
+    res[1:] = above[1:] & ~above[:-1]
+    like = a if isinstance(a, pd.Series) else b
+    return _wrap(like, res)
@@ -0,0 +1,290 @@
+import os
+import json
+import time
+from abc import ABC, abstractmethod
+
+import pandas as pd
+import yfinance as yf
+
+from .cache import period_start, _localize, _naive
+
+
+class DataProvider(ABC):
+    """
+    Market data source. Implementations return bars as a DataFrame with a sorted
+    DatetimeIndex and flat columns [Open, High, Low, Close, Volume].
+    """
+    name = "base"
+    # Whether bars from this provider should go through the on-disk BarCache
+    cacheable = True
+    # Max latest_price requests per second for core.quotes.QuoteService (None: no limit)
+    quote_rate = None
+    # Whether latest_prices quotes many tickers with a few batched requests
+    batch_quotes = False
+
+    @abstractmethod
+    def fetch_bars(self, ticker: str, start=None, end=None, period: str = "max", interval: str = "1d") -> pd.DataFrame:
+        """Bars in [start, end), or the last `period` if start is None."""
+        pass
+
+    def fetch_bars_many(self, tickers: list, start=None, end=None, period: str = "max", interval: str = "1d",
+                        chunk_size: int = None) -> dict:
+        """
+        Bars for several tickers as {ticker: DataFrame}. Tickers without data are omitted.
+        chunk_size is a hint for providers that batch requests.
+        """
+        result = {}
+        for ticker in tickers:
+            df = self.fetch_bars(ticker, start, end, period, interval)
+            if df is not None and not df.empty:
+                result[ticker] = df
+        return result
+
+    @abstractmethod
+    def latest_price(self, ticker: str) -> float:
+        """Last traded price, or None if the ticker could not be quoted."""
+        pass
+
+    def latest_prices(self, tickers: list) -> dict:
+        """Last prices as {ticker: price}. Tickers that could not be quoted are omitted."""
+        result = {}
+        for ticker in tickers:
+            price = self.latest_price(ticker)
+            if price is not None:
+                result[ticker] = price
+        return result
+
+    @abstractmethod
+    def metadata(self, ticker: str) -> dict:
+        """Fundamentals dict (same keys as yfinance Ticker.info)."""
+        pass
+
+    @abstractmethod
+    def earnings_calendar(self, ticker: str) -> dict:
+        """Calendar dict (same keys as yfinance Ticker.calendar, e.g. 'Earnings Date')."""
+        pass
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # yfinance sometimes returns multi-level columns if multiple tickers, but here we assume one.
+    if isinstance(df.columns, pd.MultiIndex):
+        # Flatten multi-index columns if they exist (e.g. ('Close', 'TQQQ') -> 'Close')
+        # Keep only the Price column names
+        try:
+            df.columns = df.columns.droplevel(1)
+        except:
+            pass
+    return df
+
+
+def split_tickers(df: pd.DataFrame, tickers: list) -> dict:
+    """Split a multi-ticker yfinance frame into {ticker: single-ticker OHLCV frame}."""
+    result = {}
+    if df is None or df.empty:
+        return result
+    if not isinstance(df.columns, pd.MultiIndex):
+        # Single ticker requests may come back flat
+        if len(tickers) == 1:
+            result[tickers[0]] = df
+        return result
+
+    ticker_level = 0 if set(df.columns.get_level_values(0)) & set(tickers) else 1
+    for ticker in tickers:
+        if ticker not in df.columns.get_level_values(ticker_level):
+            continue
+        sub = df.xs(ticker, axis=1, level=ticker_level)
+        sub.columns.name = None
+        # Frames are padded to the union calendar of the chunk; drop rows this ticker never traded
+        sub = sub.dropna(how='all')
+        if not sub.empty:
+            result[ticker] = sub
+    return result
+
+
+class YFinanceProvider(DataProvider):
+    name = "yfinance"
+    quote_rate = 50.0
+    batch_quotes = True
+
+    def __init__(self, chunk_size: int = 100, session=None):
+        """
+        Args:
+            chunk_size (int): Max tickers per batched download request.
+            session: Optional HTTP session shared by every request (and thread). When None,
+                yfinance's own process-wide session is reused.
+        """
+        self.chunk_size = chunk_size
+        self.session = session
+
+    def fetch_bars(self, ticker, start=None, end=None, period="max", interval="1d"):
+        if start is not None:
+            df = yf.download(ticker, start=start, end=end, interval=interval, progress=False, session=self.session)
+        else:
+            df = yf.download(ticker, period=period, interval=interval, progress=False, session=self.session)
+        return normalize_columns(df)
+
+    def fetch_bars_many(self, tickers, start=None, end=None, period="max", interval="1d", chunk_size=None):
+        """Download tickers in chunks of chunk_size, one request per chunk."""
+        chunk_size = chunk_size or self.chunk_size
+        result = {}
+        for i in range(0, len(tickers), chunk_size):
+            chunk = tickers[i:i + chunk_size]
+            if start is not None:
+                df = yf.download(chunk, start=start, end=end, interval=interval, group_by='ticker',
+                                 threads=True, progress=False, session=self.session)
+            else:
+                df = yf.download(chunk, period=period, interval=interval, group_by='ticker',
+                                 threads=True, progress=False, session=self.session)
+            result.update(split_tickers(df, chunk))
+        return result
+
+    def latest_price(self, ticker):
+        ticker_obj = yf.Ticker(ticker, session=self.session)
+        # Try to get fast info first (faster)
+        try:
+            price = ticker_obj.fast_info['last_price']
+            return price
+        except:
+            pass
+
+        # Fallback to history
+        df = ticker_obj.history(period="1d")
+        if not df.empty:
+            return df['Close'].iloc[-1]
+        return None
+
+    def latest_prices(self, tickers, chunk_size=None):
+        """Last 1-minute close of each ticker, one batched download per chunk of chunk_size."""
+        chunk_size = chunk_size or self.chunk_size
+        result = {}
+        for i in range(0, len(tickers), chunk_size):
+            chunk = tickers[i:i + chunk_size]
+            df = yf.download(chunk, period="1d", interval="1m", group_by='ticker',
+                             threads=True, progress=False, session=self.session)
+            for ticker, bars in split_tickers(df, chunk).items():
+                close = bars['Close'].dropna()
+                if not close.empty:
+                    result[ticker] = float(close.iloc[-1])
+        return result
+
+    def metadata(self, ticker):
+        return yf.Ticker(ticker, session=self.session).info
+
+    def earnings_calendar(self, ticker):
+        return yf.Ticker(ticker, session=self.session).calendar
+
+
+class ReplayProvider(DataProvider):
+    """
+    Offline provider serving recorded fixtures, for deterministic benchmarks and
+    regression runs with no network.
+
+    Layout under `root`:
+        <interval>/<TICKER>.csv (or .parquet)   bars, first column is the date index
+        info/<TICKER>.json                       {"info": {...}, "calendar": {...}}
+
+    Periods ("2y", "6mo") are measured back from the last recorded bar instead of
+    today, so results do not drift as the wall clock moves.
+    """
+    name = "replay"
+    cacheable = False
+
+    def __init__(self, root: str, speed: float = None, tz: str = "America/New_York"):
+        """
+        Args:
+            root (str): Fixture directory (see record_fixtures).
+            speed (float): Bars per second for stream(); None replays as fast as possible.
+            tz (str): Timezone for recorded intraday bars (CSV keeps only the UTC offset).
+        """
+        self.root = root
+        self.speed = speed
+        self.tz = tz
+        self._frames = {}
+        # Last bar emitted by stream() per ticker; latest_price follows it while replaying
+        self._cursor = {}
+
+    def _load(self, ticker: str, interval: str) -> pd.DataFrame:
+        key = (ticker, interval)
+        if key not in self._frames:
+            base = os.path.join(self.root, interval, ticker.upper())
+            if os.path.exists(base + ".parquet"):
+                df = pd.read_parquet(base + ".parquet")
+            elif os.path.exists(base + ".csv"):
+                df = pd.read_csv(base + ".csv", index_col=0)
+                try:
+                    index = pd.to_datetime(df.index)
+                except (ValueError, TypeError):
+                    # Intraday bars with mixed UTC offsets (DST)
+                    index = pd.to_datetime(df.index, utc=True)
+                if index.tz is not None:
+                    index = index.tz_convert(self.tz)
+                df.index = index
+            else:
+                df = pd.DataFrame()
+            self._frames[key] = df.sort_index()
+        return self._frames[key]
+
+    def fetch_bars(self, ticker, start=None, end=None, period="max", interval="1d"):
+        df = self._load(ticker, interval)
+        if df.empty:
+            return df
+        if start is None:
+            start = period_start(period, now=_naive(df.index[-1]))
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= df.index >= _localize(pd.Timestamp(start), df.index.tz)
+        if end is not None:
+            mask &= df.index < _localize(pd.Timestamp(end), df.index.tz)
+        return df[mask.values].copy()
+
+    def stream(self, ticker: str, interval: str = "1d", start=None, end=None, speed: float = None):
+        """
+        Yield (timestamp, bar) one bar at a time, sleeping 1/speed seconds between bars.
+        """
+        speed = speed if speed is not None else self.speed
+        df = self.fetch_bars(ticker, start, end, interval=interval)
+        delay = 1.0 / speed if speed else 0.0
+        for ts, bar in df.iterrows():
+            self._cursor[ticker] = bar['Close']
+            yield ts, bar
+            if delay:
+                time.sleep(delay)
+
+    def latest_price(self, ticker):
+        if ticker in self._cursor:
+            return float(self._cursor[ticker])
+        df = self._load(ticker, "1d")
+        return float(df['Close'].iloc[-1]) if not df.empty else None
+
+    def _info(self, ticker: str) -> dict:
+        path = os.path.join(self.root, "info", f"{ticker.upper()}.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def metadata(self, ticker):
+        return self._info(ticker).get("info", {})
+
+    def earnings_calendar(self, ticker):
+        calendar = self._info(ticker).get("calendar", {})
+        if "Earnings Date" in calendar:
+            calendar["Earnings Date"] = [pd.to_datetime(d).date() for d in calendar["Earnings Date"]]
+        return calendar
+
+
+def record_fixtures(source: DataProvider, root: str, tickers: list, period: str = "2y", interval: str = "1d",
+                    include_info: bool = True):
+    """Record bars (and optionally info/calendar) from `source` into a ReplayProvider fixture directory."""
+    os.makedirs(os.path.join(root, interval), exist_ok=True)
+    for ticker, df in source.fetch_bars_many(tickers, period=period, interval=interval).items():
+        df.to_csv(os.path.join(root, interval, f"{ticker.upper()}.csv"))
+        if include_info:
+            os.makedirs(os.path.join(root, "info"), exist_ok=True)
+            try:
+                record = {"info": source.metadata(ticker), "calendar": source.earnings_calendar(ticker)}
+            except Exception as e:
+                print(f"Error fetching info for {ticker}: {e}")
+                continue
+            with open(os.path.join(root, "info", f"{ticker.upper()}.json"), "w") as f:
+                json.dump(record, f, default=str)
@@ -0,0 +1,152 @@
+import math
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RateLimiter:
+    """Thread-safe token bucket: at most `rate` acquisitions per second, bursts up to `burst`."""
+
+    def __init__(self, rate: float = 10.0, burst: int = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class QuoteService:
+    """
+    Concurrent latest-price lookups on top of a DataProvider.
+
+    Large lists go to the provider's batched latest_prices first (one request per
+    chunk, for providers with batch_quotes). Single lookups, and tickers the batch
+    missed, run on a bounded thread pool (the provider's HTTP session is shared
+    across threads), are throttled by a RateLimiter, retried with exponential
+    backoff when the provider raises (a missing price returns 0.0 at once), and memoized for `ttl` seconds so repeated refreshes within a short
+    window do not hit the network.
+    """
+
+    def __init__(self, provider_getter, max_workers: int = 16, rate: float = None, ttl: float = 5.0,
+                 retries: int = 3, backoff: float = 0.5, batch_min: int = 20):
+        """
+        Args:
+            provider_getter (callable): Returns the active DataProvider (looked up per call so
+                core.data_provider.set_provider takes effect immediately).
+            max_workers (int): Thread pool size.
+            rate (float): Max requests per second across all threads (None: the provider's
+                quote_rate, unlimited if that is None too).
+            ttl (float): Seconds a quote stays valid in the in-memory cache.
+            retries (int): Attempts per ticker before giving up on provider errors.
+            backoff (float): Initial retry delay in seconds, doubled after each failure.
+            batch_min (int): Uncached tickers in a get_many call from which the batched
+                request is used.
+        """
+        self.provider_getter = provider_getter
+        self.max_workers = max_workers
+        self.rate = rate
+        self._limiters = {}  # rate -> RateLimiter
+        self.ttl = ttl
+        self.retries = retries
+        self.backoff = backoff
+        self.batch_min = batch_min
+        self._cache = {}  # ticker -> (price, timestamp)
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="quote")
+        return self._pool
+
+    def _cached(self, ticker: str):
+        with self._lock:
+            hit = self._cache.get(ticker)
+        if hit and time.monotonic() - hit[1] < self.ttl:
+            return hit[0]
+        return None
+
+    def _throttle(self, provider):
+        rate = self.rate if self.rate is not None else provider.quote_rate
+        if rate is None:
+            return
+        with self._lock:
+            limiter = self._limiters.get(rate)
+            if limiter is None:
+                limiter = self._limiters[rate] = RateLimiter(rate)
+        limiter.acquire()
+
+    def _store(self, ticker: str, price) -> bool:
+        """Cache a quote; False if price is missing (0.0 is a valid price)."""
+        if price is None or math.isnan(price):
+            return False
+        with self._lock:
+            self._cache[ticker] = (price, time.monotonic())
+        return True
+
+    def _fetch(self, ticker: str) -> float:
+        provider = self.provider_getter()
+        delay = self.backoff
+        for attempt in range(self.retries):
+            self._throttle(provider)
+            try:
+                price = provider.latest_price(ticker)
+            except Exception as e:
+                # Only errors are transient; a missing price is an answer and is not retried
+                if attempt == self.retries - 1:
+                    print(f"Error fetching quote for {ticker}: {e}")
+                else:
+                    time.sleep(delay)
+                    delay *= 2
+                continue
+            return price if self._store(ticker, price) else 0.0
+        return 0.0
+
+    def get(self, ticker: str) -> float:
+        price = self._cached(ticker)
+        return price if price is not None else self._fetch(ticker)
+
+    def get_many(self, tickers: list) -> dict:
+        """Latest prices as {ticker: price}; 0.0 for tickers that could not be quoted."""
+        result = {}
+        missing = []
+        for ticker in dict.fromkeys(tickers):
+            price = self._cached(ticker)
+            if price is None:
+                missing.append(ticker)
+            else:
+                result[ticker] = price
+        provider = self.provider_getter()
+        if len(missing) >= self.batch_min and provider.batch_quotes:
+            self._throttle(provider)
+            try:
+                quoted = provider.latest_prices(missing)
+            except Exception as e:
+                print(f"Error fetching batched quotes: {e}")
+                quoted = {}
+            for ticker, price in quoted.items():
+                if self._store(ticker, price):
+                    result[ticker] = price
+            missing = [ticker for ticker in missing if ticker not in result]
+        if missing:
+            result.update(zip(missing, self._executor().map(self._fetch, missing)))
+        return {ticker: result[ticker] for ticker in dict.fromkeys(tickers)}
+
+    def invalidate(self, ticker: str = None):
+        with self._lock:
+            if ticker is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(ticker, None)
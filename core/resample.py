@@ -0,0 +1,141 @@
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Tick
+
+from .data_provider import get_stock_data
+
+OHLCV_AGG = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum'
+}
+
+# timeframe -> (pandas rule, upper bound on bucket width; days get slack for DST)
+TIMEFRAMES = {
+    '2h': ('2h', pd.Timedelta(hours=2)),
+    '4h': ('4h', pd.Timedelta(hours=4)),
+    '1d': ('1D', pd.Timedelta(days=2)),
+    '1wk': ('W-FRI', pd.Timedelta(days=8)),
+}
+
+
+def _origin_kwargs(rule: str, origin) -> dict:
+    # origin only applies to fixed-width (hourly and finer) rules
+    if origin is not None and isinstance(to_offset(rule), Tick):
+        return {'origin': origin}
+    return {}
+
+
+def resample_bars(df: pd.DataFrame, timeframe: str, origin=None) -> pd.DataFrame:
+    """
+    Aggregate OHLCV bars to a coarser timeframe ('2h', '4h', '1d', '1wk').
+    Empty buckets (nights, weekends) are dropped.
+    """
+    rule = TIMEFRAMES[timeframe][0]
+    agg = {col: how for col, how in OHLCV_AGG.items() if col in df.columns}
+    return df.resample(rule, **_origin_kwargs(rule, origin)).agg(agg).dropna()
+
+
+class ResampleCache:
+    """
+    One base-resolution series per ticker plus memoized derived timeframes.
+
+    append() merges new base bars and re-aggregates only the trailing buckets they
+    touch: everything before the bucket holding the first new bar is kept as is.
+    Buckets are anchored to the midnight of the first base bar (pandas' default
+    'start_day' origin), so results match a full df.resample(rule) of the history.
+    """
+
+    def __init__(self):
+        self._base = {}
+        self._origin = {}
+        self._derived = {}  # (ticker, timeframe) -> DataFrame
+
+    def set_base(self, ticker: str, df: pd.DataFrame):
+        """Replace the base series for ticker and drop its derived timeframes."""
+        self._base[ticker] = df.sort_index()
+        self._origin[ticker] = df.index[0].normalize() if not df.empty else None
+        for key in [k for k in self._derived if k[0] == ticker]:
+            del self._derived[key]
+
+    def base(self, ticker: str) -> pd.DataFrame:
+        return self._base.get(ticker)
+
+    def append(self, ticker: str, bars: pd.DataFrame):
+        """
+        Merge new (or revised trailing) base bars and update cached derived timeframes.
+        """
+        if bars is None or bars.empty:
+            return
+        if ticker not in self._base or self._base[ticker].empty:
+            self.set_base(ticker, bars)
+            return
+
+        base = pd.concat([self._base[ticker], bars])
+        base = base[~base.index.duplicated(keep='last')].sort_index()
+        self._base[ticker] = base
+        first_new = bars.index.min()
+
+        for (t, timeframe), derived in list(self._derived.items()):
+            if t != ticker:
+                continue
+            rule, width = TIMEFRAMES[timeframe]
+            # Bucket holding the first new bar; everything from there on is recomputed
+            label = self.bucket_label(ticker, first_new, timeframe)
+            # Any bucket starts at most `width` before the bars it holds
+            tail = resample_bars(base[base.index >= first_new - width], timeframe, self._origin[ticker])
+            self._derived[(t, timeframe)] = pd.concat([derived[derived.index < label], tail[tail.index >= label]])
+
+    def bucket_label(self, ticker: str, ts: pd.Timestamp, timeframe: str) -> pd.Timestamp:
+        """Label of the timeframe bucket that a base bar at `ts` falls into."""
+        probe = pd.Series([0], index=pd.DatetimeIndex([ts]))
+        rule = TIMEFRAMES[timeframe][0]
+        return probe.resample(rule, **_origin_kwargs(rule, self._origin[ticker])).sum().index[0]
+
+    def get(self, ticker: str, timeframe: str) -> pd.DataFrame:
+        """Bars for ticker at timeframe, aggregated from the base series on first use."""
+        key = (ticker, timeframe)
+        if key not in self._derived:
+            base = self._base[ticker]
+            self._derived[key] = resample_bars(base, timeframe, self._origin[ticker])
+        return self._derived[key]
+
+
+# One ResampleCache per base interval
+_resample_caches = {}
+
+
+def get_resampled_data(ticker: str, timeframe: str, start_date: str = None, end_date: str = None,
+                       period: str = "700d", base_interval: str = "1h") -> pd.DataFrame:
+    """
+    Bars at any timeframe, derived from one cached base-resolution series.
+
+    If timeframe equals base_interval the bars are returned as fetched. Otherwise the
+    base bars come from get_stock_data (on-disk cache, so only the tail is downloaded)
+    and only bars at or after the last known base bar are fed to the ResampleCache.
+
+    Args:
+        ticker (str): Stock symbol.
+        timeframe (str): '2h', '4h', '1d' or '1wk' (or base_interval itself).
+        start_date, end_date (str): Date range in "YYYY-MM-DD" format.
+        period (str): Period if dates are not provided (yfinance keeps ~730 days of 1h bars).
+        base_interval (str): Resolution of the stored base series.
+    """
+    df = get_stock_data(ticker, start_date=start_date, end_date=end_date, period=period, interval=base_interval)
+    if timeframe == base_interval or df.empty:
+        return df
+
+    cache = _resample_caches.setdefault(base_interval, ResampleCache())
+    base = cache.base(ticker)
+    if base is None or base.empty or df.index[0] < base.index[0]:
+        cache.set_base(ticker, df)
+    else:
+        cache.append(ticker, df[df.index >= base.index[-1]])
+
+    result = cache.get(ticker, timeframe)
+    # Restrict to the requested range (the cached base may cover more)
+    lo = cache.bucket_label(ticker, df.index[0], timeframe)
+    hi = cache.bucket_label(ticker, df.index[-1], timeframe)
+    return result[(result.index >= lo) & (result.index <= hi)]
@@ -0,0 +1,166 @@
+"""
+Shared-memory price/indicator arrays for multiprocess backtests.
+
+The parent publishes a frame once:
+
+    with SharedDataset.publish(df, indicators=CACHED_COLUMNS) as data:
+        with ProcessPoolExecutor(initializer=attach, initargs=(data.handle,)) as pool:
+            ...
+
+and workers call attach(handle), which maps the same pages and returns read-only
+NumPy views, so N workers cost about one copy of the data instead of N pickled
+DataFrames. The handle is a small dict (segment name, columns, length, tz), cheap
+to send with every task.
+
+One segment holds the int64 ns timestamps followed by a float64 (columns x bars)
+block, so every column is a contiguous row. The segment is unlinked by
+SharedDataset.close() (or leaving the with block), when the owner is garbage
+collected or the interpreter exits, and, if the owner is killed, by the
+multiprocessing resource tracker, which removes segments its parent leaked.
+"""
+import sys
+import weakref
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from .indicators import TechnicalIndicators
+
+# Segments attached in this process, kept open while their views are in use
+_attached = {}
+
+
+def _layout(handle: dict):
+    n, k = handle['length'], len(handle['columns'])
+    return n, k, 8 * n, 8 * n * (k + 1)
+
+
+def _release(shm: SharedMemory, unlink: bool):
+    try:
+        shm.close()
+    except BufferError:  # Views still exported; the mapping goes away with the process
+        pass
+    if unlink:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedDataset:
+    """Owner of a published segment (see module docstring)."""
+
+    def __init__(self, index: pd.DatetimeIndex, arrays: dict):
+        """
+        Args:
+            index (pd.DatetimeIndex): Bar timestamps.
+            arrays (dict): {column: 1D array aligned to index}; stored as float64.
+        """
+        index = pd.DatetimeIndex(index)
+        utc = index.tz_convert("UTC").tz_localize(None) if index.tz is not None else index
+        stamps = utc.as_unit("ns").asi8
+        self.handle = {
+            'name': None,
+            'columns': list(arrays),
+            'length': len(index),
+            'tz': str(index.tz) if index.tz is not None else None,
+        }
+        n, k, offset, size = _layout(self.handle)
+        self._shm = SharedMemory(create=True, size=max(size, 1))
+        self.handle['name'] = self._shm.name
+        self._finalizer = weakref.finalize(self, _release, self._shm, True)
+
+        np.ndarray(n, dtype=np.int64, buffer=self._shm.buf)[:] = stamps
+        block = np.ndarray((k, n), dtype=np.float64, buffer=self._shm.buf, offset=offset)
+        for row, col in enumerate(self.handle['columns']):
+            block[row] = arrays[col]
+        del block
+
+    @classmethod
+    def publish(cls, df: pd.DataFrame, columns: list = None, indicators: list = None, **params) -> "SharedDataset":
+        """
+        Publish columns of df, plus registered indicators computed on it.
+
+        Args:
+            df (pd.DataFrame): Bars with a DatetimeIndex.
+            columns (list): Columns of df to share (default: all numeric columns).
+            indicators (list): Registered indicator names (e.g. indicator_cache.CACHED_COLUMNS).
+            **params: Indicator parameters (n1, n2, lookback, ...).
+        """
+        columns = columns if columns is not None else list(df.select_dtypes('number').columns)
+        arrays = {col: df[col].to_numpy(dtype=float) for col in columns}
+        if indicators:
+            arrays.update(TechnicalIndicators.indicator_arrays(df, indicators, **params))
+        return cls(df.index, arrays)
+
+    @property
+    def nbytes(self) -> int:
+        return _layout(self.handle)[3]
+
+    def close(self):
+        """Unlink the segment. Workers that already attached keep their mapping until they exit."""
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SharedView:
+    """Read-only views of a published dataset in the attaching process."""
+
+    def __init__(self, handle: dict, shm: SharedMemory):
+        n, k, offset, _ = _layout(handle)
+        self.handle = handle
+        stamps = np.ndarray(n, dtype=np.int64, buffer=shm.buf)
+        block = np.ndarray((k, n), dtype=np.float64, buffer=shm.buf, offset=offset)
+        stamps.flags.writeable = False
+        block.flags.writeable = False
+        index = pd.DatetimeIndex(stamps.view("datetime64[ns]"))
+        self.index = index.tz_localize("UTC").tz_convert(handle['tz']) if handle['tz'] else index
+        self.block = block
+        self.arrays = {col: block[row] for row, col in enumerate(handle['columns'])}
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.arrays[column]
+
+    def frame(self, columns: list = None) -> pd.DataFrame:
+        """DataFrame over the shared columns, without copying them."""
+        columns = columns or self.handle['columns']
+        return pd.DataFrame({col: self.arrays[col] for col in columns}, index=self.index, copy=False)
+
+
+def _open(name: str) -> SharedMemory:
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    # Before 3.13 attaching also registers the segment with the resource tracker, which
+    # would unlink it (and warn) when this worker exits; only the owner should track it.
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def attach(handle: dict) -> SharedView:
+    """
+    Read-only view of a published dataset; repeated calls in one process reuse the mapping.
+    Usable directly as a pool initializer (initializer=attach, initargs=(handle,)).
+    """
+    name = handle['name']
+    if name not in _attached:
+        shm = _open(name)
+        _attached[name] = (shm, SharedView(handle, shm))
+    return _attached[name][1]
+
+
+def detach(handle: dict):
+    """Drop this process' mapping of a dataset (the owner still decides when it is unlinked)."""
+    entry = _attached.pop(handle['name'], None)
+    if entry is not None:
+        _release(entry[0], unlink=False)
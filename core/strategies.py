@@ -1,9 +1,28 @@
 import pandas as pd
 import numpy as np
 from abc import ABC, abstractmethod
-from .indicators import TechnicalIndicators
+from .indicators import TechnicalIndicators, panel_ladder
+from .engine import IndicatorEngine
+from .vectorized import (month_starts, simulate_target_position, simulate_target_position_batch,
+                         simulate_buy_and_hold, simulate_dca)
+from .harness import kernel, bar_arrays, kernel_input
+from .lot_book import new_book, push_lot, pop_tp_hits
 
 class BaseStrategy(ABC):
+    """
+    A strategy implements run(df). Optional hooks let the array engines run it faster:
+
+    - prepare(df) / run_prepared(df): indicators computed once, windows run on slices
+      (core.walk_forward). Default: df unchanged / run(df).
+    - target_arrays(df): (close, target) for simulate_target_position (core.walk_forward).
+    - panel_targets(panels): (dates x tickers) targets (core.portfolio, and core.monte_carlo
+      through the default simulate_paths).
+    - simulate_paths(paths, index, schedule): equity over many price paths at once (core.monte_carlo).
+
+    The last three return None when the strategy has no such form: core.walk_forward then
+    falls back to run_prepared, core.portfolio and core.monte_carlo raise ValueError.
+    """
+
     def __init__(self, name, initial_cash=100000, monthly_contribution=2000, trading_start_date=None):
         self.name = name
         self.initial_cash = initial_cash
@@ -36,7 +55,74 @@ class BaseStrategy(ABC):
         if self.trading_start_date is None:
             return True
         return date >= self.trading_start_date
+
+    def _contribution_schedule(self, index) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Whole-index version of _should_trade / _inject_monthly_cash.
+
+        Returns the trading mask, the month-start mask and the cash contributed on each
+        bar, and advances the monthly contribution state exactly like the per-bar calls would.
+        """
+        if self.trading_start_date is None:
+            trading = np.ones(len(index), dtype=bool)
+        else:
+            trading = np.asarray(index >= self.trading_start_date)
+        month_start, self._last_contribution_month = month_starts(index, trading, self._last_contribution_month)
+        return trading, month_start, np.where(month_start, float(self.monthly_contribution), 0.0)
         
+    def prepare(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        df plus the indicator columns run() needs. Indicators only look back, so
+        core.walk_forward computes them once on the full history and slices windows
+        out of the result, using trading_start_date as the warm-up boundary.
+        """
+        return df
+
+    def run_prepared(self, df: pd.DataFrame) -> pd.DataFrame:
+        """run() on a (slice of a) frame returned by prepare(), without recomputing indicators."""
+        return self.run(df)
+
+    def target_arrays(self, df: pd.DataFrame):
+        """
+        (close, target) arrays of a frame returned by prepare(), for strategies whose
+        run() is simulate_target_position of them; core.walk_forward then simulates
+        windows on slices of the arrays. None: the strategy has no such form.
+        """
+        return None
+
+    def panel_targets(self, panels: dict) -> np.ndarray:
+        """
+        Position targets for many tickers at once, used by core.portfolio.PortfolioBacktest.
+
+        Args:
+            panels (dict): {field: wide (dates x tickers) DataFrame}, e.g. 'Close', 'High', 'Low'.
+
+        Returns:
+            np.ndarray: (dates x tickers) of 1.0 (in), 0.0 (out) or NaN (hold).
+            None: the strategy has no panel (multi-ticker) form.
+        """
+        return None
+
+    def simulate_paths(self, paths: dict, index: pd.DatetimeIndex, schedule: tuple) -> np.ndarray:
+        """
+        Equity on many simulated price paths at once, used by core.monte_carlo.
+        The default runs panel_targets with one column per path (None if it has none).
+
+        Args:
+            paths (dict): {'Close', 'High', 'Low': (paths x time) arrays}.
+            index (pd.DatetimeIndex): Calendar shared by all paths.
+            schedule (tuple): _contribution_schedule(index).
+
+        Returns:
+            np.ndarray: (paths x time) equity, or None.
+        """
+        trading, _, contributions = schedule
+        panels = {field: pd.DataFrame(values.T, index=index) for field, values in paths.items()}
+        target = self.panel_targets(panels)
+        if target is None:
+            return None
+        target = np.asarray(target, dtype=float).T
+        return simulate_target_position_batch(paths['Close'], target, contributions, trading, self.initial_cash)
+
     @abstractmethod
     def run(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -52,29 +138,15 @@ class BuyAndHold(BaseStrategy):
         
     def run(self, df):
         df = df.copy()
-        cash = self.initial_cash
-        shares = 0
-        equity = []
-        
-        for date, row in df.iterrows():
-            price = row['Close']
-            
-            # Only trade and inject cash after trading_start_date
-            if self._should_trade(date):
-                cash, _ = self._inject_monthly_cash(date, cash)
-                if cash > 0:
-                    shares += cash / price
-                    cash = 0
-            else:
-                # Buffer period: just track equity at initial cash
-                equity.append(self.initial_cash)
-                continue
-                
-            equity.append(shares * price)
-        
-        df['Equity'] = equity
+        trading, _, contributions = self._contribution_schedule(df.index)
+        # All cash (initial, then each monthly contribution) is invested on arrival
+        df['Equity'] = simulate_buy_and_hold(df['Close'].to_numpy(dtype=float), trading, contributions, self.initial_cash)
         return df
 
+    def simulate_paths(self, paths, index, schedule):
+        trading, _, contributions = schedule
+        return simulate_buy_and_hold(paths['Close'], trading, contributions, self.initial_cash)
+
 class SimpleDCA(BaseStrategy):
     def __init__(self, initial_cash=100000, monthly_invest=2000, trading_start_date=None):
         super().__init__("Simple DCA", initial_cash, trading_start_date=trading_start_date)
@@ -82,74 +154,54 @@ class SimpleDCA(BaseStrategy):
         
     def run(self, df):
         df = df.copy()
-        cash = self.initial_cash
-        shares = 0
-        equity = []
-        
-        for date, row in df.iterrows():
-            price = row['Close']
-            
-            # Only trade and inject cash after trading_start_date
-            if self._should_trade(date):
-                cash, month_changed = self._inject_monthly_cash(date, cash)
-                if month_changed and cash > 0:
-                    amount = min(cash, self.monthly_invest)
-                    if amount > 0:
-                        shares += amount / price
-                        cash -= amount
-                equity.append(cash + (shares * price))
-            else:
-                # Buffer period: just track equity at initial cash
-                equity.append(self.initial_cash)
-            
-        df['Equity'] = equity
+        trading, month_start, contributions = self._contribution_schedule(df.index)
+        # Each month invest min(cash, monthly_invest)
+        df['Equity'] = simulate_dca(df['Close'].to_numpy(dtype=float), trading, month_start, contributions,
+                                    self.monthly_invest, self.initial_cash)
         return df
 
+    def simulate_paths(self, paths, index, schedule):
+        trading, month_start, contributions = schedule
+        return simulate_dca(paths['Close'], trading, month_start, contributions, self.monthly_invest, self.initial_cash)
+
 class MA200Strategy(BaseStrategy):
-    def __init__(self, initial_cash=100000, trading_start_date=None):
+    def __init__(self, initial_cash=100000, trading_start_date=None, window=200):
         super().__init__("MA 200 Trend", initial_cash, trading_start_date=trading_start_date)
-        
-    def run(self, df):
+        self.window = window
+        self.ma_column = f"MA{window}"
+
+    @staticmethod
+    def _targets(close, ma):
+        # Price > MA200: force full position (all-in); Price < MA200: force empty position (all-out)
+        # No MA yet (or price == MA): hold, contributions stay in cash
+        return np.where(close > ma, 1.0, np.where(close < ma, 0.0, np.nan))
+
+    def prepare(self, df):
         df = df.copy()
-        df['MA200'] = df['Close'].rolling(window=200).mean()
-        
-        cash = self.initial_cash
-        shares = 0
-        equity = []
+        df[self.ma_column] = IndicatorEngine(df).sma('Close', self.window)
+        return df
         
-        for date, row in df.iterrows():
-            price = row['Close']
-            ma = row['MA200']
-            
-            # Only trade and inject cash after trading_start_date
-            if not self._should_trade(date):
-                # Buffer period: just track equity at initial cash
-                equity.append(self.initial_cash)
-                continue
-            
-            cash, _ = self._inject_monthly_cash(date, cash)
-            
-            if pd.isna(ma):
-                equity.append(cash + (shares * price))
-                continue
-            
-            # Calculate total value
-            total_value = cash + (shares * price)
-            
-            # Price > MA200: Force full position (all-in)
-            if price > ma:
-                shares = total_value / price
-                cash = 0
-            # Price < MA200: Force empty position (all-out)
-            elif price < ma:
-                cash = total_value
-                shares = 0
-                
-            equity.append(cash + (shares * price))
+    def run(self, df):
+        return self._simulate(self.prepare(df))
+
+    def run_prepared(self, df):
+        return self._simulate(df.copy())
+
+    def target_arrays(self, df):
+        close = df['Close'].to_numpy(dtype=float)
+        return close, self._targets(close, df[self.ma_column].to_numpy())
+
+    def _simulate(self, df):
+        close, target = self.target_arrays(df)
+        trading, _, contributions = self._contribution_schedule(df.index)
         
-        df['Equity'] = equity
+        df['Equity'] = simulate_target_position(close, target, contributions, trading, self.initial_cash)
         return df
 
+    def panel_targets(self, panels: dict) -> np.ndarray:
+        close = panels['Close']
+        return self._targets(close.to_numpy(dtype=float), close.astype(float).rolling(self.window).mean().to_numpy())
+
 class DavidStrategy(BaseStrategy):
     """
     Ladder + Bottom Fishing Strategy.
@@ -161,144 +213,136 @@ class DavidStrategy(BaseStrategy):
        - Use Ladder for Trend following.
        - (User can customize if Bottom Signal overrides)
     """
-    def __init__(self, initial_cash=100000, trading_start_date=None):
+    def __init__(self, initial_cash=100000, trading_start_date=None, n1=26, n2=89):
         super().__init__("David (Ladder)", initial_cash, trading_start_date=trading_start_date)
-        
-    def run(self, df):
+        self.n1 = n1
+        self.n2 = n2
+
+    @staticmethod
+    def _targets(close, blue_top, blue_bottom):
+        # Buy: Breakout Blue Ladder (User said "穿过蓝色梯子就会涨"); Sell: below Blue Bottom
+        # Inside the ladder (or before it is valid): hold, contributions stay in cash
+        target = np.where(close > blue_top, 1.0, np.where(close < blue_bottom, 0.0, np.nan))
+        target[np.isnan(blue_top) | np.isnan(blue_bottom)] = np.nan
+        return target
+
+    def prepare(self, df):
         df = df.copy()
-        df = TechnicalIndicators.add_ladder_indicator(df)
+        TechnicalIndicators.add_ladder_indicator(df, n1=self.n1, n2=self.n2, out=df)
         # df = TechnicalIndicators.add_bottom_fishing_indicator(df) # Not used in basic logic yet
+        return df
         
-        cash = self.initial_cash
-        shares = 0
-        equity = []
-        
-        for date, row in df.iterrows():
-            price = row['Close']
-            
-            # Only trade and inject cash after trading_start_date
-            if not self._should_trade(date):
-                # Buffer period: just track equity at initial cash
-                equity.append(self.initial_cash)
-                continue
-            
-            cash, _ = self._inject_monthly_cash(date, cash)
-            
-            # Check if indicators are valid (not NaN)
-            blue_top = row['ladder_blue_top']
-            blue_bottom = row['ladder_blue_bottom']
-            
-            if pd.isna(blue_top) or pd.isna(blue_bottom):
-                equity.append(cash + (shares * price))
-                continue
-            
-            # Buy: Breakout Blue Ladder (or Yellow? User said "穿过蓝色梯子")
-            # Let's stick to Blue Ladder Breakout for aggressive, or Yellow for conservative.
-            # Based on chat history: "穿过蓝色梯子就会涨"
-            
-            if price > blue_top and cash > 0:
-                shares += cash / price
-                cash = 0
-            elif price < blue_bottom and shares > 0:
-                cash += shares * price
-                shares = 0
-                
-            equity.append(cash + (shares * price))
+    def run(self, df):
+        return self._simulate(self.prepare(df))
+
+    def run_prepared(self, df):
+        return self._simulate(df.copy())
+
+    def target_arrays(self, df):
+        close = df['Close'].to_numpy(dtype=float)
+        return close, self._targets(close, df['ladder_blue_top'].to_numpy(), df['ladder_blue_bottom'].to_numpy())
+
+    def _simulate(self, df):
+        close, target = self.target_arrays(df)
+        trading, _, contributions = self._contribution_schedule(df.index)
         
-        df['Equity'] = equity
+        df['Equity'] = simulate_target_position(close, target, contributions, trading, self.initial_cash)
         return df
 
+    def panel_targets(self, panels: dict) -> np.ndarray:
+        high, low, close = (panels[f].astype(float) for f in ('High', 'Low', 'Close'))
+        ladder = panel_ladder(high, low, close, n1=self.n1, n2=self.n2)
+        return self._targets(close.to_numpy(), ladder['ladder_blue_top'].to_numpy(), ladder['ladder_blue_bottom'].to_numpy())
+
+@kernel
+def _dca_plus_kernel(close, high, trading, contributions, initial_cash, base_invest_ratio, invest_period,
+                     book, hits, equity):
+    """Bar loop of TQQQ_DCA_Plus; book is an empty lot book (core/lot_book.py), hits its scratch buffer."""
+    lot_shares, lot_tp = book[1], book[2]
+    cash = initial_cash
+    peak_cash = cash
+    shares = 0.0
+    max_equity = cash
+    curr_dd = 0.0
+    day_count = 0
+
+    for i in range(len(close)):
+        price = close[i]
+        high_i = high[i]
+
+        # Buffer period: just track equity at initial cash
+        if not trading[i]:
+            equity[i] = initial_cash
+            continue
+
+        cash += contributions[i]
+
+        # Update Stats
+        stock_val = shares * price
+        total_val = cash + stock_val
+
+        if cash > peak_cash:
+            peak_cash = cash
+        if total_val > max_equity:
+            max_equity = total_val
+            curr_dd = 0.0
+            is_ath = True
+        else:
+            curr_dd = (max_equity - total_val) / max_equity
+            is_ath = False
+
+        # 1. Take Profit (3x): sell the lots whose TP was reached
+        n_hits = pop_tp_hits(book, high_i, hits)
+        for j in range(n_hits):
+            lot = hits[j]
+            cash += lot_shares[lot] * lot_tp[lot]
+            shares -= lot_shares[lot]
+
+        # 2. Invest
+        day_count += 1
+        if day_count >= invest_period:
+            day_count = 0
+            dd_mult = 1 + (curr_dd * 2)
+            amt = peak_cash * base_invest_ratio * dd_mult
+            if cash >= amt:
+                buy_shares = amt / price
+                cash -= amt
+                shares += buy_shares
+                push_lot(book, price, buy_shares, price * 3.0)
+
+        # 3. Rebalance (ATH & > 60% Alloc): converts equity to cash, lots are left as they are
+        alloc = (shares * price) / total_val if total_val > 0 else 0.0
+        if is_ath and alloc > 0.60:
+            target = total_val * 0.40
+            sell_val = (shares * price) - target
+            if sell_val > 0:
+                sell_shares = sell_val / price
+                cash += sell_val
+                shares -= sell_shares
+
+        equity[i] = cash + (shares * price)
+
+
 class TQQQ_DCA_Plus(BaseStrategy):
     """
     Advanced DCA Strategy:
     1. Periodic Invest (Cash * Ratio * DrawdownMultiplier)
     2. 3x Take Profit per lot
     3. Rebalance at ATH > 60% allocation
+
+    Lots and cash carry state from bar to bar, so the loop runs as an array kernel
+    (core/harness.py) rather than through iterrows().
     """
     def __init__(self, initial_cash=100000, trading_start_date=None):
         super().__init__("TQQQ DCA+", initial_cash, trading_start_date=trading_start_date)
         
     def run(self, df):
-        # This logic is complex, copied from your previous tqqq_backtest.py
-        # Simplified for standard interface
-        
-        cash = self.initial_cash
-        peak_cash = cash
-        shares = 0
-        lots = []
-        equity = []
-        
-        max_equity = cash
-        curr_dd = 0
-        
-        base_invest_ratio = 0.01
-        invest_period = 20
-        day_count = 0
-        
-        for date, row in df.iterrows():
-            price = row['Close']
-            high = row['High']
-            
-            # Only trade and inject cash after trading_start_date
-            if not self._should_trade(date):
-                # Buffer period: just track equity at initial cash
-                equity.append(self.initial_cash)
-                continue
-            
-            cash, _ = self._inject_monthly_cash(date, cash)
-            
-            # Update Stats
-            stock_val = shares * price
-            total_val = cash + stock_val
-            
-            if cash > peak_cash: peak_cash = cash
-            if total_val > max_equity: 
-                max_equity = total_val
-                curr_dd = 0
-                is_ath = True
-            else:
-                curr_dd = (max_equity - total_val) / max_equity
-                is_ath = False
-            
-            # 1. Take Profit (3x)
-            new_lots = []
-            for lot in lots:
-                if high >= lot['tp_price']:
-                    # Sell
-                    cash += lot['shares'] * lot['tp_price']
-                    shares -= lot['shares']
-                else:
-                    new_lots.append(lot)
-            lots = new_lots
-            
-            # 2. Invest
-            day_count += 1
-            if day_count >= invest_period:
-                day_count = 0
-                dd_mult = 1 + (curr_dd * 2)
-                amt = peak_cash * base_invest_ratio * dd_mult
-                if cash >= amt:
-                    buy_shares = amt / price
-                    cash -= amt
-                    shares += buy_shares
-                    lots.append({'shares': buy_shares, 'tp_price': price * 3.0})
-            
-            # 3. Rebalance (ATH & > 60% Alloc)
-            alloc = (shares * price) / total_val if total_val > 0 else 0
-            if is_ath and alloc > 0.60:
-                target = total_val * 0.40
-                sell_val = (shares * price) - target
-                if sell_val > 0:
-                    sell_shares = sell_val / price
-                    cash += sell_val
-                    shares -= sell_shares
-                    # Remove from lots (FIFO) logic omitted for brevity, simplified:
-                    # Just reduce total shares. Lots logic breaks here in simple version.
-                    # For full version, we'd need strict lot tracking.
-                    # Let's keep it simple: Rebalance just converts equity to cash.
-            
-            equity.append(cash + (shares * price))
-            
+        trading, _, contributions = self._contribution_schedule(df.index)
+        close, high = bar_arrays(df, 'Close', 'High')
+        n = len(df)
+        equity = np.empty(n)
+        _dca_plus_kernel(close, high, kernel_input(trading, bool), kernel_input(contributions),
+                         float(self.initial_cash), 0.01, 20,
+                         new_book(n), kernel_input(np.zeros(n, dtype=int), int), equity)
         df['Equity'] = equity
         return df
-
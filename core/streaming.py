@@ -0,0 +1,447 @@
+"""
+Streaming (one bar at a time) versions of the ladder, MACD and bottom-fishing indicators.
+
+Each object is seeded once from history and then advanced with update() in O(1)
+per bar. State is plain JSON (to_dict / from_dict), so it survives restarts.
+Outputs match the batch versions in core/indicators.py bar for bar
+(see backtest_lab/verify_streaming.py).
+"""
+import os
+import json
+import math
+import tempfile
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from .cache import DEFAULT_CACHE_DIR
+from .engine import IndicatorEngine
+from .indicators import strict_bottom_parts
+
+
+def _isnan(x) -> bool:
+    return x is None or x != x
+
+
+class StreamingEMA:
+    """
+    EMA with the same recursion as pandas ewm(span, adjust=False), including how
+    NaN bars stretch the weight of the previous value.
+    """
+
+    def __init__(self, span: int):
+        self.span = span
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = math.nan
+        self.old_wt = 1.0
+
+    def update(self, x: float) -> float:
+        is_obs = not _isnan(x)
+        if self.value == self.value:
+            self.old_wt *= 1.0 - self.alpha
+            if is_obs:
+                if self.value != x:
+                    if self.alpha == 0.5:
+                        # pandas' com == 1 update (only differs from the general one after NaN bars)
+                        self.value = self.old_wt * self.value + (1.0 - self.old_wt) * x
+                    else:
+                        self.value = (self.old_wt * self.value + self.alpha * x) / (self.old_wt + self.alpha)
+                self.old_wt = 1.0
+        elif is_obs:
+            self.value = float(x)
+        return self.value
+
+    def to_dict(self) -> dict:
+        return {'span': self.span, 'value': self.value, 'old_wt': self.old_wt}
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        obj = cls(d['span'])
+        obj.value = d['value']
+        obj.old_wt = d['old_wt']
+        return obj
+
+    @classmethod
+    def from_series(cls, span: int, x: np.ndarray, ema: np.ndarray):
+        """State after feeding x, given its batch EMA (pandas ewm(span, adjust=False))."""
+        obj = cls(span)
+        observed = np.flatnonzero(~np.isnan(x))
+        if len(observed):
+            obj.value = float(ema[-1])
+            # Each bar after the last observation stretches the weight once
+            for _ in range(len(x) - 1 - observed[-1]):
+                obj.old_wt *= 1.0 - obj.alpha
+        return obj
+
+
+class StreamingLadder:
+    """Blue (n1) and yellow (n2) EMA ladders of High/Low plus ladder_signal."""
+
+    def __init__(self, n1: int = 26, n2: int = 89):
+        self.n1, self.n2 = n1, n2
+        self.blue_top, self.blue_bottom = StreamingEMA(n1), StreamingEMA(n1)
+        self.yellow_top, self.yellow_bottom = StreamingEMA(n2), StreamingEMA(n2)
+
+    def update(self, high: float, low: float, close: float) -> dict:
+        out = {
+            'ladder_blue_top': self.blue_top.update(high),
+            'ladder_blue_bottom': self.blue_bottom.update(low),
+            'ladder_yellow_top': self.yellow_top.update(high),
+            'ladder_yellow_bottom': self.yellow_bottom.update(low),
+        }
+        if close > out['ladder_blue_top']:
+            out['ladder_signal'] = 1
+        elif close < out['ladder_blue_bottom']:
+            out['ladder_signal'] = -1
+        else:
+            out['ladder_signal'] = 0
+        return out
+
+    def to_dict(self) -> dict:
+        return {'n1': self.n1, 'n2': self.n2,
+                'emas': [e.to_dict() for e in (self.blue_top, self.blue_bottom, self.yellow_top, self.yellow_bottom)]}
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        obj = cls(d['n1'], d['n2'])
+        obj.blue_top, obj.blue_bottom, obj.yellow_top, obj.yellow_bottom = [StreamingEMA.from_dict(e) for e in d['emas']]
+        return obj
+
+
+class StreamingMACD:
+    """DIF = EMA(fast) - EMA(slow), DEA = EMA(DIF, signal), MACD = (DIF - DEA) * 2."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast, self.slow, self.signal = StreamingEMA(fast), StreamingEMA(slow), StreamingEMA(signal)
+
+    def update(self, close: float) -> dict:
+        dif = self.fast.update(close) - self.slow.update(close)
+        dea = self.signal.update(dif)
+        return {'DIF': dif, 'DEA': dea, 'MACD': (dif - dea) * 2}
+
+    def to_dict(self) -> dict:
+        return {'fast': self.fast.to_dict(), 'slow': self.slow.to_dict(), 'signal': self.signal.to_dict()}
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        obj = cls()
+        obj.fast, obj.slow, obj.signal = (StreamingEMA.from_dict(d[k]) for k in ('fast', 'slow', 'signal'))
+        return obj
+
+
+class StreamingStrictBottom:
+    """
+    State machine for the strict 抄底 (DXDX) signal, fed DIF/MACD from a StreamingMACD.
+
+    Only the running minima since the last green turn and the (CC, DIFL) values
+    frozen at the last two red turns are needed, which is what
+    core.indicators.strict_bottom_signal gathers with whole-array indexing.
+    """
+
+    def __init__(self):
+        self.n = 0                 # bars seen
+        self.prev_m = 0.0          # REF(MACD, 1), 0 before the first bar
+        self.prev_d = 0.0
+        self.has_green = False
+        self.cc1 = math.nan        # min close / DIF since the last green turn
+        self.difl1 = math.nan
+        self.last_cc_at = math.nan # (CC, DIFL) of the previous bar
+        self.last_difl_at = math.nan
+        self.phase1 = None         # (CC, DIFL) one bar before the last red turn
+        self.phase2 = None         # same for the red turn before that
+        self.prev_ccc = False
+        self.prev_jjj = False
+
+    @staticmethod
+    def _running_min(current, x, reset):
+        if reset:
+            return x
+        return math.nan if _isnan(current) or _isnan(x) else min(current, x)
+
+    def update(self, close: float, d: float, m: float) -> float:
+        turn_green = self.prev_m >= 0 and m < 0
+        turn_red = self.prev_m <= 0 and m > 0
+
+        self.cc1 = self._running_min(self.cc1, close, turn_green or self.n == 0)
+        self.difl1 = self._running_min(self.difl1, d, turn_green or self.n == 0)
+        self.has_green = self.has_green or turn_green
+
+        if turn_red:
+            self.phase2 = self.phase1
+            self.phase1 = (self.last_cc_at, self.last_difl_at) if self.n >= 1 else None
+
+        valid = self.has_green and self.phase1 is not None
+        ccc = jjj = False
+        if valid:
+            cc2, difl2 = self.phase1
+            cc3, difl3 = self.phase2 if self.phase2 is not None else (math.inf, -math.inf)
+            is_green = self.prev_m < 0 and d < 0
+            aaa = self.cc1 < cc2 and self.difl1 > difl2 and is_green
+            bbb = self.cc1 < cc3 and self.difl1 < difl2 and self.difl1 > difl3 and is_green
+            ccc = (aaa or bbb) and d < 0
+            jjj = self.prev_ccc and abs(self.prev_d) >= abs(d) * 1.01
+        signal = 1.0 if (jjj and not self.prev_jjj) else 0.0
+
+        self.last_cc_at = self.cc1 if self.has_green else close
+        self.last_difl_at = self.difl1 if self.has_green else d
+        self.prev_m, self.prev_d = m, d
+        self.prev_ccc, self.prev_jjj = bool(ccc), bool(jjj)
+        self.n += 1
+        return signal
+
+    @classmethod
+    def from_arrays(cls, close: np.ndarray, d: np.ndarray, m: np.ndarray):
+        """State after feeding the bars of close / DIF / MACD, from the batch intermediates."""
+        obj = cls()
+        if len(close) == 0:
+            return obj
+        parts = strict_bottom_parts(close, d, m)
+        cc_at, difl_at = parts['cc_at'], parts['difl_at']
+
+        def phase(red):
+            return (float(cc_at[red - 1]), float(difl_at[red - 1])) if red >= 1 else None
+
+        reds = np.flatnonzero(parts['turn_red'])
+        obj.n = len(close)
+        obj.prev_m, obj.prev_d = float(m[-1]), float(d[-1])
+        obj.has_green = bool(parts['has_green'][-1])
+        obj.cc1, obj.difl1 = float(parts['cc1'][-1]), float(parts['difl1'][-1])
+        obj.last_cc_at, obj.last_difl_at = float(cc_at[-1]), float(difl_at[-1])
+        obj.phase1 = phase(reds[-1]) if len(reds) else None
+        obj.phase2 = phase(reds[-2]) if len(reds) > 1 else None
+        obj.prev_ccc, obj.prev_jjj = bool(parts['ccc'][-1]), bool(parts['jjj'][-1])
+        return obj
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        obj = cls()
+        obj.__dict__.update(d)
+        obj.phase1 = tuple(obj.phase1) if obj.phase1 is not None else None
+        obj.phase2 = tuple(obj.phase2) if obj.phase2 is not None else None
+        return obj
+
+
+class _RollingMin:
+    """Rolling min over the last n values with pandas' NaN rules (NaNs skipped, min_periods counts non-NaN)."""
+
+    def __init__(self, n: int, min_periods: int = None):
+        self.n = n
+        self.min_periods = n if min_periods is None else min_periods
+        self.i = 0
+        self.window = deque()      # (index, value) kept increasing by value
+        self.nan_idx = deque()     # indices of NaN values still in the window
+
+    def update(self, x: float) -> float:
+        i, self.i = self.i, self.i + 1
+        if _isnan(x):
+            self.nan_idx.append(i)
+        else:
+            while self.window and self.window[-1][1] >= x:
+                self.window.pop()
+            self.window.append((i, x))
+        while self.window and self.window[0][0] <= i - self.n:
+            self.window.popleft()
+        while self.nan_idx and self.nan_idx[0] <= i - self.n:
+            self.nan_idx.popleft()
+        count = min(self.i, self.n) - len(self.nan_idx)
+        return self.window[0][1] if self.window and count >= self.min_periods else math.nan
+
+    def to_dict(self) -> dict:
+        return {'n': self.n, 'min_periods': self.min_periods, 'i': self.i,
+                'window': [list(w) for w in self.window], 'nan_idx': list(self.nan_idx)}
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        obj = cls(d['n'], d['min_periods'])
+        obj.i = d['i']
+        obj.window = deque(tuple(w) for w in d['window'])
+        obj.nan_idx = deque(d['nan_idx'])
+        return obj
+
+
+class StreamingRelaxedBottom:
+    """Relaxed bottom signal: rolling lows of price and DIF kept in monotonic deques (amortized O(1))."""
+
+    def __init__(self, lookback: int = 30):
+        self.lookback = lookback
+        self.n = 0
+        self.prev_m = math.nan
+        self.llv_price = _RollingMin(lookback)
+        self.llv_dif = _RollingMin(lookback)
+
+    def update(self, low: float, d: float, m: float) -> float:
+        llv_price = self.llv_price.update(low)
+        llv_dif = self.llv_dif.update(d)
+        signal = 0.0
+        if self.n >= self.lookback:
+            is_divergence = low <= llv_price * 1.01 and d > llv_dif + 0.05
+            if is_divergence and m > self.prev_m and d < 0:
+                signal = 1.0
+        self.prev_m = m
+        self.n += 1
+        return signal
+
+    def to_dict(self) -> dict:
+        return {'lookback': self.lookback, 'n': self.n, 'prev_m': self.prev_m,
+                'llv_price': self.llv_price.to_dict(), 'llv_dif': self.llv_dif.to_dict()}
+
+    @classmethod
+    def from_arrays(cls, low: np.ndarray, d: np.ndarray, m: np.ndarray, lookback: int = 30):
+        """State after feeding the bars of low / DIF / MACD; only the last lookback bars are replayed."""
+        obj = cls(lookback)
+        n = len(low)
+        obj.n = n
+        obj.prev_m = float(m[-1]) if n else math.nan
+        start = max(n - lookback, 0)
+        for rolling, values in ((obj.llv_price, low), (obj.llv_dif, d)):
+            rolling.i = start
+            for x in values[start:]:
+                rolling.update(float(x))
+        return obj
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        obj = cls(d['lookback'])
+        obj.n, obj.prev_m = d['n'], d['prev_m']
+        obj.llv_price = _RollingMin.from_dict(d['llv_price'])
+        obj.llv_dif = _RollingMin.from_dict(d['llv_dif'])
+        return obj
+
+
+class IndicatorState:
+    """
+    Everything daily_scan needs for one ticker: ladder, MACD, strict and relaxed signals.
+
+    update() consumes one completed bar; peek() evaluates a bar that may still change
+    (today's intraday candle) without advancing the state.
+    """
+
+    def __init__(self, n1: int = 26, n2: int = 89, lookback: int = 30):
+        self.params = {'n1': n1, 'n2': n2, 'lookback': lookback}
+        self.ladder = StreamingLadder(n1, n2)
+        self.macd = StreamingMACD()
+        self.strict = StreamingStrictBottom()
+        self.relaxed = StreamingRelaxedBottom(lookback)
+        self.last_ts = None
+        self.last_close = None
+        self.last = None           # outputs of the last committed bar
+
+    def update(self, ts, bar) -> dict:
+        """
+        Args:
+            ts: Bar timestamp.
+            bar: Mapping with High, Low and Close.
+
+        Returns:
+            dict: Ladder, DIF/DEA/MACD, bottom_fishing_signal and relaxed_bottom_signal for this bar.
+        """
+        high, low, close = float(bar['High']), float(bar['Low']), float(bar['Close'])
+        out = self.ladder.update(high, low, close)
+        out.update(self.macd.update(close))
+        out['bottom_fishing_signal'] = self.strict.update(close, out['DIF'], out['MACD'])
+        out['relaxed_bottom_signal'] = self.relaxed.update(low, out['DIF'], out['MACD'])
+        out['Close'] = close
+        self.last_ts = pd.Timestamp(ts).isoformat()
+        self.last_close = close
+        self.last = out
+        return out
+
+    def peek(self, ts, bar) -> dict:
+        return IndicatorState.from_dict(self.to_dict()).update(ts, bar)
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, n1: int = 26, n2: int = 89, lookback: int = 30):
+        """
+        Same state as IndicatorState(n1, n2, lookback).seed(df), built from the batch
+        indicator arrays (memoized by the engine) instead of one update() per bar.
+        """
+        obj = cls(n1, n2, lookback)
+        if df.empty:
+            return obj
+        e = IndicatorEngine(df)
+        high, low, close = (e.values(col) for col in ('High', 'Low', 'Close'))
+        ladder = obj.ladder
+        ladder.blue_top = StreamingEMA.from_series(n1, high, e.ema('High', n1))
+        ladder.blue_bottom = StreamingEMA.from_series(n1, low, e.ema('Low', n1))
+        ladder.yellow_top = StreamingEMA.from_series(n2, high, e.ema('High', n2))
+        ladder.yellow_bottom = StreamingEMA.from_series(n2, low, e.ema('Low', n2))
+        dif, dea, macd = e.macd()
+        obj.macd.fast = StreamingEMA.from_series(12, close, e.ema('Close', 12))
+        obj.macd.slow = StreamingEMA.from_series(26, close, e.ema('Close', 26))
+        obj.macd.signal = StreamingEMA.from_series(9, dif, dea)
+        obj.strict = StreamingStrictBottom.from_arrays(close, dif, macd)
+        obj.relaxed = StreamingRelaxedBottom.from_arrays(low, dif, macd, lookback)
+
+        last = {name: float(e.get(name, n1=n1, n2=n2, lookback=lookback)[-1])
+                for name in ('ladder_blue_top', 'ladder_blue_bottom', 'ladder_yellow_top', 'ladder_yellow_bottom',
+                             'DIF', 'DEA', 'MACD', 'bottom_fishing_signal', 'relaxed_bottom_signal')}
+        last['ladder_signal'] = int(e.get('ladder_signal', n1=n1)[-1])
+        last['Close'] = float(close[-1])
+        obj.last_ts = pd.Timestamp(df.index[-1]).isoformat()
+        obj.last_close, obj.last = float(close[-1]), last
+        return obj
+
+    def seed(self, df: pd.DataFrame):
+        """Feed a history frame (OHLC columns) bar by bar."""
+        for ts, high, low, close in zip(df.index, df['High'].values, df['Low'].values, df['Close'].values):
+            self.update(ts, {'High': high, 'Low': low, 'Close': close})
+        return self
+
+    def pending(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Bars of df after the last committed bar, or None if df no longer agrees with the
+        state (restated history, e.g. after a split adjustment) and a reseed is needed.
+        """
+        if self.last_ts is None:
+            return None
+        ts = pd.Timestamp(self.last_ts)
+        if ts not in df.index or not math.isclose(float(df.loc[ts, 'Close']), self.last_close, rel_tol=1e-9):
+            return None
+        return df[df.index > ts]
+
+    def to_dict(self) -> dict:
+        return {'params': self.params, 'ladder': self.ladder.to_dict(), 'macd': self.macd.to_dict(),
+                'strict': self.strict.to_dict(), 'relaxed': self.relaxed.to_dict(),
+                'last_ts': self.last_ts, 'last_close': self.last_close, 'last': self.last}
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        obj = cls(**d['params'])
+        obj.ladder = StreamingLadder.from_dict(d['ladder'])
+        obj.macd = StreamingMACD.from_dict(d['macd'])
+        obj.strict = StreamingStrictBottom.from_dict(d['strict'])
+        obj.relaxed = StreamingRelaxedBottom.from_dict(d['relaxed'])
+        obj.last_ts, obj.last_close, obj.last = d['last_ts'], d['last_close'], d['last']
+        return obj
+
+
+class StateStore:
+    """IndicatorState per (ticker, interval) as JSON files in <cache>/streaming."""
+
+    def __init__(self, root: str = None):
+        self.root = root or os.path.join(DEFAULT_CACHE_DIR, "streaming")
+
+    def _path(self, ticker: str, interval: str) -> str:
+        return os.path.join(self.root, f"{ticker.upper()}_{interval}.json")
+
+    def load(self, ticker: str, interval: str, **params) -> IndicatorState:
+        """Saved state, or None if missing, unreadable or computed with other parameters."""
+        try:
+            with open(self._path(ticker, interval)) as f:
+                state = IndicatorState.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+        if any(state.params.get(k) != v for k, v in params.items()):
+            return None
+        return state
+
+    def save(self, ticker: str, interval: str, state: IndicatorState):
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(state.to_dict(), f)
+        os.replace(tmp, self._path(ticker, interval))
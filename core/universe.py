@@ -0,0 +1,139 @@
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+from .data_provider import get_stocks_data
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class UniverseStore:
+    """
+    Date-aligned OHLCV history for a whole universe (e.g. legacy/utils.get_sp500_tickers()).
+
+    On disk (under `root`):
+        meta.json       tickers, fields, dtype, tz
+        calendar.npy    int64 ns timestamps shared by every ticker (union of all dates)
+        <Field>.npy     2D array (tickers x dates); NaN where a ticker has no bar (pre-IPO, delisted)
+
+    Field arrays are opened with mmap_mode, so loading the universe costs no reads
+    until rows/columns are touched, and pages are shared between processes.
+    """
+
+    def __init__(self, root: str, mode: str = "r"):
+        """
+        Args:
+            root (str): Store directory created by UniverseStore.build.
+            mode (str): numpy mmap mode, "r" (read-only) or "r+" (in-place updates).
+        """
+        self.root = root
+        self.mode = mode
+        with open(os.path.join(root, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.tickers = self.meta["tickers"]
+        self.fields = self.meta["fields"]
+        self.rows = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self._calendar_ns = np.load(os.path.join(root, "calendar.npy"), mmap_mode="r")
+        self._arrays = {}
+
+    @classmethod
+    def build(cls, root: str, data: dict, fields: list = None, dtype=np.float32) -> "UniverseStore":
+        """
+        Write a store from {ticker: DataFrame}.
+
+        Args:
+            root (str): Output directory.
+            data (dict): {ticker: OHLCV DataFrame}, e.g. from core.data_provider.get_stocks_data.
+            fields (list): Columns to store (default Open/High/Low/Close/Volume).
+            dtype: np.float32 (half the size) or np.float64 (exact copy of the source).
+        """
+        fields = fields or FIELDS
+        tickers = list(data.keys())
+        os.makedirs(root, exist_ok=True)
+
+        tz = None
+        index = None
+        for df in data.values():
+            if tz is None and df.index.tz is not None:
+                tz = str(df.index.tz)
+            idx = df.index.tz_convert("UTC").tz_localize(None) if df.index.tz is not None else df.index
+            index = idx if index is None else index.union(idx)
+        calendar = pd.DatetimeIndex(index if index is not None else []).as_unit("ns")
+        np.save(os.path.join(root, "calendar.npy"), calendar.asi8)
+
+        for field in fields:
+            arr = np.lib.format.open_memmap(os.path.join(root, f"{field}.npy"), mode="w+",
+                                            dtype=dtype, shape=(len(tickers), len(calendar)))
+            arr[:] = np.nan
+            for row, ticker in enumerate(tickers):
+                df = data[ticker]
+                if field not in df.columns:
+                    continue
+                idx = df.index.tz_convert("UTC").tz_localize(None) if df.index.tz is not None else df.index
+                cols = calendar.get_indexer(idx)
+                arr[row, cols] = df[field].to_numpy(dtype=dtype)
+            arr.flush()
+            del arr
+
+        with open(os.path.join(root, "meta.json"), "w") as f:
+            json.dump({"tickers": tickers, "fields": fields, "dtype": np.dtype(dtype).name, "tz": tz}, f)
+        return cls(root)
+
+    @property
+    def calendar(self) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(np.asarray(self._calendar_ns).view("M8[ns]"), name="Date")
+        if self.meta.get("tz"):
+            index = index.tz_localize("UTC").tz_convert(self.meta["tz"])
+        return index
+
+    def field(self, name: str) -> np.ndarray:
+        """Memory-mapped (tickers x dates) array for one field."""
+        if name not in self._arrays:
+            self._arrays[name] = np.load(os.path.join(self.root, f"{name}.npy"), mmap_mode=self.mode)
+        return self._arrays[name]
+
+    def row(self, ticker: str) -> int:
+        return self.rows[ticker]
+
+    def date_range(self, start=None, end=None) -> slice:
+        """Column slice for [start, end) by binary search on the calendar."""
+        cal = self._calendar_ns
+        lo = 0 if start is None else int(np.searchsorted(cal, self._to_ns(start), side="left"))
+        hi = len(cal) if end is None else int(np.searchsorted(cal, self._to_ns(end), side="left"))
+        return slice(lo, hi)
+
+    def _to_ns(self, ts) -> int:
+        ts = pd.Timestamp(ts)
+        if self.meta.get("tz"):
+            ts = ts.tz_localize(self.meta["tz"]) if ts.tz is None else ts
+            ts = ts.tz_convert("UTC").tz_localize(None)
+        return ts.as_unit("ns").value
+
+    def panel(self, field: str = "Close", tickers: list = None, start=None, end=None) -> pd.DataFrame:
+        """
+        Wide (dates x tickers) DataFrame for one field.
+        With all tickers the values are a transposed view of the mmap (no copy).
+        """
+        cols = self.date_range(start, end)
+        arr = self.field(field)
+        if tickers is None:
+            values = arr[:, cols]
+            tickers = self.tickers
+        else:
+            values = arr[[self.rows[t] for t in tickers], cols]
+        return pd.DataFrame(values.T, index=self.calendar[cols], columns=tickers, copy=False)
+
+    def frame(self, ticker: str, start=None, end=None) -> pd.DataFrame:
+        """Single-ticker OHLCV DataFrame (dates where the ticker has no bar are dropped)."""
+        cols = self.date_range(start, end)
+        row = self.rows[ticker]
+        df = pd.DataFrame({f: self.field(f)[row, cols] for f in self.fields}, index=self.calendar[cols])
+        return df.dropna(how="all")
+
+
+def build_universe(root: str, tickers: list, period: str = "max", interval: str = "1d", dtype=np.float32) -> UniverseStore:
+    """Download tickers in bulk and write them to a UniverseStore."""
+    data = get_stocks_data(tickers, period=period, interval=interval)
+    return UniverseStore.build(root, data, dtype=dtype)
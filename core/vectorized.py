@@ -0,0 +1,218 @@
+"""
+Array versions of the bar-by-bar strategy loops in core/strategies.py.
+
+Strategies that are either all-in, all-out or holding (see simulate_target_position)
+reduce to an affine recurrence in wealth between rebalance bars, which has a closed
+form in cumulative products and sums, so a run is a handful of NumPy passes instead
+of an iterrows() loop. The BuyAndHold and SimpleDCA baselines only trade on
+month starts and reduce to cumulative sums over those bars.
+"""
+import numpy as np
+import pandas as pd
+
+
+def month_starts(index: pd.DatetimeIndex, trading: np.ndarray, last_month=None):
+    """
+    Bars where BaseStrategy._inject_monthly_cash would report a new month.
+
+    Args:
+        index (pd.DatetimeIndex): Bar dates.
+        trading (np.ndarray): Bool mask of bars on or after trading_start_date.
+        last_month (pd.Period): Month of the last contribution before these bars (None: none yet).
+
+    Returns:
+        tuple: (bool mask per bar, month of the last contribution or last_month).
+    """
+    mask = np.zeros(len(index), dtype=bool)
+    months = index[trading].to_period('M')
+    if len(months) == 0:
+        return mask, last_month
+    codes = months.asi8
+    new_month = np.empty(len(codes), dtype=bool)
+    new_month[0] = last_month is None or months[0] != last_month
+    new_month[1:] = codes[1:] != codes[:-1]
+    mask[np.flatnonzero(trading)[new_month]] = True
+    return mask, months[-1]
+
+
+def simulate_target_position(close: np.ndarray, target: np.ndarray, contributions: np.ndarray,
+                             trading: np.ndarray, initial_cash: float) -> np.ndarray:
+    """
+    Equity curve of an all-in / all-out strategy with cash contributions.
+
+    On each trading bar the contribution is added to cash first, then:
+    target 1 moves everything into shares, target 0 sells everything, and
+    NaN (hold) leaves shares alone so contributions stay in cash. Bars before
+    trading starts report initial_cash.
+
+    Between two rebalance bars r' < r the strategy holds either only shares or only
+    cash, so wealth W_r = g_r * W_r' + (contributions in (r', r]) with
+    g_r = P_r / P_r' after a buy and 1 after a sell. With G = cumprod(g) that is
+    W = G * (W_0 + cumsum(d / G)).
+
+    Args:
+        close (np.ndarray): Prices.
+        target (np.ndarray): 1.0 (all-in), 0.0 (all-out) or NaN (hold) per bar.
+        contributions (np.ndarray): Cash added on each bar.
+        trading (np.ndarray): Bool mask of bars where cash is added and trades happen.
+        initial_cash (float): Starting cash.
+
+    Returns:
+        np.ndarray: Equity per bar.
+    """
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    target = np.where(trading, target, np.nan)
+    kcum = np.cumsum(contributions)
+
+    rebalance = np.flatnonzero(~np.isnan(target))
+    equity = np.where(trading, initial_cash + kcum, initial_cash)
+    if len(rebalance) == 0:
+        return equity
+
+    # Wealth on rebalance bars
+    p = close[rebalance]
+    tgt = target[rebalance]
+    k = kcum[rebalance]
+    g = np.ones(len(rebalance))
+    g[1:] = np.where(tgt[:-1] == 1, p[1:] / p[:-1], 1.0)
+    d = np.empty(len(rebalance))
+    d[0] = 0.0
+    d[1:] = np.diff(k)
+    G = np.cumprod(g)
+    wealth = G * ((initial_cash + k[0]) + np.cumsum(d / G))
+
+    # Every bar from the first rebalance on values the position set at the last rebalance
+    last = np.maximum.accumulate(np.where(~np.isnan(target), np.arange(n), -1))
+    after = last >= 0
+    pos = np.searchsorted(rebalance, last[after])
+    since = kcum[after] - kcum[rebalance][pos]
+    shares = np.where(tgt[pos] == 1, wealth[pos] / p[pos], 0.0)
+    cash = np.where(tgt[pos] == 1, 0.0, wealth[pos])
+    equity[after] = cash + since + shares * close[after]
+    return equity
+
+
+def simulate_buy_and_hold(close: np.ndarray, trading: np.ndarray, contributions: np.ndarray,
+                          initial_cash: float) -> np.ndarray:
+    """
+    BuyAndHold: every trading bar with cash (the first one, then each contribution)
+    buys shares with all of it. Shares are a running sum of the buys, added in the same
+    order as the loop, so equity matches it exactly. close may also be a
+    (paths x time) batch of prices on the same calendar.
+    """
+    close = np.asarray(close, dtype=float)
+    inflow = np.where(trading, contributions, 0.0)
+    first = np.flatnonzero(trading)
+    if len(first):
+        inflow[first[0]] = initial_cash + contributions[first[0]]
+    buys = np.where(inflow > 0, inflow / close, 0.0)
+    shares = np.cumsum(buys, axis=-1)
+    return np.where(trading, shares * close, initial_cash)
+
+
+def _dca_cash(initial_cash: float, k: np.ndarray, invest: float):
+    """
+    Cash after each SimpleDCA month start, and the amount invested there.
+
+    While cash + k stays above monthly_invest the loop just adds k and subtracts
+    invest, so cash is a cumulative sum of the interleaved flows (in the loop's own
+    order, hence bit-identical). The first month where cash + k <= invest invests
+    everything and resets cash to exactly 0; the scan then restarts from there, so
+    there is one cumulative sum per time the cash runs dry.
+    """
+    m = len(k)
+    cash = np.zeros(m)
+    amount = np.zeros(m)
+    if invest <= 0:
+        cash[:] = np.cumsum(np.concatenate([[initial_cash], k]))[1:]
+        return cash, amount
+    pos, start = 0, float(initial_cash)
+    while pos < m:
+        flows = np.empty(2 * (m - pos) + 1)
+        flows[0] = start
+        flows[1::2] = k[pos:]
+        flows[2::2] = -invest
+        run = np.cumsum(flows)
+        before = run[1::2]
+        dry = np.flatnonzero(before <= invest)
+        end = m if len(dry) == 0 else pos + dry[0]
+        cash[pos:end] = run[2::2][:end - pos]
+        amount[pos:end] = invest
+        if end == m:
+            break
+        # Everything left is invested (nothing if it is 0)
+        amount[end] = max(before[end - pos], 0.0)
+        cash[end] = before[end - pos] - amount[end]
+        pos, start = end + 1, cash[end]
+    return cash, amount
+
+
+def simulate_dca(close: np.ndarray, trading: np.ndarray, month_start: np.ndarray, contributions: np.ndarray,
+                 monthly_invest: float, initial_cash: float) -> np.ndarray:
+    """
+    SimpleDCA: on each month start the contribution is added and min(cash, monthly_invest)
+    is invested. Positions only change on month starts, so cash and shares are computed
+    there (see _dca_cash) and carried forward to the bars in between. The cash flows
+    do not depend on prices, so a (paths x time) batch of close prices shares them.
+    """
+    close = np.asarray(close, dtype=float)
+    events = np.flatnonzero(month_start & trading)
+    n = close.shape[-1]
+    cash = np.full(n, float(initial_cash))
+    shares = np.zeros(close.shape)
+    if len(events):
+        cash_after, amount = _dca_cash(initial_cash, contributions[events], monthly_invest)
+        bought = np.cumsum(np.where(amount > 0, amount / close[..., events], 0.0), axis=-1)
+
+        # Carry the post-event positions forward to the following bars
+        slot = np.searchsorted(events, np.arange(n), side='right') - 1
+        has = slot >= 0
+        cash[has] = cash_after[slot[has]]
+        shares[..., has] = bought[..., slot[has]]
+    return np.where(trading, cash + shares * close, initial_cash)
+
+
+def simulate_target_position_batch(close: np.ndarray, target: np.ndarray, contributions: np.ndarray,
+                                   trading: np.ndarray, initial_cash: float) -> np.ndarray:
+    """
+    simulate_target_position for a (paths x time) batch of prices and targets on one
+    calendar (contributions and trading are per bar, shared by all paths).
+
+    Rebalance bars differ from path to path, so the recurrence is written per bar
+    instead of per rebalance: the growth factor is P_t / P_t-1 while the last
+    rebalance before t bought and 1 otherwise, its cumprod G gives the wealth on every
+    rebalance bar as G * (W_0 + cumsum(d / G)), with d the contributions since the
+    previous rebalance, and each bar values the position of its last rebalance.
+    Equal to the single-path version up to rounding of the price-ratio products.
+
+    Returns:
+        np.ndarray: (paths x time) equity.
+    """
+    close = np.asarray(close, dtype=float)
+    n_paths, n = close.shape
+    target = np.where(trading, target, np.nan)
+    kcum = np.cumsum(contributions)
+    rebalance = ~np.isnan(target)
+
+    # Last rebalance at or before each bar, and strictly before it
+    last = np.maximum.accumulate(np.where(rebalance, np.arange(n), -1), axis=1)
+    prev = np.full((n_paths, n), -1)
+    prev[:, 1:] = last[:, :-1]
+    prev_safe = np.maximum(prev, 0)
+    held = (prev >= 0) & (np.take_along_axis(target, prev_safe, axis=1) == 1)
+
+    growth = np.ones((n_paths, n))
+    np.divide(close[:, 1:], close[:, :-1], out=growth[:, 1:], where=held[:, 1:])
+    G = np.cumprod(growth, axis=1)
+    d = np.where(rebalance, kcum - np.where(prev >= 0, kcum[prev_safe], 0.0), 0.0)
+    wealth = G * (initial_cash + np.cumsum(d / G, axis=1))
+    del growth, G, d, held, prev, prev_safe
+
+    # Every bar from the first rebalance on values the position set at the last rebalance
+    pos = np.maximum(last, 0)
+    invested = np.take_along_axis(target, pos, axis=1) == 1
+    wealth_at = np.take_along_axis(wealth, pos, axis=1)
+    shares = np.where(invested, wealth_at / np.take_along_axis(close, pos, axis=1), 0.0)
+    value = np.where(invested, 0.0, wealth_at) + (kcum - kcum[pos]) + shares * close
+    return np.where(last >= 0, value, np.where(trading, initial_cash + kcum, initial_cash))
@@ -0,0 +1,214 @@
+"""
+Walk-forward evaluation of single-ticker strategies.
+
+The history is cut into train/test windows (rolling: fixed-length train window that
+moves forward by step; anchored: train always starts at the first bar and grows).
+For each window, every parameter set of the grid is run on the train slice, the best
+one by metric is kept, and it is run on the following test slice. The test results
+are the out-of-sample record.
+
+Indicators only look back, so each parameter set's frame is prepared once on the full
+history (BaseStrategy.prepare) and windows are positional slices of it, run with
+trading_start_date = first bar of the window. A window therefore sees the same
+indicator values as a run over the whole prefix would, without recomputing warm-up
+bars. Strategies with target_arrays (MA200Strategy, DavidStrategy) also get their
+close/target arrays once per parameter set, and each window is simulate_target_position
+on NumPy slices of them; the others run BaseStrategy.run_prepared on a frame slice.
+A window still costs one simulation plus its metrics (about 0.2 ms on 6000 daily bars),
+so hundreds of windows take tens of full-history runs, not one.
+
+Metrics are time-weighted: monthly contributions are taken out of the equity curve,
+so windows with different lengths and cash flows are comparable.
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from .cache import period_offset
+from .vectorized import month_starts, simulate_target_position
+
+# Metrics where lower is better
+_ASCENDING = ('max_drawdown',)
+
+
+def _bound(index: pd.DatetimeIndex, pos: int, length, sign=1) -> int:
+    """Position length (bars, or a period string like "3y") after pos (before it if sign < 0)."""
+    if isinstance(length, (int, np.integer)):
+        return pos + sign * int(length)
+    if sign < 0:
+        return int(index.searchsorted(index[pos] - period_offset(length)))
+    if pos >= len(index):
+        return len(index) + 1
+    end = int(index.searchsorted(index[pos] + period_offset(length)))
+    # A period running past the last bar is not complete
+    return end if end < len(index) else len(index) + 1
+
+
+def walk_forward_windows(index: pd.DatetimeIndex, train, test, step=None, anchored=False) -> list:
+    """
+    Train/test windows over index as positional (train_start, train_end, test_end)
+    tuples; the test slice is [train_end, test_end). Only complete test windows are kept.
+
+    Args:
+        index (pd.DatetimeIndex): Bar dates.
+        train: Train length in bars (int) or as a period ("3y", "18mo").
+        test: Test length, same units.
+        step: Shift between windows (default: test, i.e. back-to-back test windows).
+        anchored (bool): Train on everything from the first bar instead of a rolling window.
+    """
+    step = test if step is None else step
+    n = len(index)
+    windows = []
+    train_end = _bound(index, 0, train)
+    while train_end < n:
+        test_end = _bound(index, train_end, test)
+        if test_end > n or test_end <= train_end:
+            break
+        if anchored:
+            train_start = 0
+        elif isinstance(train, (int, np.integer)):
+            train_start = train_end - int(train)
+        else:
+            train_start = _bound(index, train_end, train, sign=-1)
+        windows.append((train_start, train_end, test_end))
+        train_end = _bound(index, train_end, step)
+    return windows
+
+
+def window_metrics(index: pd.DatetimeIndex, equity: np.ndarray, contributions: np.ndarray) -> dict:
+    """
+    Time-weighted metrics of one run, or of a (paths x time) batch of runs on index.
+
+    Args:
+        index (pd.DatetimeIndex): Bar dates of the run.
+        equity (np.ndarray): Equity per bar (last axis).
+        contributions (np.ndarray): Cash added on each bar (already included in equity).
+
+    Returns:
+        dict: final_equity, total_return, cagr, max_drawdown (one value per run) and the
+        per-bar growth factors ('growth', first bar = 1.0) for stitching curves together.
+    """
+    growth = np.ones(np.shape(equity))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth[..., 1:] = (equity[..., 1:] - contributions[1:]) / equity[..., :-1]
+    growth[~np.isfinite(growth)] = 1.0
+    nav = np.cumprod(growth, axis=-1)
+    days = (index[-1] - index[0]).days
+    total_return = nav[..., -1] - 1
+    return {
+        'final_equity': equity[..., -1],
+        'total_return': total_return,
+        'cagr': nav[..., -1] ** (365 / days) - 1 if days > 0 else total_return * 0.0,
+        'max_drawdown': np.max(1 - nav / np.maximum.accumulate(nav, axis=-1), axis=-1),
+        'growth': growth,
+    }
+
+
+class WalkForward:
+    """
+    Args:
+        strategy_cls: BaseStrategy subclass, built as
+            strategy_cls(trading_start_date=..., **params, **strategy_kwargs).
+        param_grid (dict): {param: [values]} searched on every train window
+            (None: the strategy defaults, nothing is optimized).
+        train, test, step, anchored: Window layout, see walk_forward_windows.
+        metric (str): Train metric used to pick parameters (cagr, total_return,
+            final_equity or max_drawdown).
+        strategy_kwargs (dict): Fixed constructor arguments (e.g. initial_cash).
+    """
+
+    def __init__(self, strategy_cls, param_grid=None, train="3y", test="1y", step=None, anchored=False,
+                 metric='cagr', strategy_kwargs=None):
+        self.strategy_cls = strategy_cls
+        self.param_grid = param_grid or {}
+        self.train = train
+        self.test = test
+        self.step = step
+        self.anchored = anchored
+        self.metric = metric
+        self.strategy_kwargs = strategy_kwargs or {}
+        self.oos_equity = None
+
+    def points(self) -> list:
+        """Every combination of param_grid as a list of parameter dicts."""
+        names = list(self.param_grid)
+        return [dict(zip(names, values)) for values in itertools.product(*(self.param_grid[n] for n in names))]
+
+    def evaluate(self, prepared: pd.DataFrame, params: dict, start: int, end: int, new_month=None,
+                 arrays=None) -> dict:
+        """
+        Metrics of params on bars [start, end) of a prepared frame, trading from bar start.
+        new_month is month_starts over the whole frame and arrays the strategy's
+        target_arrays(prepared), if the caller has them.
+        """
+        index = prepared.index[start:end]
+        strategy = self.strategy_cls(trading_start_date=index[0], **params, **self.strategy_kwargs)
+        if new_month is None:
+            month_start, _ = month_starts(index, np.ones(len(index), dtype=bool))
+        else:
+            # The first bar of a window always starts a contribution month
+            month_start = new_month[start:end].copy()
+            month_start[0] = True
+        contributions = np.where(month_start, float(strategy.monthly_contribution), 0.0)
+        if arrays is not None:
+            close, target = arrays
+            equity = simulate_target_position(close[start:end], target[start:end], contributions,
+                                              np.ones(len(index), dtype=bool), strategy.initial_cash)
+        else:
+            equity = strategy.run_prepared(prepared.iloc[start:end])['Equity'].to_numpy(dtype=float)
+        return window_metrics(index, equity, contributions)
+
+    def run(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Args:
+            df (pd.DataFrame): Full history (bars with a DatetimeIndex).
+
+        Returns:
+            pd.DataFrame: One row per window with its dates, the chosen parameters,
+            the train metric and the out-of-sample (test_*) metrics. The stitched
+            out-of-sample growth of 1.0 is kept in self.oos_equity.
+        """
+        windows = walk_forward_windows(df.index, self.train, self.test, self.step, self.anchored)
+        if not windows:
+            raise ValueError("History is too short for one train + test window")
+        points = self.points() or [{}]
+
+        # Indicators (and targets, where the strategy has them) once per parameter set, on the full history
+        prepared = {}
+        for params in points:
+            strategy = self.strategy_cls(**params, **self.strategy_kwargs)
+            frame = strategy.prepare(df)
+            prepared[tuple(sorted(params.items()))] = (frame, strategy.target_arrays(frame))
+
+        new_month, _ = month_starts(df.index, np.ones(len(df), dtype=bool))
+        rows, growth, dates = [], [], []
+        for train_start, train_end, test_end in windows:
+            best, best_score = points[0], None
+            if len(points) > 1:
+                for params in points:
+                    frame, arrays = prepared[tuple(sorted(params.items()))]
+                    score = self.evaluate(frame, params, train_start, train_end, new_month, arrays)[self.metric]
+                    if best_score is None or (score < best_score if self.metric in _ASCENDING
+                                              else score > best_score):
+                        best, best_score = params, score
+
+            frame, arrays = prepared[tuple(sorted(best.items()))]
+            result = self.evaluate(frame, best, train_end, test_end, new_month, arrays)
+            growth.append(result.pop('growth'))
+            dates.append(df.index[train_end:test_end])
+            rows.append({
+                'train_start': df.index[train_start],
+                'train_end': df.index[train_end - 1],
+                'test_start': df.index[train_end],
+                'test_end': df.index[test_end - 1],
+                **best,
+                f'train_{self.metric}': best_score,
+                **{f'test_{k}': v for k, v in result.items()},
+            })
+
+        # Overlapping test windows (step < test) keep the first window's bars
+        oos = pd.Series(np.concatenate(growth), index=dates[0].append(dates[1:]))
+        oos = oos[~oos.index.duplicated()]
+        self.oos_equity = oos.cumprod()
+        return pd.DataFrame(rows)
@@ -1,4 +1,6 @@
 # import
+import sys
+import os
 import pandas as pd
 from datetime import datetime, timedelta
 
@@ -6,7 +8,12 @@ from utils import recommended_pe_ratio
 from warning import rule_price_increase, rule_largest_gain, rule_accelerating_growth, rule_falling_below_ma, stock_warning_system
 from earning import upcoming_earnings
 import trade_decision as td
-import yfinance as yf
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.data_provider import get_stocks_data, get_ticker_info, prefetch_metadata
+
+REPORT_INFO_FIELDS = ['trailingPE', 'sector', 'dividendYield', 'marketCap', 'earningsGrowth', 'targetMeanPrice', 'buyRatingCount', 'holdRatingCount', 'sellRatingCount']
 
 def get_stock_info_on_date(tickers, short_window, long_window, rsi_buy_signal, rsi_sell_signal, rsi_window, date=datetime.today().strftime("%Y-%m-%d"), history_days=600, long_term_ma=200):
     print("Today is " + date)
@@ -20,45 +27,55 @@ def get_stock_info_on_date(tickers, short_window, long_window, rsi_buy_signal, r
 
     data = {'Company Code': [], 'Date': [], 'Daily Price': [], 'Recommendation': [],'60 DAY RSI':[], 'P/E Ratio': [], 'Recommended PE':[], 'Category': [],'Dividend Yield': [], 'Market Cap': [], 'Earnings Growth': [], 'One Year Target': [], 'Analyst Buy': [], 'Analyst Hold': [], 'Analyst Sell': []}
     
+    # One batched download for all tickers instead of one request per ticker
+    all_hist = get_stocks_data(tickers, start_date=start_date.strftime('%Y-%m-%d'), end_date=end_date.strftime('%Y-%m-%d'))
+
+    signalled = []
     for ticker in tickers:
-        stock = yf.Ticker(ticker)
-        hist_data = stock.history(start=start_date.strftime('%Y-%m-%d'), end=end_date.strftime('%Y-%m-%d'))
-        if hist_data.empty:
+        if ticker not in all_hist:
             continue  # Skip if no data for the given date range
+        hist_data = all_hist[ticker]
         
         last_date = hist_data.index[-1].strftime('%Y-%m-%d')  # Last date in the historical data
         daily_price = hist_data['Close'].iloc[-1]  # Last close price
         # Apply buy/sell signal functions (as previously defined)
-        risk_buy_signal, buy_data = td.check_buy_signal(hist_data, short_window=short_window, long_window=long_window, rsi_buy_signal=rsi_buy_signal, rsi_window=rsi_window)
-        buy_signal, _ = td.check_buy_signal(hist_data, short_window=short_window, long_window=long_window, rsi_buy_signal=rsi_buy_signal, rsi_window=rsi_window)
+        buy_signal, buy_data = td.check_buy_signal(hist_data, short_window=short_window, long_window=long_window, rsi_buy_signal=rsi_buy_signal, rsi_window=rsi_window)
+        risk_buy_signal = buy_signal  # RISK BUY has always used the same check as BUY
         sell_signal, _ = td.check_sell_signal(hist_data, short_window=short_window, long_window=long_window, rsi_sell_signal=rsi_sell_signal, rsi_window=rsi_window)
         recommendation = 'BUY' if buy_signal else 'SELL' if sell_signal else 'RISK BUY' if risk_buy_signal else None
 
         if recommendation:
-            pe_ratio = stock.info.get('trailingPE', 'N/A')
-            category = stock.info.get('sector', 'N/A')
-            dividend_yield = stock.info.get('dividendYield', 'N/A') * 100 if stock.info.get('dividendYield') is not None else 'N/A'
-            market_cap = stock.info.get('marketCap', 'N/A')
-            earnings_growth = stock.info.get('earningsGrowth', 'N/A')
-            one_year_target = stock.info.get('targetMeanPrice')
-            analyst_buy_ratings = stock.info.get('buyRatingCount')
-            analyst_hold_ratings = stock.info.get('holdRatingCount')
-            analyst_sell_ratings = stock.info.get('sellRatingCount')
-            data['Company Code'].append(ticker)
-            data['Recommendation'].append(recommendation)
-            data['60 DAY RSI'].append(buy_data['RSI'].iloc[-1])
-            data['P/E Ratio'].append(pe_ratio)
-            data['Category'].append(category)
-            data['Dividend Yield'].append(dividend_yield)
-            data['Market Cap'].append(market_cap)
-            data['Earnings Growth'].append(earnings_growth)
-            data['Recommended PE'].append(recommended_pe_ratio(category))
-            data['One Year Target'].append(one_year_target)
-            data['Analyst Buy'].append(analyst_buy_ratings)
-            data['Analyst Hold'].append(analyst_hold_ratings)
-            data['Analyst Sell'].append(analyst_sell_ratings)
-            data['Date'].append(last_date)
-            data['Daily Price'].append(daily_price)
+            signalled.append((ticker, recommendation, buy_data['RSI'].iloc[-1], last_date, daily_price))
+
+    # Fetch fundamentals only for tickers with a signal, concurrently and through the metadata cache
+    prefetch_metadata([row[0] for row in signalled], fields=REPORT_INFO_FIELDS)
+
+    for ticker, recommendation, rsi, last_date, daily_price in signalled:
+        info = get_ticker_info(ticker, fields=REPORT_INFO_FIELDS)
+        pe_ratio = info.get('trailingPE', 'N/A')
+        category = info.get('sector', 'N/A')
+        dividend_yield = info.get('dividendYield', 'N/A') * 100 if info.get('dividendYield') is not None else 'N/A'
+        market_cap = info.get('marketCap', 'N/A')
+        earnings_growth = info.get('earningsGrowth', 'N/A')
+        one_year_target = info.get('targetMeanPrice')
+        analyst_buy_ratings = info.get('buyRatingCount')
+        analyst_hold_ratings = info.get('holdRatingCount')
+        analyst_sell_ratings = info.get('sellRatingCount')
+        data['Company Code'].append(ticker)
+        data['Recommendation'].append(recommendation)
+        data['60 DAY RSI'].append(rsi)
+        data['P/E Ratio'].append(pe_ratio)
+        data['Category'].append(category)
+        data['Dividend Yield'].append(dividend_yield)
+        data['Market Cap'].append(market_cap)
+        data['Earnings Growth'].append(earnings_growth)
+        data['Recommended PE'].append(recommended_pe_ratio(category))
+        data['One Year Target'].append(one_year_target)
+        data['Analyst Buy'].append(analyst_buy_ratings)
+        data['Analyst Hold'].append(analyst_hold_ratings)
+        data['Analyst Sell'].append(analyst_sell_ratings)
+        data['Date'].append(last_date)
+        data['Daily Price'].append(daily_price)
 
     return pd.DataFrame(data)
 
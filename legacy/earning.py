@@ -1,20 +1,26 @@
+import sys
+import os
 from datetime import datetime, timedelta
-import yfinance as yf
 import pandas as pd
 
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.data_provider import get_ticker_info, get_earnings_calendar, prefetch_metadata
+
 
 def upcoming_earnings(tickers, reference_date, within_days=10):
     reference_date = datetime.strptime(reference_date, '%Y-%m-%d')
     days_later = reference_date + timedelta(days=within_days)
     earnings_list = []
 
+    # Refresh stale cache entries concurrently; fresh ones are read from disk
+    prefetch_metadata(tickers, fields=['earningsQuarterlyGrowth'], calendar=True)
     for ticker in tickers:
-        stock = yf.Ticker(ticker)
         try:
-            info = stock.info
+            info = get_ticker_info(ticker, fields=['earningsQuarterlyGrowth'])
             if 'earningsQuarterlyGrowth' not in info: # filter out etfs
                 continue
-            earnings_data = stock.calendar
+            earnings_data = get_earnings_calendar(ticker)
             if earnings_data and 'Earnings Date' in earnings_data:
                 if len(earnings_data['Earnings Date']) > 0:
                     earnings_date = earnings_data['Earnings Date'][0]
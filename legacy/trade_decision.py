@@ -1,4 +1,10 @@
-from utils import calculate_moving_average, calculate_rsi
+import sys
+import os
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.engine import IndicatorEngine
+from core.indicators import calculate_rsi, sma_multi
 
 # Constants to be tuned
 SHORT_WINDOW = 5
@@ -17,11 +23,24 @@ def get_market_exit_signal(index_data, long_term_ma):
     if index_data['Close'].iloc[-1] < index_data['Long_Term_MA'].iloc[-1]:
         return "Exit Market"
     return "Stay"
+
+
+def add_signal_indicators(stock_data, short_window, long_window, rsi_window):
+    """
+    Copy of stock_data with Short_MA, Long_MA, RSI and Volume_MA.
+    Values come from the memoized core engine, so the buy and sell checks on the same
+    frame share one computation and the caller's frame is left untouched.
+    """
+    engine = IndicatorEngine(stock_data)
+    return stock_data.assign(
+        Short_MA=engine.sma('Close', short_window),
+        Long_MA=engine.sma('Close', long_window),
+        RSI=engine.get('RSI', window=rsi_window),
+        Volume_MA=engine.sma('Volume', short_window),
+    )
+
 def check_buy_signal(stock_data, short_window, long_window, rsi_buy_signal, rsi_window):
-    stock_data['Short_MA'] = calculate_moving_average(stock_data, short_window)
-    stock_data['Long_MA'] = calculate_moving_average(stock_data, long_window)
-    stock_data['RSI'] = calculate_rsi(stock_data, rsi_window)
-    stock_data['Volume_MA'] = stock_data['Volume'].rolling(window=short_window).mean()
+    stock_data = add_signal_indicators(stock_data, short_window, long_window, rsi_window)
 
     # Check the latest data point for buy signal
     buy_signal = (stock_data['Short_MA'].iloc[-1] < stock_data['Long_MA'].iloc[-1]) and \
@@ -30,10 +49,7 @@ def check_buy_signal(stock_data, short_window, long_window, rsi_buy_signal, rsi_
     return buy_signal, stock_data
 
 def check_sell_signal(stock_data, short_window, long_window, rsi_sell_signal, rsi_window):
-    stock_data['Short_MA'] = calculate_moving_average(stock_data, short_window)
-    stock_data['Long_MA'] = calculate_moving_average(stock_data, long_window)
-    stock_data['RSI'] = calculate_rsi(stock_data, rsi_window)
-    stock_data['Volume_MA'] = stock_data['Volume'].rolling(window=short_window).mean()
+    stock_data = add_signal_indicators(stock_data, short_window, long_window, rsi_window)
 
     # Check the latest data point for sell signal
     sell_signal = (stock_data['Short_MA'].iloc[-1] > stock_data['Long_MA'].iloc[-1]) and \
@@ -47,9 +63,8 @@ def decide_trade(stock_data, short_window, long_window, rsi_buy_signal, rsi_sell
     print("rsi_buy_signal: ", rsi_buy_signal)
     print("rsi_sell_signal: ", rsi_sell_signal)
     print("rsi_window: ", rsi_window)
-    stock_data['Short_MA'] = calculate_moving_average(stock_data, short_window)
-    stock_data['Long_MA'] = calculate_moving_average(stock_data, long_window)
-    stock_data['RSI'] = calculate_rsi(stock_data, rsi_window)
+    stock_data['Short_MA'], stock_data['Long_MA'] = sma_multi(stock_data['Close'], [short_window, long_window])
+    stock_data['RSI'] = calculate_rsi(stock_data['Close'], rsi_window)
     stock_data['Volume_MA'] = stock_data['Volume_Series'].rolling(window=short_window).mean()
 
     buy_signals = ((stock_data['Short_MA'] < stock_data['Long_MA']) & (stock_data['RSI'] < rsi_buy_signal)) & (stock_data['Volume_Series'] > stock_data['Volume_MA'])
@@ -1,7 +1,13 @@
+import sys
+import os
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.indicators import calculate_dema, calculate_wilder_rsi, dema_multi
+
 # Constants
 SHORT_WINDOW = 30
 LONG_WINDOW = 60
@@ -11,9 +17,7 @@ RSI_WINDOW = 30
 
 # 1. DEMA Calculation
 def calculate_dema_David(series: pd.Series, window: int) -> pd.Series:
-    ema = series.ewm(span=window, adjust=False).mean()
-    ema_of_ema = ema.ewm(span=window, adjust=False).mean()
-    return 2 * ema - ema_of_ema
+    return calculate_dema(series, window)
 
 # 2. RSI Calculation
 def calculate_rsi_David(prices: pd.Series, window: int) -> pd.Series:
@@ -24,19 +28,7 @@ def calculate_rsi_David(prices: pd.Series, window: int) -> pd.Series:
     3. 计算 RS = EMA_gain / EMA_loss
     4. RSI = 100 – 100 / (1 + RS)
     """
-    delta = prices.diff()
-
-    # 分离涨跌
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
-
-    # Wilder 的 EMA 平滑：alpha = 1/window
-    ema_gain = gain.ewm(alpha=1/window, adjust=False, min_periods=window).mean()
-    ema_loss = loss.ewm(alpha=1/window, adjust=False, min_periods=window).mean()
-
-    rs = ema_gain / ema_loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+    return calculate_wilder_rsi(prices, window)
 
 # 3. Signal Generation
 def decide_trade_David(stock_data: pd.DataFrame,
@@ -46,8 +38,7 @@ def decide_trade_David(stock_data: pd.DataFrame,
     df = stock_data.copy()
     
     # 1. 指标计算
-    df['DEMA_Short'] = calculate_dema_David(df['Close'], short_window)
-    df['DEMA_Long']  = calculate_dema_David(df['Close'], long_window)
+    df['DEMA_Short'], df['DEMA_Long'] = dema_multi(df['Close'], [short_window, long_window])
     df['RSI']      = calculate_rsi_David(df['Close'], rsi_window)
     df['RSI_prev'] = df['RSI'].shift(1)
     
@@ -1,18 +1,22 @@
-import yfinance as yf
+import sys
+import os
+import pandas as pd
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.data_provider import get_provider
+from core import indicators
 
 def calculate_moving_average(data, window):
-    return data['Close'].rolling(window=window).mean()
+    return indicators.calculate_sma(data['Close'], window)
 
 def calculate_rsi(data, window):
-    delta = data['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+    return indicators.calculate_rsi(data['Close'], window)
 
 def get_stock_data(ticker, start_date, end_date):
-    stock_data = yf.download(ticker, start=start_date, end=end_date)
+    stock_data = get_provider().fetch_bars(ticker, start=start_date, end=end_date)
+    # Keep yfinance's (field, ticker) column layout
+    stock_data.columns = pd.MultiIndex.from_product([stock_data.columns, [ticker]])
     stock_data["Volume_Series"] = stock_data["Volume"][ticker]
     return stock_data
 
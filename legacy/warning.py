@@ -1,5 +1,11 @@
+import sys
+import os
 from datetime import datetime, timedelta
-import yfinance as yf
+import pandas as pd
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.data_provider import get_stocks_data
 
 def rule_price_increase(stock_data, ticker):
     """Rule 2: 25-50% increase in 1 to 3 weeks."""
@@ -31,8 +37,11 @@ def stock_warning_system(tickers, date, rules):
     warnings = {}
     end_date = datetime.strptime(date, '%Y-%m-%d') + timedelta(days=1)  # To include the end date in the fetch
     start_date = end_date - timedelta(days=365)
-    for ticker in tickers:
-        data = yf.download(ticker, start=start_date, end=date)
+    all_data = get_stocks_data(tickers, start_date=start_date.strftime('%Y-%m-%d'), end_date=date)
+    for ticker, df in all_data.items():
+        # Rules expect yfinance's (field, ticker) column layout
+        data = df.copy()
+        data.columns = pd.MultiIndex.from_product([data.columns, [ticker]])
         for rule in rules:
             if rule(data, ticker):
                 warnings.setdefault(ticker, []).append(rule.__name__)
@@ -2,13 +2,16 @@ import sys
 import os
 import json
 import pandas as pd
-import yfinance as yf
 from datetime import datetime
 import argparse
 
 # Add project root
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from core.indicators import TechnicalIndicators
+from core.data_provider import get_stock_data, get_stocks_data, set_provider
+from core.providers import ReplayProvider
+from core.resample import get_resampled_data
+from core.streaming import IndicatorState, StateStore
 
 def load_config():
     try:
@@ -20,38 +23,74 @@ def load_config():
 
 def get_data(ticker, period="1y", interval="1d"):
     try:
-        df = yf.download(ticker, period=period, interval=interval, progress=False)
+        df = get_stock_data(ticker, period=period, interval=interval)
         if df.empty:
             return None
-        
-        # Clean MultiIndex
-        if isinstance(df.columns, pd.MultiIndex):
-            try:
-                df.columns = df.columns.droplevel(1)
-            except:
-                pass
         return df
     except Exception as e:
         print(f"Error fetching {ticker}: {e}")
         return None
 
-def scan_ticker(ticker, settings):
-    # 1. Fetch Data
+def load_bars(ticker, settings):
     # We need enough history for Ladder (89) and MACD
-    df = get_data(ticker, period="2y", interval="1d")
+    interval = settings.get('ladder_interval', '1d')
+    if interval != '1d':
+        # Intraday ladders: derive from cached 1h bars (yfinance keeps ~730 days of those)
+        df = get_resampled_data(ticker, interval, period="700d", base_interval="1h")
+        return df if not df.empty else None
+    return get_data(ticker, period="2y", interval="1d")
+
+def scan_ticker(ticker, settings, df=None):
+    # 1. Fetch Data (unless already bulk-fetched by the caller)
+    if df is None:
+        df = load_bars(ticker, settings)
     if df is None:
         return None
 
     # 2. Calculate Indicators
     df = TechnicalIndicators.add_ladder_indicator(df, n1=settings.get('ladder_n1', 26), n2=settings.get('ladder_n2', 89))
     # Use Strict Bottom Fishing
-    df = TechnicalIndicators.add_bottom_fishing_indicator(df)
+    TechnicalIndicators.add_bottom_fishing_indicator(df, out=df)
+
+    return analyze(ticker, df.index[-1], df.iloc[-1], df.iloc[-2])
 
+def scan_ticker_incremental(ticker, settings, store, df=None):
+    """
+    scan_ticker from saved streaming state: only bars completed since the last run are
+    fed in, and the latest (possibly still forming) bar is evaluated without being committed.
+
+    The state is not the same as scan_ticker's. It starts from the first bar of the run
+    that seeded it and keeps every bar since then. scan_ticker recomputes over the
+    trailing load_bars window, which moves forward every day. The ladder and MACD EMAs
+    forget their starting point, so once the state is a few hundred bars older than the
+    window (about 0.978^n for n2=89) both give the same values up to rounding. The strict
+    bottom-fishing signal also depends on earlier MACD crosses, so it can still differ
+    near the window start. The state is reseeded from the current window only when the
+    saved bars no longer match df (e.g. restated history after a split).
+    """
+    if df is None:
+        df = load_bars(ticker, settings)
+    if df is None or len(df) < 2:
+        return None
+
+    interval = settings.get('ladder_interval', '1d')
+    params = {'n1': settings.get('ladder_n1', 26), 'n2': settings.get('ladder_n2', 89)}
+    history = df.iloc[:-1]
+    state = store.load(ticker, interval, **params)
+    new_bars = state.pending(history) if state is not None else None
+    if new_bars is None:
+        state = IndicatorState.from_history(history, **params)
+    else:
+        for ts, bar in new_bars.iterrows():
+            state.update(ts, bar)
+    store.save(ticker, interval, state)
+
+    last = state.peek(df.index[-1], df.iloc[-1])
+    return analyze(ticker, df.index[-1], last, state.last)
+
+def analyze(ticker, ts, last_row, prev_row):
     # 3. Analyze Latest Candle
-    last_row = df.iloc[-1]
-    prev_row = df.iloc[-2]
-    
-    date_str = df.index[-1].strftime('%Y-%m-%d')
+    date_str = ts.strftime('%Y-%m-%d')
     
     price = last_row['Close']
     
@@ -100,6 +139,14 @@ def scan_ticker(ticker, settings):
     }
 
 def main():
+    parser = argparse.ArgumentParser(description="Daily ladder / bottom-fishing scan")
+    parser.add_argument("--replay", help="Scan recorded fixtures in this directory instead of live data")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Advance saved per-ticker indicator state instead of recomputing full history")
+    args = parser.parse_args()
+    if args.replay:
+        set_provider(ReplayProvider(args.replay))
+
     config = load_config()
     watchlist = config.get('watchlist', [])
     settings = config.get('settings', {})
@@ -107,10 +154,17 @@ def main():
     print(f"🔍 Scanning {len(watchlist)} tickers for {datetime.now().strftime('%Y-%m-%d')}...")
     print("-" * 60)
     
+    # One batched download for the whole watchlist (daily ladders only)
+    data = get_stocks_data(watchlist, period="2y", interval="1d") if settings.get('ladder_interval', '1d') == '1d' else {}
+    
+    store = StateStore() if args.incremental else None
     results = []
     for ticker in watchlist:
         print(f"Processing {ticker}...", end="\r")
-        res = scan_ticker(ticker, settings)
+        if store is not None:
+            res = scan_ticker_incremental(ticker, settings, store, df=data.get(ticker))
+        else:
+            res = scan_ticker(ticker, settings, df=data.get(ticker))
         if res:
             results.append(res)
             